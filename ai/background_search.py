@@ -0,0 +1,72 @@
+import threading
+from concurrent.futures import Future
+
+class BackgroundSearch:
+    """
+    Runs an AI's choose_move on a background thread so the caller, e.g. the GUI loop, keeps running.
+    Each search returns a Future for its move. A search can be cancelled, and a finished move is only
+    handed out for the position it was searched from, so moves from stale searches are never played.
+    """
+    def __init__(self, ai):
+        self.ai = ai
+        self.future = None
+        self.thread = None
+        self.position = None
+
+    @staticmethod
+    def position_id(game):
+        return (len(game.board.history), game.zobrist_key)
+
+    def is_thinking(self):
+        """Returns True while a search thread, including a cancelled one that has not finished yet, is running."""
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, game, callback=None):
+        """Starts searching the game's position and returns a Future for the move. callback is called with the Future when done."""
+        if self.is_thinking():
+            raise RuntimeError('The AI is already searching')
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+        # Copy on this thread, the caller may change the game while the search runs
+        search_game = game.copy()
+        # Arm the search here and not on the search thread, so a cancel right after start is not undone
+        self.ai.prepare_search()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(self.ai.choose_move(search_game))
+            except BaseException as error:
+                future.set_exception(error)
+
+        self.future = future
+        self.position = self.position_id(game)
+        # A daemon thread does not keep the program alive when the window is closed mid-search
+        self.thread = threading.Thread(target=run, name='chess-ai-search', daemon=True)
+        self.thread.start()
+        return future
+
+    def has_result(self, game):
+        """Returns True if a search of the game's current position has finished and was not cancelled."""
+        return self.future is not None and self.future.done() and self.position == self.position_id(game)
+
+    def result(self):
+        """Returns the move of the finished search and forgets it."""
+        future, self.future = self.future, None
+        return future.result()
+
+    def cancel(self):
+        """Stops the running search and discards its move."""
+        if self.future is not None:
+            self.future.cancel()
+            self.future = None
+        if self.is_thinking():
+            self.ai.stop()
+
+    def shutdown(self, timeout=None):
+        """Cancels any search and waits up to timeout seconds for its thread to finish."""
+        self.cancel()
+        if self.thread is not None:
+            self.thread.join(timeout)
@@ -0,0 +1,388 @@
+"""Endgame bitbases for king and queen, king and rook, and king and pawn against a lone king.
+
+The generator solves each ending offline by retrograde analysis. It starts from every checkmate and
+works backwards through un-moves, so every position is visited once and gets its exact distance to
+mate. KPK positions where the pawn promotes continue into the KQK results, so KQK is solved first.
+Run it once with:
+
+    python engine.py bitbases --output data/bitbases
+
+A file holds one byte per position: 0 for a draw (or an impossible position), otherwise the number
+of plies to mate plus one, with the side that has the extra piece winning. Positions are stored only
+once per symmetry, from the point of view of white with the extra piece. Without pawns the white
+king is mirrored into the a1-d1-d4 triangle, and with a pawn the pawn is mirrored onto files a-d.
+
+Bitbases memory-maps the files and answers probes with a few arithmetic steps and one byte read.
+Pawns only promote to a queen in this engine, and the tables follow the same rule. Positions with
+castling rights are not probed.
+"""
+import argparse
+import mmap
+import os
+import sys
+from collections import defaultdict
+from game_logic.pieces import PAWN, ROOK, QUEEN, KING, ROOK_DIRECTIONS, BISHOP_DIRECTIONS
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'bitbases')
+# Endings by the type code of the extra piece
+ENDINGS = {QUEEN: 'kqk', ROOK: 'krk', PAWN: 'kpk'}
+# The search score of a won bitbase position is this minus the plies to mate, below a real mate at infinity
+TABLEBASE_WIN = 100000
+
+WHITE_TO_MOVE, BLACK_TO_MOVE = 0, 1
+# Squares of the a1-d1-d4 triangle, with y * 8 + x numbering
+TRIANGLE = (0, 1, 2, 3, 9, 10, 11, 18, 19, 27)
+TRIANGLE_INDEX = {square: index for index, square in enumerate(TRIANGLE)}
+PAWN_SLOTS = 24
+
+
+def _square(y, x):
+    return y * 8 + x
+
+
+def _king_targets():
+    targets = []
+    for square in range(64):
+        y, x = divmod(square, 8)
+        targets.append(tuple(_square(y + dy, x + dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+                             if (dy or dx) and 0 <= y + dy < 8 and 0 <= x + dx < 8))
+    return targets
+
+
+KING_TARGETS = _king_targets()
+KING_MASKS = [sum(1 << target for target in targets) for targets in KING_TARGETS]
+
+
+def _between(diagonal):
+    # between[a * 64 + b] is the mask of squares strictly between two aligned squares, or -1 if not aligned
+    between = [-1] * (64 * 64)
+    for a in range(64):
+        ay, ax = divmod(a, 8)
+        for b in range(64):
+            by, bx = divmod(b, 8)
+            dy, dx = by - ay, bx - ax
+            if a == b or (diagonal and abs(dy) != abs(dx)) or (not diagonal and dy and dx):
+                continue
+            step_y, step_x = (dy > 0) - (dy < 0), (dx > 0) - (dx < 0)
+            mask = 0
+            y, x = ay + step_y, ax + step_x
+            while (y, x) != (by, bx):
+                mask |= 1 << _square(y, x)
+                y, x = y + step_y, x + step_x
+            between[a * 64 + b] = mask
+    return between
+
+
+ORTHOGONAL_BETWEEN = _between(False)
+DIAGONAL_BETWEEN = _between(True)
+
+
+def _rays(directions):
+    # rays[square] lists, for each direction, the squares from square to the edge of the board
+    rays = []
+    for square in range(64):
+        y, x = divmod(square, 8)
+        square_rays = []
+        for dy, dx in directions:
+            ray = []
+            new_y, new_x = y + dy, x + dx
+            while 0 <= new_y < 8 and 0 <= new_x < 8:
+                ray.append(_square(new_y, new_x))
+                new_y, new_x = new_y + dy, new_x + dx
+            square_rays.append(ray)
+        rays.append(square_rays)
+    return rays
+
+
+SLIDER_RAYS = {ROOK: _rays(ROOK_DIRECTIONS), QUEEN: _rays(ROOK_DIRECTIONS + BISHOP_DIRECTIONS)}
+
+
+def _attacks(piece_type, piece, target, occupied):
+    # Returns True if a white piece of the type on piece attacks target, with occupied as a square mask
+    if piece_type == PAWN:
+        py, px = divmod(piece, 8)
+        ty, tx = divmod(target, 8)
+        return ty == py + 1 and abs(tx - px) == 1
+    between = ORTHOGONAL_BETWEEN[piece * 64 + target]
+    if between >= 0 and not between & occupied:
+        return True
+    if piece_type == QUEEN:
+        between = DIAGONAL_BETWEEN[piece * 64 + target]
+        return between >= 0 and not between & occupied
+    return False
+
+
+def _index(side, white_king, black_king, piece):
+    return ((side * 64 + white_king) * 64 + black_king) * 64 + piece
+
+
+def _legal(side, white_king, black_king, piece, piece_type):
+    # Returns True if the squares are distinct, the kings apart, a pawn on ranks 2-7,
+    # and the side not to move is not in check
+    if white_king == black_king or piece in (white_king, black_king) or KING_MASKS[white_king] >> black_king & 1:
+        return False
+    if piece_type == PAWN and not 8 <= piece < 56:
+        return False
+    return side == BLACK_TO_MOVE or not _attacks(piece_type, piece, black_king, 1 << white_king)
+
+
+def solve(piece_type, kqk=None):
+    """
+    Returns a bytearray of values for every position with white to have the extra piece, indexed by
+    ((side to move * 64 + white king) * 64 + black king) * 64 + piece. Values are 0 for a draw or an
+    impossible position, otherwise plies to mate plus one. A KPK solve needs the solved KQK values.
+    """
+    size = 2 * 64 * 64 * 64
+    # Plies to mate, -1 while unknown
+    plies = [-1] * size
+    # Legal black moves left that do not lose, or -1 once black can draw
+    moves_left = [-1] * size
+    levels = defaultdict(list)
+
+    for white_king in range(64):
+        for black_king in range(64):
+            for piece in range(64):
+                if not _legal(BLACK_TO_MOVE, white_king, black_king, piece, piece_type):
+                    continue
+                occupied = 1 << white_king
+                count = 0
+                escapes = False
+                for target in KING_TARGETS[black_king]:
+                    if KING_MASKS[white_king] >> target & 1:
+                        continue
+                    if target == piece:
+                        # Taking the undefended piece leaves two bare kings
+                        escapes = True
+                        break
+                    if not _attacks(piece_type, piece, target, occupied):
+                        count += 1
+                if escapes:
+                    continue
+                index = _index(BLACK_TO_MOVE, white_king, black_king, piece)
+                if count:
+                    moves_left[index] = count
+                elif _attacks(piece_type, piece, black_king, occupied):
+                    plies[index] = 0
+                    levels[0].append(index)
+
+    if piece_type == PAWN:
+        # Promoting leads into KQK, where black to move is lost in the KQK plies
+        for white_king in range(64):
+            for black_king in range(64):
+                for piece in range(48, 56):
+                    queen = piece + 8
+                    if queen in (white_king, black_king) or not _legal(WHITE_TO_MOVE, white_king, black_king,
+                                                                      piece, PAWN):
+                        continue
+                    value = kqk[_index(BLACK_TO_MOVE, white_king, black_king, queen)]
+                    if value:
+                        index = _index(WHITE_TO_MOVE, white_king, black_king, piece)
+                        if plies[index] < 0 or plies[index] > value:
+                            plies[index] = value
+                            levels[value].append(index)
+
+    level = 0
+    while level <= max(levels, default=-1):
+        for index in levels.pop(level, ()):
+            if plies[index] != level:
+                # Reached again later at a lower level
+                continue
+            side, rest = divmod(index, 64 * 64 * 64)
+            white_king, rest = divmod(rest, 64 * 64)
+            black_king, piece = divmod(rest, 64)
+            if side == BLACK_TO_MOVE:
+                # Every white move into this lost position wins for white one ply earlier
+                for previous in _white_unmoves(white_king, black_king, piece, piece_type):
+                    if plies[previous] < 0 or plies[previous] > level + 1:
+                        plies[previous] = level + 1
+                        levels[level + 1].append(previous)
+            else:
+                # A black position is lost once every black move leads to a win for white
+                for previous_king in KING_TARGETS[black_king]:
+                    if previous_king == piece or KING_MASKS[white_king] >> previous_king & 1:
+                        continue
+                    previous = _index(BLACK_TO_MOVE, white_king, previous_king, piece)
+                    if moves_left[previous] > 0:
+                        moves_left[previous] -= 1
+                        if moves_left[previous] == 0:
+                            plies[previous] = level + 1
+                            levels[level + 1].append(previous)
+        level += 1
+
+    return bytearray(value + 1 if value >= 0 else 0 for value in plies)
+
+
+def _white_unmoves(white_king, black_king, piece, piece_type):
+    # Yields the white to move positions from which a white move leads to this black to move position
+    for previous_king in KING_TARGETS[white_king]:
+        if previous_king != piece and previous_king != black_king and \
+                _legal(WHITE_TO_MOVE, previous_king, black_king, piece, piece_type):
+            yield _index(WHITE_TO_MOVE, previous_king, black_king, piece)
+    occupied = 1 << white_king | 1 << black_king
+    if piece_type == PAWN:
+        previous_pieces = []
+        if piece - 8 >= 8 and not occupied >> (piece - 8) & 1:
+            previous_pieces.append(piece - 8)
+            if 24 <= piece < 32 and not occupied >> (piece - 16) & 1:
+                previous_pieces.append(piece - 16)
+    else:
+        # Sliding back is the same as sliding forward, up to the first king
+        previous_pieces = []
+        for ray in SLIDER_RAYS[piece_type][piece]:
+            for square in ray:
+                if occupied >> square & 1:
+                    break
+                previous_pieces.append(square)
+    for previous_piece in previous_pieces:
+        if _legal(WHITE_TO_MOVE, white_king, black_king, previous_piece, piece_type):
+            yield _index(WHITE_TO_MOVE, white_king, black_king, previous_piece)
+
+
+def file_index(piece_type, side, white_king, black_king, piece):
+    """Returns the index in a bitbase file of a position with white to have the extra piece, after mirroring."""
+    if piece_type == PAWN:
+        if piece & 7 > 3:
+            white_king, black_king, piece = white_king ^ 7, black_king ^ 7, piece ^ 7
+        slot = ((piece >> 3) - 1) * 4 + (piece & 7)
+        return ((side * PAWN_SLOTS + slot) * 64 + white_king) * 64 + black_king
+    if white_king & 7 > 3:
+        white_king, black_king, piece = white_king ^ 7, black_king ^ 7, piece ^ 7
+    if white_king >> 3 > 3:
+        white_king, black_king, piece = white_king ^ 56, black_king ^ 56, piece ^ 56
+    if white_king >> 3 > white_king & 7:
+        white_king, black_king, piece = (_transpose(white_king), _transpose(black_king), _transpose(piece))
+    return ((side * len(TRIANGLE) + TRIANGLE_INDEX[white_king]) * 64 + black_king) * 64 + piece
+
+
+def _transpose(square):
+    return (square & 7) << 3 | square >> 3
+
+
+def compress(piece_type, values):
+    """Returns the file contents for solved values, with one entry per position up to symmetry."""
+    if piece_type == PAWN:
+        size = 2 * PAWN_SLOTS * 64 * 64
+    else:
+        size = 2 * len(TRIANGLE) * 64 * 64
+    data = bytearray(size)
+    for side in (WHITE_TO_MOVE, BLACK_TO_MOVE):
+        for white_king in range(64):
+            for black_king in range(64):
+                for piece in range(64):
+                    value = values[_index(side, white_king, black_king, piece)]
+                    if value:
+                        data[file_index(piece_type, side, white_king, black_king, piece)] = value
+    return data
+
+
+def generate(directory=DEFAULT_DIRECTORY, out=sys.stdout):
+    """Solves every ending and writes its file to directory."""
+    os.makedirs(directory, exist_ok=True)
+    solved = {}
+    for piece_type in (QUEEN, ROOK, PAWN):
+        name = ENDINGS[piece_type]
+        solved[piece_type] = solve(piece_type, solved.get(QUEEN))
+        data = compress(piece_type, solved[piece_type])
+        with open(os.path.join(directory, name + '.bb'), 'wb') as file:
+            file.write(data)
+        print(f'{name}: {len(data)} bytes, longest mate {max(data) - 1} plies', file=out)
+
+
+class Bitbases:
+    """
+    The bitbase files found in a directory, memory-mapped. Probes return None for positions they do not cover:
+    other material, missing files, or positions with castling rights.
+    """
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        self.directory = directory
+        self.files = []
+        self.tables = {}
+        for piece_type, name in ENDINGS.items():
+            path = os.path.join(directory, name + '.bb')
+            if not os.path.exists(path):
+                continue
+            file = open(path, 'rb')
+            self.files.append(file)
+            self.tables[piece_type] = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __getstate__(self):
+        # Mappings cannot be pickled, so a copy sent to another process maps the files again
+        return {'directory': self.directory}
+
+    def __setstate__(self, state):
+        self.__init__(state['directory'])
+
+    def close(self):
+        for table in self.tables.values():
+            table.close()
+        for file in self.files:
+            file.close()
+        self.tables = {}
+        self.files = []
+
+    def probe_value(self, game):
+        # Returns (file value, True if the side to move has the extra piece), or None if the position is not covered
+        pieces = game.board.pieces
+        white, black = pieces['white'], pieces['black']
+        if len(white) + len(black) != 3:
+            return None
+        strong = 'white' if len(white) == 2 else 'black'
+        extra = None
+        for position, piece in pieces[strong].items():
+            if piece.piece_type == KING:
+                strong_king = position
+            else:
+                extra = piece
+        table = self.tables.get(extra.piece_type)
+        if table is None or game.board.get_castling_rights():
+            return None
+        weak_king = game.board.king_positions['black' if strong == 'white' else 'white']
+        (ky, kx), (wy, wx), (py, px) = strong_king, weak_king, extra.position
+        if strong == 'black':
+            # Mirror the ranks so the side with the extra piece plays up the board as white
+            ky, wy, py = 7 - ky, 7 - wy, 7 - py
+        strong_to_move = game.current_turn == strong
+        side = WHITE_TO_MOVE if strong_to_move else BLACK_TO_MOVE
+        index = file_index(extra.piece_type, side, ky * 8 + kx, wy * 8 + wx, py * 8 + px)
+        return table[index], strong_to_move
+
+    def probe_wdl(self, game):
+        """Returns 1 if the side to move wins, 0 for a draw, -1 if it loses, or None if the position is not covered."""
+        probe = self.probe_value(game)
+        if probe is None:
+            return None
+        value, strong_to_move = probe
+        if not value:
+            return 0
+        return 1 if strong_to_move else -1
+
+    def probe_dtm(self, game):
+        """Returns the plies to mate of a won or lost position, with probe_wdl telling which, or None for draws."""
+        probe = self.probe_value(game)
+        if probe is None or not probe[0]:
+            return None
+        return probe[0] - 1
+
+    def score(self, game):
+        """Returns a search score from white's point of view, with quicker mates scoring higher, or None."""
+        probe = self.probe_value(game)
+        if probe is None:
+            return None
+        value, strong_to_move = probe
+        if not value:
+            return 0
+        strong = game.current_turn if strong_to_move else ('black' if game.current_turn == 'white' else 'white')
+        score = TABLEBASE_WIN - (value - 1)
+        return score if strong == 'white' else -score
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate the KQK, KRK and KPK bitbases.')
+    parser.add_argument('--output', default=DEFAULT_DIRECTORY, help='directory to write the files to')
+    args = parser.parse_args(argv)
+    generate(args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
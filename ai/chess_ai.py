@@ -1,3 +1,46 @@
 class ChessAI:
+    # An OpeningBook that searching AIs play from while the position is in it, see ai/opening_book.py
+    opening_book = None
+    # Bitbases that searching AIs score simple endings with, see ai/bitbases.py
+    bitbases = None
+
     def choose_move(self, game):
-        pass
\ No newline at end of file
+        pass
+
+    def stop(self):
+        # Ask a running choose_move to return early, AIs that search can override this
+        pass
+
+    def prepare_search(self):
+        # Called by a thread that is about to run choose_move on another thread. A stop that comes in after this
+        # applies to that search, even if it comes before the search runs. Without it, choose_move forgets
+        # any stop sent while no search was running.
+        pass
+
+    def book_move(self, game):
+        # Returns a move from the opening book for the game's position, or None to search
+        if self.opening_book is None:
+            return None
+        return self.opening_book.choose_move(game)
+
+    @staticmethod
+    def load_opening_book(opening_book):
+        # Accepts a book file path as well as an OpeningBook, so books can be given in AI specs
+        if isinstance(opening_book, str):
+            from ai.opening_book import OpeningBook
+            return OpeningBook(opening_book)
+        return opening_book
+
+    @staticmethod
+    def load_bitbases(bitbases):
+        # Accepts the directory of the bitbase files as well as Bitbases
+        if isinstance(bitbases, str):
+            from ai.bitbases import Bitbases
+            return Bitbases(bitbases)
+        return bitbases
+
+    def bitbase_score(self, game):
+        # Returns the bitbase score of the game's position from white's point of view, or None if not covered
+        if self.bitbases is None:
+            return None
+        return self.bitbases.score(game)
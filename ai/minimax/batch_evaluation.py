@@ -0,0 +1,158 @@
+"""Vectorised evaluation of many positions at once.
+
+Positions are packed into an (N, 12, 64) array of 0/1 planes, one plane per colour and piece type
+(white pawn, knight, bishop, rook, queen, king, then the same for black), with squares numbered
+y * 8 + x. Material and piece-square scores use the same tables as the incremental evaluator,
+so with a mobility weight of 0 the scores equal evaluate_board for every position.
+
+NumPy is only needed for this module.
+"""
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+from game_logic.game import Game
+from game_logic.pieces import KNIGHT, BISHOP, ROOK, QUEEN
+from game_logic.pieces import KNIGHT_OFFSETS, ROOK_DIRECTIONS, BISHOP_DIRECTIONS
+from game_logic.psqt import MIDDLEGAME_SCORES, ENDGAME_SCORES, PHASE_WEIGHTS, MAX_PHASE
+
+# The first plane of each colour, the piece type code is added to it
+COLOR_PLANES = {'white': 0, 'black': 6}
+PLANES = 12
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError('Batch evaluation needs NumPy, install it with "pip install numpy"')
+
+
+def encode_board(board, out=None):
+    """Returns a (12, 64) array of piece planes for a Chessboard, or fills out if given."""
+    _require_numpy()
+    if out is None:
+        out = np.zeros((PLANES, 64), dtype=np.int8)
+    for color, first_plane in COLOR_PLANES.items():
+        for (y, x), piece in board.pieces[color].items():
+            out[first_plane + piece.piece_type, y * 8 + x] = 1
+    return out
+
+
+def encode_positions(positions):
+    """
+    Packs positions into an (N, 12, 64) array.
+    Accepts a sequence of Game or Chessboard objects, or an already encoded array of shape
+    (N, 12, 64), (N, 12, 8, 8), or (N, 64) holding piece codes (0 for empty, plane index + 1 otherwise).
+    """
+    _require_numpy()
+    if isinstance(positions, np.ndarray):
+        if positions.ndim == 4 and positions.shape[1:] == (PLANES, 8, 8):
+            return positions.reshape(len(positions), PLANES, 64)
+        if positions.ndim == 3 and positions.shape[1:] == (PLANES, 64):
+            return positions
+        if positions.ndim == 2 and positions.shape[1] == 64:
+            # One-hot the piece codes, dropping the empty code
+            return (positions[:, None, :] == np.arange(1, PLANES + 1)[None, :, None]).astype(np.int8)
+        raise ValueError(f'Cannot evaluate an array of shape {positions.shape}')
+
+    positions = list(positions)
+    encoded = np.zeros((len(positions), PLANES, 64), dtype=np.int8)
+    for index, position in enumerate(positions):
+        board = position.board if isinstance(position, Game) else position
+        encode_board(board, encoded[index])
+    return encoded
+
+
+def _score_tables(scores):
+    return scores['white'] + scores['black']
+
+
+def _knight_targets():
+    # targets[from, to] is 1 when a knight on from attacks to
+    targets = [[0] * 64 for _ in range(64)]
+    for y in range(8):
+        for x in range(8):
+            for dy, dx in KNIGHT_OFFSETS:
+                if 0 <= y + dy < 8 and 0 <= x + dx < 8:
+                    targets[y * 8 + x][(y + dy) * 8 + x + dx] = 1
+    return targets
+
+
+def _ray_squares(directions):
+    # rays[d][from] lists the squares in direction d, padded to 8 entries with 64, an off-board square
+    rays = []
+    for dy, dx in directions:
+        table = []
+        for y in range(8):
+            for x in range(8):
+                squares = []
+                new_y, new_x = y + dy, x + dx
+                while 0 <= new_y < 8 and 0 <= new_x < 8:
+                    squares.append(new_y * 8 + new_x)
+                    new_y, new_x = new_y + dy, new_x + dx
+                table.append(squares + [64] * (8 - len(squares)))
+        rays.append(table)
+    return rays
+
+
+class BatchEvaluator:
+    """
+    Scores positions in centipawns from white's point of view, like evaluate_board.
+    mobility_weight adds that many centipawns per move of difference in knight, bishop, rook and queen
+    mobility between the sides, counted as pseudo-legal moves: empty squares up to the first blocker,
+    plus the blocker when it is an enemy piece.
+    """
+    def __init__(self, mobility_weight=0):
+        _require_numpy()
+        self.mobility_weight = mobility_weight
+        self.middlegame_table = np.array(_score_tables(MIDDLEGAME_SCORES), dtype=np.int64)
+        self.endgame_table = np.array(_score_tables(ENDGAME_SCORES), dtype=np.int64)
+        self.phase_weights = np.array(PHASE_WEIGHTS * 2, dtype=np.int64)
+        self.knight_targets = np.array(_knight_targets(), dtype=np.int64)
+        self.rook_rays = np.array(_ray_squares(ROOK_DIRECTIONS), dtype=np.intp)
+        self.bishop_rays = np.array(_ray_squares(BISHOP_DIRECTIONS), dtype=np.intp)
+
+    def evaluate(self, positions):
+        """Returns an (N,) array of scores for the positions, see encode_positions for accepted inputs."""
+        encoded = encode_positions(positions).astype(np.int64, copy=False)
+        scores = self.material_and_position(encoded)
+        if self.mobility_weight:
+            scores = scores + self.mobility_weight * self.mobility(encoded)
+        return scores
+
+    def material_and_position(self, encoded):
+        """Returns the phase-tapered material and piece-square scores of encoded positions."""
+        middlegame = np.einsum('npi,pi->n', encoded, self.middlegame_table)
+        endgame = np.einsum('npi,pi->n', encoded, self.endgame_table)
+        phase = np.minimum(encoded.sum(axis=2) @ self.phase_weights, MAX_PHASE)
+        return (middlegame * phase + endgame * (MAX_PHASE - phase)) // MAX_PHASE
+
+    def mobility(self, encoded):
+        """Returns white's minus black's knight, bishop, rook and queen mobility for encoded positions."""
+        white = encoded[:, :6].sum(axis=1)
+        black = encoded[:, 6:].sum(axis=1)
+        empty = 1 - white - black
+        return (self.side_mobility(encoded, 'white', white, black, empty)
+                - self.side_mobility(encoded, 'black', black, white, empty))
+
+    def side_mobility(self, encoded, color, own, enemy, empty):
+        first_plane = COLOR_PLANES[color]
+        count = len(encoded)
+        # Knights reach every target not occupied by their own side
+        knights = encoded[:, first_plane + KNIGHT]
+        mobility = np.einsum('ns,st,nt->n', knights, self.knight_targets, 1 - own)
+
+        # Pad an off-board square 64 that is neither empty nor an enemy piece, so rays stop there
+        padding = np.zeros((count, 1), dtype=encoded.dtype)
+        empty_padded = np.concatenate([empty, padding], axis=1)
+        enemy_padded = np.concatenate([enemy, padding], axis=1)
+        queens = encoded[:, first_plane + QUEEN]
+        for rays, sliders in ((self.rook_rays, encoded[:, first_plane + ROOK] + queens),
+                              (self.bishop_rays, encoded[:, first_plane + BISHOP] + queens)):
+            for ray in rays:
+                # Number of empty squares before the first blocker, for a slider on every square
+                run = np.cumprod(empty_padded[:, ray[:, :7]], axis=2).sum(axis=2)
+                blocker = ray[np.arange(64)[None, :], run]
+                captures = np.take_along_axis(enemy_padded, blocker, axis=1)
+                mobility = mobility + ((run + captures) * sliders).sum(axis=1)
+        return mobility
@@ -0,0 +1,9 @@
+from game_logic.psqt import tapered_score
+
+def evaluate_board(board):
+    """
+    Returns the material and piece-square score of a board in centipawns, positive when white is better.
+    The board keeps the middlegame and endgame totals and the game phase up to date as pieces are set,
+    so this only blends them.
+    """
+    return tapered_score(board.middlegame_score, board.endgame_score, board.phase)
@@ -1,34 +1,51 @@
 from ai.chess_ai import ChessAI
-from game_logic.pieces import Bishop, King, Knight, Pawn, Queen, Rook
+from ai.minimax.evaluation import evaluate_board
 from game_logic.game import Game
 
 class MinimaxChessAI(ChessAI):
-    def __init__(self, depth=3):
-        # Initialize the AI with a specified search depth
+    def __init__(self, depth=3, opening_book=None, bitbases=None):
+        # Initialize the AI with a specified search depth, and optionally an opening book or book file path
+        # and bitbases or their directory
         self.depth = depth
+        self.opening_book = self.load_opening_book(opening_book)
+        self.bitbases = self.load_bitbases(bitbases)
+        # Positions visited by the last search
+        self.nodes = 0
 
     def choose_move(self, game: Game):
         # Choose the best move based on the Minimax algorithm
         # Make a copy of the game to avoid altering the original game state
 
+        self.nodes = 0
+        book_move = self.book_move(game)
+        if book_move is not None:
+            return book_move
         game = game.copy()
         return self.get_minimax_best_move(game)
 
     def get_minimax_best_move(self, game: Game):
-        # Determines the best move by iterating over possible moves and applying the Minimax algorithm
+        # Determines the best move by iterating over possible moves and applying the Minimax algorithm,
+        # maximizing the score for white and minimizing it for black
+        maximizing_player = game.current_turn == 'white'
         best_move = None
-        best_score = float('-inf')
+        best_score = None
         for move in game.get_available_moves():
-            game.attempt_move(move[0], move[1])
-            score = self.minimax(game, self.depth, False)
-            game.undo_move()
-            if score >= best_score:
+            game.push(move[0], move[1])
+            score = self.minimax(game, self.depth, not maximizing_player)
+            game.pop()
+            if best_move is None or (score > best_score if maximizing_player else score < best_score):
                 best_move = move
                 best_score = score
         return best_move
 
     def minimax(self, game: Game, depth, maximizing_player):
         # The Minimax algorithm: recursively calculates the best score for the current player
+        self.nodes += 1
+        if not game.game_over:
+            # Simple endings are looked up instead of searched
+            score = self.bitbase_score(game)
+            if score is not None:
+                return score
         if depth == 0 or game.game_over:
             # Base case: return the evaluated score if the depth is zero or the game is over
             return self.evaluate(game)
@@ -37,18 +54,18 @@ class MinimaxChessAI(ChessAI):
             # Maximizing player: tries to get the highest possible score
             best_score = float('-inf')
             for move in game.get_available_moves():
-                game.attempt_move(move[0], move[1])
+                game.push(move[0], move[1])
                 score = self.minimax(game, depth - 1, False)
-                game.undo_move()
+                game.pop()
                 best_score = max(best_score, score)
             return best_score
         else:
             # Minimizing player: tries to minimize the opponent's score
             best_score = float('inf')
             for move in game.get_available_moves():
-                game.attempt_move(move[0], move[1])
+                game.push(move[0], move[1])
                 score = self.minimax(game, depth - 1, True)
-                game.undo_move()
+                game.pop()
                 best_score = min(best_score, score)
             return best_score
 
@@ -63,32 +80,5 @@ class MinimaxChessAI(ChessAI):
                 # Return 0 for a draw
                 return 0
         else:
-            # Calculate and return the score based on the pieces on the board
-            white_score = 0
-            black_score = 0
-            for piece in game.board.get_all_pieces():
-                if piece.color == 'white':
-                    white_score += self.get_piece_value(piece)
-                else:
-                    black_score += self.get_piece_value(piece)
-            return white_score - black_score
-
-
-    def get_piece_value(self, piece):
-        # Assigns values to chess pieces based on their importance and capabilities
-        if isinstance(piece, Pawn):
-            return 1
-        elif isinstance(piece, Knight):
-            return 3
-        elif isinstance(piece, Bishop):
-            return 3
-        elif isinstance(piece, Rook):
-            return 5
-        elif isinstance(piece, Queen):
-            return 9
-        elif isinstance(piece, King):
-            # King has an arbitrarily high value since losing the king means losing the game
-            return 100
-        else:
-            # Handle unknown piece types
-            raise ValueError('Unknown piece type: {}'.format(piece.get_type()))
+            # Material and piece-square score, kept up to date by the board as moves are made and undone
+            return evaluate_board(game.board)
@@ -1,62 +1,443 @@
+import time
 from ai.chess_ai import ChessAI
-from game_logic.pieces import Bishop, King, Knight, Pawn, Queen, Rook
+from ai.minimax.evaluation import evaluate_board
 from game_logic.game import Game
+from ai.minimax.transposition_table import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from ai.minimax.move_ordering import MoveOrderer
+
+class SearchAborted(Exception):
+    # Raised inside the search when the time or node budget runs out, or stop() is called
+    pass
 
 class MinimaxWithABPruningChessAI(ChessAI):
-    def __init__(self, depth=3):
-        # Initialize the AI with a specified search depth
+    # How many nodes to search between clock checks
+    TIME_CHECK_INTERVAL = 256
+
+    def __init__(self, depth=3, tt_size_mb=16, time_limit=None, node_limit=None, order_moves=True,
+                 quiescence_depth=4, workers=1, opening_book=None, bitbases=None):
+        # Initialize the AI with a maximum search depth, and optionally a time limit in seconds and a node limit
         self.depth = depth
+        # Book moves are played without searching, see ChessAI.book_move
+        self.opening_book = self.load_opening_book(opening_book)
+        # Positions in simple endings get their exact bitbase score instead of being searched
+        self.bitbases = self.load_bitbases(bitbases)
+        self.tt_size_mb = tt_size_mb
+        # How many captures deep to follow exchanges past the search depth, 0 evaluates the horizon directly
+        self.quiescence_depth = quiescence_depth
+        # With order_moves off, moves are searched in generation order but cutoffs are still counted
+        self.order_moves = order_moves
+        self.move_orderer = MoveOrderer()
+        self.root_ply = 0
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        # Results are kept between moves, since keys identify positions regardless of the root
+        self.transposition_table = TranspositionTable(tt_size_mb) if tt_size_mb else None
+        self.nodes = 0
+        self.completed_depth = 0
+        self.best_score = None
+        self.deadline = None
+        self.stop_requested = False
+        # Set by prepare_search for the next choose_move, whose stop flag is then already armed
+        self.search_prepared = False
+        self.root_best_move = None
+        # With more than one worker, root moves are split across a process pool that is created on the first
+        # search and kept until close() is called. Workers are stopped through stop_event.
+        self.workers = workers
+        self.pool = None
+        self.stop_event = None
+        self.search_id = 0
+        # Called with (game, depth, score) after each completed depth of choose_move, e.g. to report progress
+        self.info_callback = None
+
+    def __getstate__(self):
+        # The pool belongs to the process that created it, and the callback to the caller
+        state = self.__dict__.copy()
+        state['pool'] = None
+        state['stop_event'] = None
+        state['info_callback'] = None
+        return state
 
     def choose_move(self, game: Game):
-        # Choose the best move based on the Minimax algorithm
+        # Choose the best move with iterative deepening: search depth 1, 2, 3, ... up to self.depth,
+        # stopping when the time or node budget runs out, and return the best move of the last completed depth
         # Make a copy of the game to avoid altering the original game state
 
+        if not self.search_prepared:
+            # Not started through prepare_search, so a stop sent while no search was running is forgotten
+            self.stop_requested = False
+            if self.pool is not None:
+                self.pool.start()
+        self.search_prepared = False
+        self.nodes = 0
+        self.completed_depth = 0
+        self.best_score = None
+        book_move = self.book_move(game)
+        if book_move is not None:
+            return book_move
+
         game = game.copy()
-        return self.get_minimax_best_move(game)
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+        self.move_orderer.new_search()
+        self.root_ply = len(game.state_stack)
+        self.root_best_move = None
+        self.deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+        self.search_id += 1
+        search_root = self.search_root
+        if self.workers > 1:
+            self.get_pool()
+            search_root = self.search_root_parallel
 
-    def get_minimax_best_move(self, game: Game):
-        # Determines the best move by iterating over possible moves and applying the Minimax algorithm
+        # Taken before searching, an aborted search must not decide which position the fallback move is for
+        root_moves = game.get_available_moves()
         best_move = None
-        best_score = float('-inf')
-        for move in game.get_available_moves():
-            game.attempt_move(move[0], move[1])
-            score = self.minimax(game, self.depth, False, float('-inf'), float('inf'))
-            game.undo_move()
-            if score >= best_score:
-                best_move = move
-                best_score = score
+        for depth in range(1, self.depth + 1):
+            try:
+                best_move, self.best_score = search_root(game, depth, best_move)
+            except SearchAborted:
+                break
+            self.completed_depth = depth
+            if self.info_callback is not None:
+                self.info_callback(game, depth, self.best_score)
+
+        if best_move is None:
+            # Not even depth 1 completed: fall back to the best move found so far, or any legal move
+            best_move = self.root_best_move
+            if best_move is None and root_moves:
+                best_move = root_moves[0]
         return best_move
 
+    def stop(self):
+        # Ask a running search, e.g. on another thread, to finish with the best move found so far
+        self.stop_requested = True
+        if self.pool is not None:
+            self.pool.stop()
+
+    def prepare_search(self):
+        # Clears the stop flag for the next choose_move ahead of time, so a stop sent from another thread
+        # before that search gets going is kept, see ChessAI.prepare_search
+        self.stop_requested = False
+        self.search_prepared = True
+        if self.pool is not None:
+            self.pool.start()
+
+    def close(self):
+        # Shut down the worker processes of a parallel search
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    def get_pool(self):
+        # Start the worker processes on first use, each with an AI that searches like this one on a single core.
+        # The depth is left out, every job is given the depth to search.
+        settings = {'tt_size_mb': self.tt_size_mb, 'order_moves': self.order_moves,
+                    'quiescence_depth': self.quiescence_depth, 'bitbases': self.bitbases}
+        if self.pool is not None and (self.pool.settings != settings or self.pool.workers != self.workers):
+            # Changed since the workers were started, e.g. a new hash size, so start them again
+            self.close()
+        if self.pool is None:
+            from ai.minimax.parallel_search import SearchPool
+            self.pool = SearchPool(self.workers, settings)
+        return self.pool
+
+    def principal_variation(self, game: Game, max_length=64):
+        # Follows the best moves stored in the transposition table from the game's position,
+        # stopping at a missing or illegal move or a repeated position, and leaves the game unchanged
+        if self.transposition_table is None:
+            return []
+        moves = []
+        seen = set()
+        while len(moves) < max_length and game.zobrist_key not in seen:
+            seen.add(game.zobrist_key)
+            move = self.transposition_table.get_best_move(game.zobrist_key)
+            if move is None or move not in game.get_available_moves():
+                break
+            game.push(move[0], move[1])
+            moves.append(move)
+        for _ in moves:
+            game.pop()
+        return moves
+
+    def check_limits(self):
+        # Abort the search if the node or time budget is used up or a stop was requested
+        if self.stop_requested:
+            raise SearchAborted()
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchAborted()
+        if self.nodes % self.TIME_CHECK_INTERVAL == 0:
+            if self.deadline is not None and time.perf_counter() >= self.deadline:
+                raise SearchAborted()
+            if self.stop_event is not None and self.stop_event.is_set():
+                raise SearchAborted()
+
+    def get_minimax_best_move(self, game: Game):
+        # Determines the best move at the configured depth, without iterative deepening
+        return self.search_root(game, self.depth)[0]
+
+    def search_root(self, game: Game, depth, first_move=None):
+        # Searches every move at the root to the given depth and returns the best move and its score,
+        # trying first_move (the best move of the previous iteration) before the others
+        maximizing_player = game.current_turn == 'white'
+        moves = game.get_available_moves()
+        if self.order_moves:
+            moves = self.move_orderer.order_moves(game, moves, 0, first_move)
+        elif first_move is not None and first_move in moves:
+            moves = [first_move] + [move for move in moves if move != first_move]
+
+        best_move = None
+        best_score = float('-inf') if maximizing_player else float('inf')
+        alpha, beta = float('-inf'), float('inf')
+        for move in moves:
+            game.push(move[0], move[1])
+            try:
+                score = self.minimax(game, depth, not maximizing_player, alpha, beta)
+            finally:
+                game.pop()
+            if maximizing_player and (best_move is None or score > best_score):
+                best_move, best_score = move, score
+                alpha = max(alpha, score)
+            elif not maximizing_player and (best_move is None or score < best_score):
+                best_move, best_score = move, score
+                beta = min(beta, score)
+            self.root_best_move = best_move
+
+        if self.transposition_table is not None and best_move is not None:
+            self.transposition_table.store(game.zobrist_key, depth + 1, best_score, EXACT, best_move)
+        return best_move, best_score
+
+    def search_root_parallel(self, game: Game, depth, first_move=None):
+        # Same result as search_root, with the root moves searched by the worker processes.
+        # The first move is searched alone to get a score, then all the others at once against that score,
+        # so they can still be cut off like in the serial search.
+        maximizing_player = game.current_turn == 'white'
+        moves = game.get_available_moves()
+        if self.order_moves:
+            moves = self.move_orderer.order_moves(game, moves, 0, first_move)
+        elif first_move is not None and first_move in moves:
+            moves = [first_move] + [move for move in moves if move != first_move]
+        if not moves:
+            return None, self.evaluate(game)
+        if self.stop_requested:
+            # A pool started after the stop came in does not know about it
+            raise SearchAborted()
+
+        pool = self.get_pool()
+        time_limit = None
+        if self.deadline is not None:
+            time_limit = max(0.0, self.deadline - time.perf_counter())
+        infinity = float('inf')
+        snapshot = game.snapshot()
+
+        score = self.search_root_jobs(pool, snapshot, moves[:1], depth, -infinity, infinity, time_limit)[0]
+        if score is None:
+            raise SearchAborted()
+        best_move, best_score = moves[0], score
+        self.root_best_move = best_move
+
+        alpha, beta = (best_score, infinity) if maximizing_player else (-infinity, best_score)
+        scores = self.search_root_jobs(pool, snapshot, moves[1:], depth, alpha, beta, time_limit)
+        aborted = False
+        for move, score in zip(moves[1:], scores):
+            if score is None:
+                aborted = True
+                continue
+            # Moves that are not better come back with a bound at or beyond the first move's score
+            if (maximizing_player and score > best_score) or (not maximizing_player and score < best_score):
+                best_move, best_score = move, score
+                self.root_best_move = best_move
+        if aborted or self.stop_requested:
+            raise SearchAborted()
+
+        if self.transposition_table is not None:
+            self.transposition_table.store(game.zobrist_key, depth + 1, best_score, EXACT, best_move)
+        return best_move, best_score
+
+    def search_root_jobs(self, pool, snapshot, moves, depth, alpha, beta, time_limit):
+        # Searches root moves in the workers and returns their scores in move order, None for a move that was
+        # stopped or never sent. With a node limit, every job gets a share of the budget that no other job holds,
+        # and more jobs are only sent as running ones finish and hand back what they did not use,
+        # so all the workers together stay within node_limit.
+        if self.node_limit is None:
+            futures = [pool.submit(snapshot, move, depth, alpha, beta, self.search_id, time_limit) for move in moves]
+            results = [future.result() for future in futures]
+            self.nodes += sum(nodes for _, nodes in results)
+            return [score for score, _ in results]
+
+        from concurrent.futures import wait, FIRST_COMPLETED
+        scores = [None] * len(moves)
+        # future -> (index of its move, nodes given to it)
+        running = {}
+        next_index = 0
+        while True:
+            available = self.node_limit - self.nodes - sum(share for _, share in running.values())
+            while next_index < len(moves) and len(running) < pool.workers and not self.stop_requested:
+                share = available // min(pool.workers - len(running), len(moves) - next_index)
+                if share < 1:
+                    break
+                future = pool.submit(snapshot, moves[next_index], depth, alpha, beta, self.search_id, time_limit, share)
+                running[future] = (next_index, share)
+                available -= share
+                next_index += 1
+            if not running:
+                return scores
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, _ = running.pop(future)
+                scores[index], nodes = future.result()
+                self.nodes += nodes
+
+    def search_root_move(self, game: Game, move, depth, alpha, beta, search_id, time_limit=None, node_limit=None):
+        # Runs in a worker process: searches one root move and returns (score, nodes),
+        # with score None if the search was stopped or ran out of time or nodes
+        if search_id != self.search_id:
+            # First move of a new search in this worker
+            self.search_id = search_id
+            if self.transposition_table is not None:
+                self.transposition_table.new_search()
+            self.move_orderer.new_search()
+        self.root_ply = len(game.state_stack)
+        self.nodes = 0
+        self.stop_requested = False
+        self.node_limit = node_limit
+        self.deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        maximizing_player = game.current_turn == 'white'
+        game.push(move[0], move[1])
+        try:
+            score = self.minimax(game, depth, not maximizing_player, alpha, beta)
+        except SearchAborted:
+            score = None
+        finally:
+            game.pop()
+        return score, self.nodes
+
     def minimax(self, game: Game, depth, maximizing_player, alpha, beta):
         # The Minimax algorithm: recursively calculates the best score for the current player
-        if depth == 0 or game.game_over:
-            # Base case: return the evaluated score if the depth is zero or the game is over
+        self.nodes += 1
+        self.check_limits()
+        if game.game_over:
             return self.evaluate(game)
+        # Simple endings are looked up instead of searched
+        score = self.bitbase_score(game)
+        if score is not None:
+            return score
+        if depth == 0:
+            # Base case: settle pending captures before evaluating the position
+            return self.quiescence(game, maximizing_player, alpha, beta, self.quiescence_depth)
+
+        # Look up earlier results for this position: deep enough ones narrow the window, any give a move to try first
+        table = self.transposition_table
+        hash_move = None
+        if table is not None:
+            key = game.zobrist_key
+            entry = table.probe(key)
+            if entry is not None:
+                _, entry_depth, entry_score, bound, hash_move, _ = entry
+                if entry_depth >= depth:
+                    if bound == EXACT:
+                        return entry_score
+                    if bound == LOWER_BOUND:
+                        alpha = max(alpha, entry_score)
+                    else:
+                        beta = min(beta, entry_score)
+                    if beta <= alpha:
+                        return entry_score
+        alpha_original, beta_original = alpha, beta
+
+        ply = len(game.state_stack) - self.root_ply
+        orderer = self.move_orderer
+        moves = game.get_available_moves()
+        if self.order_moves:
+            moves = orderer.order_moves(game, moves, ply, hash_move)
+        orderer.record_node()
 
+        best_move = None
         if maximizing_player:
             # Maximizing player: tries to get the highest possible score
             best_score = float('-inf')
-            for move in game.get_available_moves():
-                game.attempt_move(move[0], move[1])
-                score = self.minimax(game, depth - 1, False, alpha, beta)
-                game.undo_move()
-                best_score = max(best_score, score)
+            for index, move in enumerate(moves):
+                game.push(move[0], move[1])
+                try:
+                    score = self.minimax(game, depth - 1, False, alpha, beta)
+                finally:
+                    game.pop()
+                if best_move is None or score > best_score:
+                    best_score = score
+                    best_move = move
                 alpha = max(alpha, score)
                 if beta <= alpha:
+                    orderer.record_cutoff(game, move, ply, depth, index, hash_move)
                     break
-            return best_score
         else:
             # Minimizing player: tries to minimize the opponent's score
             best_score = float('inf')
-            for move in game.get_available_moves():
-                game.attempt_move(move[0], move[1])
-                score = self.minimax(game, depth - 1, True, alpha, beta)
-                game.undo_move()
-                best_score = min(best_score, score)
+            for index, move in enumerate(moves):
+                game.push(move[0], move[1])
+                try:
+                    score = self.minimax(game, depth - 1, True, alpha, beta)
+                finally:
+                    game.pop()
+                if best_move is None or score < best_score:
+                    best_score = score
+                    best_move = move
                 beta = min(beta, score)
                 if beta <= alpha:
+                    orderer.record_cutoff(game, move, ply, depth, index, hash_move)
                     break
-            return best_score
+
+        if table is not None:
+            if best_score <= alpha_original:
+                bound = UPPER_BOUND
+            elif best_score >= beta_original:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            table.store(key, depth, best_score, bound, best_move)
+        return best_score
+
+    def quiescence(self, game: Game, maximizing_player, alpha, beta, depth):
+        # Searches only captures and promotions until the position is quiet, so the evaluation is not taken
+        # in the middle of an exchange. The side to move may stand pat on the static evaluation instead,
+        # unless it is in check, in which case every move is searched. depth caps how far this goes.
+        self.nodes += 1
+        self.check_limits()
+        if depth == 0 or game.game_over:
+            return self.evaluate(game)
+        score = self.bitbase_score(game)
+        if score is not None:
+            return score
+
+        if game.is_current_player_in_check:
+            best_score = float('-inf') if maximizing_player else float('inf')
+            moves = game.get_available_moves()
+        else:
+            stand_pat = self.evaluate(game)
+            if maximizing_player:
+                if stand_pat >= beta:
+                    return stand_pat
+                alpha = max(alpha, stand_pat)
+            else:
+                if stand_pat <= alpha:
+                    return stand_pat
+                beta = min(beta, stand_pat)
+            best_score = stand_pat
+            moves = game.get_capture_moves()
+
+        ply = len(game.state_stack) - self.root_ply
+        for move in self.move_orderer.order_moves(game, moves, ply):
+            game.push(move[0], move[1])
+            try:
+                score = self.quiescence(game, not maximizing_player, alpha, beta, depth - 1)
+            finally:
+                game.pop()
+            if maximizing_player:
+                best_score = max(best_score, score)
+                alpha = max(alpha, score)
+            else:
+                best_score = min(best_score, score)
+                beta = min(beta, score)
+            if beta <= alpha:
+                break
+        return best_score
 
     def evaluate(self, game: Game):
         # Evaluate the board: a simple heuristic to score the board position
@@ -69,32 +450,5 @@ class MinimaxWithABPruningChessAI(ChessAI):
                 # Return 0 for a draw
                 return 0
         else:
-            # Calculate and return the score based on the pieces on the board
-            white_score = 0
-            black_score = 0
-            for piece in game.board.get_all_pieces():
-                if piece.color == 'white':
-                    white_score += self.get_piece_value(piece)
-                else:
-                    black_score += self.get_piece_value(piece)
-            return white_score - black_score
-
-
-    def get_piece_value(self, piece):
-        # Assigns values to chess pieces based on their importance and capabilities
-        if isinstance(piece, Pawn):
-            return 1
-        elif isinstance(piece, Knight):
-            return 3
-        elif isinstance(piece, Bishop):
-            return 3
-        elif isinstance(piece, Rook):
-            return 5
-        elif isinstance(piece, Queen):
-            return 9
-        elif isinstance(piece, King):
-            # King has an arbitrarily high value since losing the king means losing the game
-            return 100
-        else:
-            # Handle unknown piece types
-            raise ValueError('Unknown piece type: {}'.format(piece.get_type()))
+            # Material and piece-square score, kept up to date by the board as moves are made and undone
+            return evaluate_board(game.board)
@@ -0,0 +1,108 @@
+from game_logic.pieces import PAWN, QUEEN
+
+# Indexed by piece type code: pawn, knight, bishop, rook, queen, king
+PIECE_VALUES = (1, 3, 3, 5, 9, 100)
+
+# Sort keys for each group of moves, far enough apart that groups never overlap
+HASH_MOVE_SCORE = 3000000
+CAPTURE_SCORE = 2000000
+KILLER_SCORE = 1000000
+HISTORY_LIMIT = 500000
+
+MOVE_KINDS = ('hash', 'capture', 'killer', 'quiet')
+
+class MoveOrderer:
+    """
+    Orders moves so alpha-beta finds cutoffs early: the hash (or previous best) move first,
+    then captures and promotions by most valuable victim / least valuable attacker,
+    then the killer moves of the ply, then quiet moves by history score.
+    Also counts beta cutoffs by move kind and by position in the move list.
+    """
+    def __init__(self, max_ply=128):
+        self.max_ply = max_ply
+        self.killers = [[None, None] for _ in range(max_ply)]
+        # (color, move) -> score, raised whenever a quiet move causes a cutoff
+        self.history = {}
+        self.reset_statistics()
+
+    def new_search(self):
+        """Forgets killer moves and fades history scores from the previous search."""
+        self.killers = [[None, None] for _ in range(self.max_ply)]
+        self.history = {key: score // 2 for key, score in self.history.items() if score > 1}
+        self.reset_statistics()
+
+    def reset_statistics(self):
+        self.searched_nodes = 0
+        self.cutoff_nodes = 0
+        self.first_move_cutoffs = 0
+        self.cutoffs_by_kind = dict.fromkeys(MOVE_KINDS, 0)
+
+    def order_moves(self, game, moves, ply, hash_move=None):
+        """Returns a new list with the moves sorted best first."""
+        board = game.board
+        color = game.current_turn
+        killers = self.killers[ply] if ply < self.max_ply else (None, None)
+        history = self.history
+
+        def score(move):
+            if move == hash_move:
+                return HASH_MOVE_SCORE
+            piece = board.get_piece(move[0])
+            promotes = piece.piece_type == PAWN and move[1][0] in (0, 7)
+            if promotes or board.is_capture_move(piece, move[1]):
+                victim = board.get_piece(move[1])
+                victim_value = PIECE_VALUES[victim.piece_type] if victim is not None else PIECE_VALUES[PAWN]
+                if promotes:
+                    victim_value += PIECE_VALUES[QUEEN]
+                return CAPTURE_SCORE + victim_value * 100 - PIECE_VALUES[piece.piece_type]
+            if move == killers[0]:
+                return KILLER_SCORE + 1
+            if move == killers[1]:
+                return KILLER_SCORE
+            return history.get((color, move), 0)
+
+        return sorted(moves, key=score, reverse=True)
+
+    def move_kind(self, game, move, ply, hash_move=None):
+        """Returns which ordering group a move belongs to."""
+        if move == hash_move:
+            return 'hash'
+        board = game.board
+        piece = board.get_piece(move[0])
+        if (piece.piece_type == PAWN and move[1][0] in (0, 7)) or board.is_capture_move(piece, move[1]):
+            return 'capture'
+        if ply < self.max_ply and move in self.killers[ply]:
+            return 'killer'
+        return 'quiet'
+
+    def record_node(self):
+        """Counts a node whose moves were searched."""
+        self.searched_nodes += 1
+
+    def record_cutoff(self, game, move, ply, depth, move_index, hash_move=None):
+        """Counts a beta cutoff, and remembers quiet cutoff moves as killers and in the history table."""
+        self.cutoff_nodes += 1
+        if move_index == 0:
+            self.first_move_cutoffs += 1
+        kind = self.move_kind(game, move, ply, hash_move)
+        self.cutoffs_by_kind[kind] += 1
+        if kind in ('capture', 'hash'):
+            return
+
+        if ply < self.max_ply:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        key = (game.current_turn, move)
+        self.history[key] = min(self.history.get(key, 0) + depth * depth, HISTORY_LIMIT)
+
+    def statistics(self):
+        """Returns the cutoff counters, including the share of cutoffs found on the first move searched."""
+        return {
+            'searched_nodes': self.searched_nodes,
+            'cutoff_nodes': self.cutoff_nodes,
+            'cutoff_rate': self.cutoff_nodes / self.searched_nodes if self.searched_nodes else 0.0,
+            'first_move_cutoff_rate': self.first_move_cutoffs / self.cutoff_nodes if self.cutoff_nodes else 0.0,
+            'cutoffs_by_kind': dict(self.cutoffs_by_kind),
+        }
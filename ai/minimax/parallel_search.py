@@ -0,0 +1,56 @@
+"""Process pool for searching root moves on several cores.
+
+Each worker process keeps its own MinimaxWithABPruningChessAI, with its own transposition table,
+for as long as the pool lives, so neither the process start-up nor the table is paid for on every move.
+Positions are sent as GameSnapshot tuples, which pickle smaller than games.
+A shared event lets the main process stop every worker's search at once.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from game_logic.game import Game
+
+# The worker process's own AI, created by _init_worker
+_worker_ai = None
+
+
+def _init_worker(settings, stop_event):
+    global _worker_ai
+    from ai.minimax.minimax_with_ab_pruning_chess_ai import MinimaxWithABPruningChessAI
+    _worker_ai = MinimaxWithABPruningChessAI(**settings)
+    _worker_ai.stop_event = stop_event
+
+
+def _search_move(snapshot, move, depth, alpha, beta, search_id, time_limit, node_limit):
+    game = Game.from_snapshot(snapshot)
+    return _worker_ai.search_root_move(game, move, depth, alpha, beta, search_id, time_limit, node_limit)
+
+
+class SearchPool:
+    def __init__(self, workers, settings):
+        # settings are the keyword arguments each worker's AI is created with
+        self.workers = workers
+        self.settings = settings
+        context = multiprocessing.get_context()
+        self.stop_event = context.Event()
+        self.executor = ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                            initargs=(settings, self.stop_event))
+
+    def submit(self, snapshot, move, depth, alpha, beta, search_id, time_limit=None, node_limit=None):
+        """
+        Searches one root move of a GameSnapshot in a worker.
+        The future's result is (score, nodes), with score None if the search was stopped.
+        """
+        return self.executor.submit(_search_move, snapshot, move, depth, alpha, beta, search_id, time_limit, node_limit)
+
+    def start(self):
+        """Clears a stop left over from the previous search."""
+        self.stop_event.clear()
+
+    def stop(self):
+        """Stops the search in every worker."""
+        self.stop_event.set()
+
+    def close(self):
+        """Stops the worker processes."""
+        self.stop_event.set()
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,72 @@
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+# Rough size of one stored entry in bytes: the tuple, its key and score objects and a list slot
+ENTRY_BYTES = 160
+
+
+class TranspositionTable:
+    """
+    Fixed-size table of search results, indexed by Zobrist key.
+    Each bucket has two slots: a depth-preferred slot that keeps the deepest result
+    from the current search, and an always-replace slot that takes everything else.
+    Entries are tuples of (key, depth, score, bound, best_move, age).
+    """
+    def __init__(self, size_mb=16):
+        # Round the bucket count down to a power of two so the index is a bit mask
+        buckets = max(1, int(size_mb * 1024 * 1024) // (2 * ENTRY_BYTES))
+        buckets = 1 << (buckets.bit_length() - 1)
+        self.mask = buckets - 1
+        self.depth_preferred = [None] * buckets
+        self.always_replace = [None] * buckets
+        self.age = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def __len__(self):
+        return len(self.depth_preferred) * 2
+
+    def new_search(self):
+        """Marks entries from earlier searches as replaceable in the depth-preferred slots."""
+        self.age += 1
+
+    def clear(self):
+        """Removes every entry."""
+        self.depth_preferred = [None] * len(self.depth_preferred)
+        self.always_replace = [None] * len(self.always_replace)
+
+    def probe(self, key):
+        """Returns the entry stored for a key, or None."""
+        self.probes += 1
+        index = key & self.mask
+        entry = self.depth_preferred[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        entry = self.always_replace[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, score, bound, best_move):
+        """Stores a search result, keeping the deeper result of the current search in the depth-preferred slot."""
+        self.stores += 1
+        index = key & self.mask
+        entry = (key, depth, score, bound, best_move, self.age)
+        current = self.depth_preferred[index]
+        if current is None or current[0] == key or current[5] != self.age or depth >= current[1]:
+            self.depth_preferred[index] = entry
+        else:
+            self.always_replace[index] = entry
+
+    def get_best_move(self, key):
+        """Returns the best move stored for a key, or None."""
+        entry = self.probe(key)
+        return entry[4] if entry is not None else None
+
+    def usage(self):
+        """Returns the fraction of slots in use."""
+        used = sum(entry is not None for entry in self.depth_preferred)
+        used += sum(entry is not None for entry in self.always_replace)
+        return used / len(self)
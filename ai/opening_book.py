@@ -0,0 +1,192 @@
+"""Opening books in a Polyglot-style binary format.
+
+A book is a file of 16-byte big-endian entries sorted by key: a 64-bit position key, a 16-bit move,
+a 16-bit weight and 32 unused learning bits. Moves are packed like Polyglot moves, with the to file in
+bits 0-2, the to rank in bits 3-5, the from file in bits 6-8, the from rank in bits 9-11 and the
+promotion piece in bits 12-14, and castling written as the king taking its own rook.
+
+The keys are this engine's Zobrist keys (Game.zobrist_key) and not the Polyglot random keys, so books
+made by other tools do not match any position here. Build books from PGN with build_book.
+
+OpeningBook memory-maps the file and binary-searches it, so opening a book of any size is instant
+and a lookup reads a few pages. Build a book and try it with:
+
+    python engine.py book build games.pgn --output book.bin --max-ply 20
+    python engine.py book probe book.bin --fen "<fen>"
+"""
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+from game_logic.fen import STARTING_FEN
+from game_logic.game import Game
+from game_logic.notation import move_to_uci
+from game_logic.pgn import read_games
+from game_logic.pieces import PAWN, KING
+
+ENTRY = struct.Struct('>QHHI')
+# Promotion piece code of a queen in a Polyglot move
+QUEEN_PROMOTION = 4
+MAX_WEIGHT = 0xFFFF
+
+
+def encode_move(game, move):
+    """Packs a legal move of the game's position into a 16-bit book move."""
+    (from_y, from_x), (to_y, to_x) = move
+    piece = game.board.get_piece(move[0])
+    promotion = 0
+    if piece.piece_type == KING and abs(to_x - from_x) == 2:
+        # Castling is stored as the king moving to its rook's square
+        to_x = 7 if to_x == 6 else 0
+    elif piece.piece_type == PAWN and to_y in (0, 7):
+        promotion = QUEEN_PROMOTION
+    return to_x | to_y << 3 | from_x << 6 | from_y << 9 | promotion << 12
+
+
+def decode_move(game, code):
+    """Returns the (from_position, to_position) move of a 16-bit book move in the game's position."""
+    from_position = ((code >> 9) & 7, (code >> 6) & 7)
+    to_y, to_x = (code >> 3) & 7, code & 7
+    piece = game.board.get_piece(from_position)
+    if piece is not None and piece.piece_type == KING and from_position[1] == 4 and to_y == from_position[0] \
+            and to_x in (0, 7):
+        to_x = 6 if to_x == 7 else 2
+    return (from_position, (to_y, to_x))
+
+
+class OpeningBook:
+    """A memory-mapped book file. Use it as a context manager, or call close when done."""
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        if size % ENTRY.size:
+            self.file.close()
+            raise ValueError(f'{path} is not a book file: its size is not a multiple of {ENTRY.size} bytes')
+        self.count = size // ENTRY.size
+        # An empty file cannot be mapped, and has nothing to look up anyway
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getstate__(self):
+        # A mapping cannot be pickled, so a copy sent to another process opens the file again
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def entries(self, key):
+        """Returns the (move code, weight) pairs stored for a position key."""
+        # Binary search for the first entry with the key
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if ENTRY.unpack_from(self.data, middle * ENTRY.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        found = []
+        for index in range(low, self.count):
+            entry_key, move, weight, _ = ENTRY.unpack_from(self.data, index * ENTRY.size)
+            if entry_key != key:
+                break
+            found.append((move, weight))
+        return found
+
+    def moves(self, game):
+        """Returns the legal book moves of the game's position as (move, weight) pairs, most weight first."""
+        legal_moves = game.get_available_moves()
+        found = []
+        for code, weight in self.entries(game.zobrist_key):
+            move = decode_move(game, code)
+            # A key collision could name a move that is not legal here
+            if move in legal_moves:
+                found.append((move, weight))
+        found.sort(key=lambda pair: -pair[1])
+        return found
+
+    def choose_move(self, game, rng=random):
+        """Returns a book move picked at random in proportion to the weights, or None if the position is not in the book."""
+        found = [(move, weight) for move, weight in self.moves(game) if weight > 0]
+        if not found:
+            return None
+        moves, weights = zip(*found)
+        return rng.choices(moves, weights)[0]
+
+
+def build_book(pgn_paths, output_path, max_ply=20, min_games=1):
+    """
+    Compiles the games of PGN files into a book and returns the number of entries written.
+    Every move in the first max_ply plies of each game scores 2 for a win of the side that played it,
+    1 for a draw and 0 for a loss, and a move's weight is its total score. Moves played in fewer than
+    min_games games, or that only ever lost, are left out. Weights are scaled down to fit in 16 bits.
+    """
+    # key -> {move code: [games, score]}
+    positions = {}
+    for path in pgn_paths:
+        with open(path, encoding='utf-8', errors='replace') as file:
+            for pgn_game in read_games(file):
+                points = {'1-0': {'white': 2, 'black': 0}, '0-1': {'white': 0, 'black': 2},
+                          '1/2-1/2': {'white': 1, 'black': 1}}.get(pgn_game.result)
+                if points is None:
+                    continue
+                game = Game.from_fen(pgn_game.headers.get('FEN', STARTING_FEN))
+                for move in pgn_game.moves[:max_ply]:
+                    stats = positions.setdefault(game.zobrist_key, {}).setdefault(encode_move(game, move), [0, 0])
+                    stats[0] += 1
+                    stats[1] += points[game.current_turn]
+                    game.push(*move)
+
+    entries = [(key, code, score) for key, moves in positions.items()
+               for code, (games, score) in moves.items() if games >= min_games and score > 0]
+    highest = max((score for _, _, score in entries), default=0)
+    scale = MAX_WEIGHT / highest if highest > MAX_WEIGHT else 1
+    entries.sort()
+    with open(output_path, 'wb') as out:
+        for key, code, score in entries:
+            out.write(ENTRY.pack(key, code, max(1, int(score * scale)), 0))
+    return len(entries)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build or look up opening books.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='compile PGN files into a book')
+    build.add_argument('pgn', nargs='+', help='PGN files to read')
+    build.add_argument('--output', required=True, help='book file to write')
+    build.add_argument('--max-ply', type=int, default=20, help='plies of each game to add')
+    build.add_argument('--min-games', type=int, default=1, help='games a move must be played in to be added')
+    probe = commands.add_parser('probe', help='list the book moves of a position')
+    probe.add_argument('book', help='book file')
+    probe.add_argument('--fen', default=STARTING_FEN, help='position to look up, the start position by default')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        count = build_book(args.pgn, args.output, args.max_ply, args.min_games)
+        print(f'Wrote {count} entries to {args.output}')
+        return 0
+    with OpeningBook(args.book) as book:
+        moves = book.moves(Game.from_fen(args.fen))
+    total = sum(weight for _, weight in moves)
+    for move, weight in moves:
+        print(f'{move_to_uci(move)} weight {weight} ({100 * weight / total:.1f}%)')
+    return 0 if moves else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""Names for the AIs, so they can be picked on a command line or in a config.
+
+An AI spec is a name from AI_CLASSES, optionally followed by a colon and comma-separated keyword
+arguments for the AI's constructor, e.g. 'minimax_ab:depth=4,time_limit=0.5'.
+"""
+import ast
+from ai.minimax.minimax_chess_ai import MinimaxChessAI
+from ai.minimax.minimax_with_ab_pruning_chess_ai import MinimaxWithABPruningChessAI
+from ai.random.random_chess_ai import RandomChessAI
+
+AI_CLASSES = {
+    'random': RandomChessAI,
+    'minimax': MinimaxChessAI,
+    'minimax_ab': MinimaxWithABPruningChessAI,
+}
+
+
+def create_ai(spec):
+    """Returns a new AI from a spec such as 'minimax_ab:depth=3,time_limit=0.1'."""
+    name, _, arguments = spec.partition(':')
+    if name not in AI_CLASSES:
+        raise ValueError(f'Unknown AI {name!r}, expected one of {", ".join(AI_CLASSES)}')
+    kwargs = {}
+    for argument in filter(None, arguments.split(',')):
+        key, equals, value = argument.partition('=')
+        if not equals:
+            raise ValueError(f'Expected key=value in AI spec {spec!r}, got {argument!r}')
+        try:
+            kwargs[key.strip()] = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            raise ValueError(f'Invalid value for {key!r} in AI spec {spec!r}') from None
+    return AI_CLASSES[name](**kwargs)
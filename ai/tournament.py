@@ -0,0 +1,273 @@
+"""Headless engine-vs-engine tournaments.
+
+Two engines play a match of game pairs in worker processes. Both games of a pair start from the same
+random opening, with the engines swapping colours, so neither profits from a lucky opening. Every
+finished game is appended to a JSON lines results file as soon as it comes in, and optionally to a
+PGN file, so a long match can be followed or analysed while it runs and nothing is lost if it stops.
+
+Engines are given as AI specs, see ai/registry.py, e.g. 'minimax_ab:depth=4,time_limit=0.5'.
+
+Run a match from the command line with, for example:
+
+    python -m ai.tournament minimax_ab:depth=3 minimax:depth=2 --games 200 --workers 4 --results match.jsonl
+"""
+import argparse
+import json
+import math
+import random
+import time
+from ai.registry import create_ai
+from game_logic.game import Game
+from game_logic.notation import move_to_uci, uci_to_move
+from game_logic.pgn import write_game
+
+# A clock or node budget for the whole game is shared out as if this many moves were still to come
+MOVES_TO_GO = 30
+# Games still going after this many plies are scored as draws
+MAX_PLIES = 400
+
+
+def random_opening(rng, plies):
+    """Returns up to plies random legal moves from the start position, stopping early if the game ends."""
+    game = Game()
+    moves = []
+    for _ in range(plies):
+        if game.game_over:
+            break
+        move = rng.choice(game.get_available_moves())
+        game.push(*move)
+        moves.append(move)
+    return moves
+
+
+def play_game(index, white_spec, black_spec, opening, seed=None, time_per_game=None, nodes_per_game=None,
+              max_plies=MAX_PLIES):
+    """
+    Plays one game between two engine specs after the opening moves and returns its record as a dict.
+    time_per_game and nodes_per_game give each side a budget for the whole game, of which every move gets
+    a share through the AI's time_limit and node_limit. A side that runs over its clock loses on time.
+    """
+    # Seed the global generator too, RandomChessAI draws from it
+    random.seed(seed)
+    players = {'white': create_ai(white_spec), 'black': create_ai(black_spec)}
+    stats = {color: {'moves': 0, 'time': 0.0, 'nodes': 0} for color in players}
+    clocks = {color: time_per_game for color in players}
+    node_budgets = {color: nodes_per_game for color in players}
+
+    game = Game()
+    for move in opening:
+        game.push(*move)
+    # Count positions for threefold repetition, by Zobrist key
+    seen = {game.zobrist_key: 1}
+    result, termination = None, None
+    while result is None:
+        if game.game_over:
+            termination = 'checkmate' if game.is_checkmate else 'stalemate'
+            result = ('0-1' if game.current_turn == 'white' else '1-0') if game.is_checkmate else '1/2-1/2'
+            break
+        if game.halfmove_clock >= 100:
+            result, termination = '1/2-1/2', 'fifty moves'
+            break
+        if len(game.state_stack) >= max_plies:
+            result, termination = '1/2-1/2', 'max plies'
+            break
+
+        color = game.current_turn
+        ai = players[color]
+        if clocks[color] is not None and hasattr(ai, 'time_limit'):
+            ai.time_limit = clocks[color] / MOVES_TO_GO
+        if node_budgets[color] is not None and hasattr(ai, 'node_limit'):
+            ai.node_limit = max(1, node_budgets[color] // MOVES_TO_GO)
+        start = time.perf_counter()
+        move = ai.choose_move(game)
+        elapsed = time.perf_counter() - start
+
+        stats[color]['moves'] += 1
+        stats[color]['time'] += elapsed
+        nodes = getattr(ai, 'nodes', 0)
+        stats[color]['nodes'] += nodes
+        if node_budgets[color] is not None:
+            node_budgets[color] = max(0, node_budgets[color] - nodes)
+        if clocks[color] is not None:
+            clocks[color] -= elapsed
+            if clocks[color] < 0:
+                result, termination = ('0-1' if color == 'white' else '1-0'), 'time forfeit'
+                break
+        if move is None or not game.push(*move):
+            result, termination = ('0-1' if color == 'white' else '1-0'), 'illegal move'
+            break
+
+        key = game.zobrist_key
+        seen[key] = seen.get(key, 0) + 1
+        if seen[key] >= 3:
+            result, termination = '1/2-1/2', 'repetition'
+
+    for ai in players.values():
+        if hasattr(ai, 'close'):
+            ai.close()
+    return {
+        'game': index,
+        'white': white_spec,
+        'black': black_spec,
+        'result': result,
+        'termination': termination,
+        'plies': len(game.state_stack),
+        'opening': [move_to_uci(move) for move in opening],
+        'moves': [move_to_uci(entry[2:4]) for entry in game.board.history],
+        'stats': stats,
+    }
+
+
+def elo_difference(wins, draws, losses):
+    """
+    Returns the Elo difference implied by a score and its 95% error margin, from the first engine's point of view.
+    The difference is infinite when one side scored every point, and the margin then and before any game is infinite.
+    """
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0, math.inf
+    score = (wins + draws / 2) / games
+    # Standard error of the mean score per game
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    error = math.sqrt(variance / games)
+
+    def elo(p):
+        if p <= 0:
+            return -math.inf
+        if p >= 1:
+            return math.inf
+        return 400 * math.log10(p / (1 - p))
+
+    difference = elo(score)
+    if math.isinf(difference):
+        return difference, math.inf
+    margin = (elo(min(1.0, score + 1.96 * error)) - elo(max(0.0, score - 1.96 * error))) / 2
+    return difference, margin
+
+
+class MatchResults:
+    """Running totals of a match between engine_a and engine_b, updated with each game record."""
+    def __init__(self, engine_a, engine_b):
+        self.engines = (engine_a, engine_b)
+        self.wins = self.draws = self.losses = 0
+        self.terminations = {}
+        # Moves, seconds and nodes of engine_a and engine_b, which may have the same spec
+        self.totals = [{'moves': 0, 'time': 0.0, 'nodes': 0} for _ in self.engines]
+
+    @property
+    def games(self):
+        return self.wins + self.draws + self.losses
+
+    def add(self, record, engine_a_color):
+        """Counts a game record returned by play_game, in which engine_a played engine_a_color."""
+        if record['result'] == '1/2-1/2':
+            self.draws += 1
+        elif (record['result'] == '1-0') == (engine_a_color == 'white'):
+            self.wins += 1
+        else:
+            self.losses += 1
+        self.terminations[record['termination']] = self.terminations.get(record['termination'], 0) + 1
+        engine_b_color = 'black' if engine_a_color == 'white' else 'white'
+        for totals, color in zip(self.totals, (engine_a_color, engine_b_color)):
+            for name, value in record['stats'][color].items():
+                totals[name] += value
+
+    def report(self):
+        """Returns a text summary: W/D/L and Elo for the first engine, and speed figures for both."""
+        difference, margin = elo_difference(self.wins, self.draws, self.losses)
+        lines = [f'{self.engines[0]} vs {self.engines[1]}: {self.games} games',
+                 f'W/D/L: {self.wins}/{self.draws}/{self.losses}',
+                 f'Elo difference: {difference:+.1f} +/- {margin:.1f}',
+                 'Endings: ' + ', '.join(f'{name} {count}' for name, count in sorted(self.terminations.items()))]
+        for engine, totals in zip(self.engines, self.totals):
+            nps = totals['nodes'] / totals['time'] if totals['time'] else 0
+            time_per_move = totals['time'] / totals['moves'] if totals['moves'] else 0
+            lines.append(f'{engine}: {nps:.0f} nodes/s, {time_per_move * 1000:.1f} ms/move')
+        return '\n'.join(lines)
+
+
+def run_match(engine_a, engine_b, games=100, workers=None, opening_plies=8, seed=None, time_per_game=None,
+              nodes_per_game=None, max_plies=MAX_PLIES, results_path=None, pgn_path=None, on_result=None):
+    """
+    Plays games between two engine specs in worker processes and returns the MatchResults.
+    Games come in pairs from the same random opening of opening_plies moves, with colours swapped.
+    Each finished game is appended to results_path as a JSON line and to pgn_path as PGN, if given,
+    and passed to on_result.
+    """
+    # Imported here so worker processes, which only need play_game, start without the pool machinery
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    rng = random.Random(seed)
+    tasks = []
+    for index in range(games):
+        if index % 2 == 0:
+            opening = random_opening(rng, opening_plies)
+        white, black = (engine_a, engine_b) if index % 2 == 0 else (engine_b, engine_a)
+        tasks.append((index, white, black, opening, rng.getrandbits(32)))
+
+    results = MatchResults(engine_a, engine_b)
+    results_file = open(results_path, 'a') if results_path else None
+    pgn_file = open(pgn_path, 'a') if pgn_path else None
+    try:
+        with ProcessPoolExecutor(workers) as executor:
+            futures = [executor.submit(play_game, index, white, black, opening, game_seed, time_per_game,
+                                       nodes_per_game, max_plies)
+                       for index, white, black, opening, game_seed in tasks]
+            for future in as_completed(futures):
+                record = future.result()
+                # engine_a is white in the first game of each pair
+                results.add(record, 'white' if record['game'] % 2 == 0 else 'black')
+                if results_file is not None:
+                    results_file.write(json.dumps(record) + '\n')
+                    results_file.flush()
+                if pgn_file is not None:
+                    write_pgn_record(pgn_file, record)
+                    pgn_file.flush()
+                if on_result is not None:
+                    on_result(record, results)
+    finally:
+        for file in (results_file, pgn_file):
+            if file is not None:
+                file.close()
+    return results
+
+
+def write_pgn_record(out, record):
+    """Writes the game of a play_game record as PGN."""
+    game = Game()
+    for move in record['moves']:
+        game.push(*uci_to_move(move))
+    write_game(out, game, {'Event': 'Engine match', 'Round': str(record['game'] + 1), 'White': record['white'],
+                           'Black': record['black'], 'Result': record['result'],
+                           'Termination': record['termination']})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Play a headless match between two engines.')
+    parser.add_argument('engine_a', help="first engine spec, e.g. 'minimax_ab:depth=3'")
+    parser.add_argument('engine_b', help="second engine spec, e.g. 'random'")
+    parser.add_argument('--games', type=int, default=100, help='number of games, played in pairs with colours swapped')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes, default one per CPU')
+    parser.add_argument('--opening-plies', type=int, default=8, help='random moves played before the engines take over')
+    parser.add_argument('--seed', type=int, default=None, help='seed for the openings, for repeatable matches')
+    parser.add_argument('--time-per-game', type=float, default=None, help='seconds on each side\'s clock')
+    parser.add_argument('--nodes-per-game', type=int, default=None, help='nodes each side may search in a game')
+    parser.add_argument('--max-plies', type=int, default=MAX_PLIES, help='plies after which a game is drawn')
+    parser.add_argument('--results', default=None, help='JSON lines file that each game is appended to')
+    parser.add_argument('--pgn', default=None, help='PGN file that each game is appended to')
+    args = parser.parse_args(argv)
+
+    # Fail on a bad spec before starting any process
+    create_ai(args.engine_a)
+    create_ai(args.engine_b)
+
+    def progress(record, results):
+        print(f'Game {record["game"] + 1}: {record["white"]} - {record["black"]} {record["result"]} '
+              f'({record["termination"]}), W/D/L {results.wins}/{results.draws}/{results.losses}', flush=True)
+
+    results = run_match(args.engine_a, args.engine_b, args.games, args.workers, args.opening_plies, args.seed,
+                        args.time_per_game, args.nodes_per_game, args.max_plies, args.results, args.pgn, progress)
+    print(results.report())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+"""Universal Chess Interface (UCI) front-end, so the AIs can be run by chess GUIs and match managers.
+
+Commands are read from stdin and answers written to stdout. Searches run on a background thread,
+so stop, isready and quit are answered while the engine thinks. Start it with:
+
+    python engine.py uci --ai minimax_ab:tt_size_mb=64
+
+Pawns always promote to a queen in this engine, so a promotion letter in a move is ignored and
+bestmove names a queen promotion with a trailing 'q'.
+
+UCI depths count plies from the root, while an AI's depth counts the plies searched after each root
+move. go depth N therefore searches with an AI depth of N - 1, and info depth reports the AI's depth
+plus one. The AI searches at least one ply after the root move, so go depth 1 searches like go depth 2.
+"""
+import argparse
+import math
+import sys
+import threading
+import time
+from ai.background_search import BackgroundSearch
+from ai.registry import create_ai
+from game_logic.fen import STARTING_FEN
+from game_logic.game import Game
+from game_logic.notation import move_to_uci, uci_to_move
+from game_logic.pieces import PAWN
+
+ENGINE_NAME = 'ChessAI'
+ENGINE_AUTHOR = 'ChessAI contributors'
+# Depth searched when go only gives a time or node limit, or is infinite
+MAX_DEPTH = 64
+# A clock is shared out as if this many moves were still to come, unless go gives movestogo
+MOVES_TO_GO = 30
+# Never plan to use more than this share of the remaining clock on one move
+MAX_CLOCK_SHARE = 0.5
+
+
+def uci_move(game, move):
+    """Returns a move in UCI notation, with the 'q' suffix UCI expects for promotions."""
+    text = move_to_uci(move)
+    piece = game.board.get_piece(move[0])
+    if piece is not None and piece.piece_type == PAWN and move[1][0] in (0, 7):
+        text += 'q'
+    return text
+
+
+class UCIEngine:
+    """Runs the UCI protocol for an AI, writing answers to out. Feed it lines with handle, or a stream with run."""
+    def __init__(self, ai_spec='minimax_ab', out=sys.stdout):
+        self.ai_spec = ai_spec
+        self.ai = create_ai(ai_spec)
+        self.default_depth = getattr(self.ai, 'depth', None)
+        self.out = out
+        # Answers come from the protocol thread and the search thread
+        self.output_lock = threading.Lock()
+        self.search = BackgroundSearch(self.ai)
+        self.game = Game()
+        self.search_game = None
+        self.search_start = None
+        self.infinite = False
+        self.stopped = False
+        self.pending_move = None
+
+    def send(self, line):
+        with self.output_lock:
+            self.out.write(line + '\n')
+            self.out.flush()
+
+    def run(self, stream=sys.stdin):
+        """Handles commands from a stream until quit or the end of the stream."""
+        for line in stream:
+            if not self.handle(line):
+                break
+        self.stop_search()
+        self.search.shutdown()
+
+    def handle(self, line):
+        """Handles one command line, returns False after quit."""
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, arguments = tokens[0], tokens[1:]
+        if command == 'quit':
+            return False
+        handler = getattr(self, 'command_' + command, None)
+        if handler is None:
+            self.send(f'info string Unknown command: {command}')
+        else:
+            handler(arguments)
+        return True
+
+    def command_uci(self, arguments):
+        self.send(f'id name {ENGINE_NAME} ({self.ai_spec})')
+        self.send(f'id author {ENGINE_AUTHOR}')
+        if hasattr(self.ai, 'tt_size_mb'):
+            self.send(f'option name Hash type spin default {self.ai.tt_size_mb} min 1 max 4096')
+        if hasattr(self.ai, 'workers'):
+            self.send(f'option name Threads type spin default {self.ai.workers} min 1 max 256')
+        self.send('uciok')
+
+    def command_isready(self, arguments):
+        self.send('readyok')
+
+    def command_debug(self, arguments):
+        pass
+
+    def command_setoption(self, arguments):
+        # setoption name <name> [value <value>], names may contain spaces
+        text = ' '.join(arguments)
+        name, _, value = text.partition(' value ')
+        name = name.removeprefix('name ').strip().lower()
+        if self.search.is_thinking():
+            self.send('info string Options cannot be changed during a search')
+            return
+        try:
+            if name == 'hash' and hasattr(self.ai, 'tt_size_mb'):
+                from ai.minimax.transposition_table import TranspositionTable
+                self.ai.tt_size_mb = int(value)
+                self.ai.transposition_table = TranspositionTable(self.ai.tt_size_mb)
+            elif name == 'threads' and hasattr(self.ai, 'workers'):
+                # The pool is started again with the new size on the next search
+                self.ai.close()
+                self.ai.workers = max(1, int(value))
+            else:
+                self.send(f'info string Unknown option: {name}')
+        except ValueError:
+            self.send(f'info string Invalid value for {name}: {value}')
+
+    def command_ucinewgame(self, arguments):
+        self.stop_search()
+        self.game = Game()
+        table = getattr(self.ai, 'transposition_table', None)
+        if table is not None:
+            table.clear()
+
+    def command_position(self, arguments):
+        # position (startpos | fen <fen>) [moves <move> ...]
+        if 'moves' in arguments:
+            split = arguments.index('moves')
+            setup, moves = arguments[:split], arguments[split + 1:]
+        else:
+            setup, moves = arguments, []
+        try:
+            if setup[:1] == ['startpos']:
+                game = Game.from_fen(STARTING_FEN)
+            elif setup[:1] == ['fen']:
+                game = Game.from_fen(' '.join(setup[1:]))
+            else:
+                raise ValueError('Expected startpos or fen')
+            for text in moves:
+                move = uci_to_move(text)
+                if move not in game.get_available_moves():
+                    raise ValueError(f'Illegal move {text}')
+                game.push(*move)
+        except ValueError as error:
+            self.send(f'info string Invalid position: {error}')
+            return
+        self.game = game
+
+    def command_go(self, arguments):
+        if self.search.is_thinking():
+            self.send('info string Already searching')
+            return
+        options = {}
+        index = 0
+        while index < len(arguments):
+            name = arguments[index]
+            if name in ('infinite', 'ponder'):
+                # Pondering is not offered as an option, so a ponder flag is searched like a normal go
+                options[name] = True
+                index += 1
+            elif name == 'searchmoves':
+                # Not supported, every legal move is searched
+                break
+            else:
+                if index + 1 < len(arguments):
+                    try:
+                        options[name] = int(arguments[index + 1])
+                    except ValueError:
+                        self.send(f'info string Invalid value for {name}: {arguments[index + 1]}')
+                        return
+                index += 2
+
+        ai = self.ai
+        self.infinite = options.get('infinite', False)
+        time_limit = self.time_limit(options)
+        depth = options.get('depth')
+        if depth is not None:
+            depth = max(1, depth - 1)
+        else:
+            limited = self.infinite or time_limit is not None or 'nodes' in options
+            depth = MAX_DEPTH if limited else self.default_depth
+        if hasattr(ai, 'depth') and depth is not None:
+            ai.depth = depth
+        if hasattr(ai, 'time_limit'):
+            ai.time_limit = time_limit
+        if hasattr(ai, 'node_limit'):
+            ai.node_limit = options.get('nodes')
+        if hasattr(ai, 'info_callback'):
+            ai.info_callback = self.send_info
+
+        self.stopped = False
+        self.pending_move = None
+        self.search_game = self.game
+        self.search_start = time.perf_counter()
+        self.search.start(self.game, self.search_done)
+
+    def time_limit(self, options):
+        # Returns the seconds to search for, from movetime or the side to move's clock, or None for no limit
+        if 'movetime' in options:
+            return options['movetime'] / 1000
+        clock = options.get('wtime' if self.game.current_turn == 'white' else 'btime')
+        if clock is None:
+            return None
+        increment = options.get('winc' if self.game.current_turn == 'white' else 'binc', 0)
+        moves_to_go = max(1, options.get('movestogo', MOVES_TO_GO))
+        planned = clock / moves_to_go + increment * 0.8
+        return max(1, min(planned, clock * MAX_CLOCK_SHARE)) / 1000
+
+    def command_stop(self, arguments):
+        self.stop_search()
+
+    def stop_search(self):
+        """Stops a running search and waits for its bestmove to be sent."""
+        self.stopped = True
+        if self.search.is_thinking():
+            self.ai.stop()
+            self.search.thread.join()
+        self.send_pending_move()
+
+    def search_done(self, future):
+        # Runs on the search thread. An infinite search only reports its move once it is stopped.
+        if future.cancelled():
+            return
+        move = future.result()
+        self.pending_move = uci_move(self.search_game, move) if move is not None else '0000'
+        if not self.infinite or self.stopped:
+            self.send_pending_move()
+
+    def send_pending_move(self):
+        with self.output_lock:
+            move, self.pending_move = self.pending_move, None
+        if move is not None:
+            self.send(f'bestmove {move}')
+
+    def send_info(self, game, depth, score):
+        # Called by the AI on the search thread after each completed depth, which is one ply short of a UCI depth
+        elapsed = max(time.perf_counter() - self.search_start, 1e-6)
+        nodes = getattr(self.ai, 'nodes', 0)
+        pv = self.ai.principal_variation(game) if hasattr(self.ai, 'principal_variation') else []
+        self.send(f'info depth {depth + 1} score {self.uci_score(game, score, pv)} nodes {nodes} '
+                  f'nps {int(nodes / elapsed)} time {int(elapsed * 1000)} '
+                  f'pv {" ".join(self.pv_moves(game, pv))}'.rstrip())
+
+    @staticmethod
+    def uci_score(game, score, pv):
+        # Scores are from white's point of view, UCI wants them from the side to move's
+        sign = 1 if game.current_turn == 'white' else -1
+        if math.isinf(score):
+            # The AI does not track mate distance, so take it from the principal variation
+            moves = max(1, (len(pv) + 1) // 2)
+            return f'mate {moves if score * sign > 0 else -moves}'
+        return f'cp {int(score * sign)}'
+
+    @staticmethod
+    def pv_moves(game, pv):
+        texts = []
+        for move in pv:
+            texts.append(uci_move(game, move))
+            game.push(move[0], move[1])
+        for _ in pv:
+            game.pop()
+        return texts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run an AI as a UCI engine on stdin and stdout.')
+    parser.add_argument('--ai', default='minimax_ab', help="AI spec, e.g. 'minimax_ab:tt_size_mb=64'")
+    args = parser.parse_args(argv)
+    engine = UCIEngine(args.ai)
+    engine.run()
+    if hasattr(engine.ai, 'close'):
+        engine.ai.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
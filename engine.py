@@ -0,0 +1,69 @@
+"""Headless entry point for the engine, for the command line, worker processes and scripts.
+
+Nothing here imports pygame, so it runs on machines without a display. Each command imports only
+the modules it needs, so every command starts quickly:
+
+    python engine.py move --fen "<fen>" --ai minimax_ab:depth=4
+    python engine.py match minimax_ab:depth=3 random --games 100
+    python engine.py uci --ai minimax_ab
+    python engine.py perft --depth 4
+    python engine.py importtime
+
+The GUI is started with main.py.
+"""
+import argparse
+import importlib
+import sys
+
+# command -> (module with a main(argv) function, or None for a command defined here, help text)
+COMMANDS = {
+    'move': (None, 'print the move an AI chooses in a position'),
+    'match': ('ai.tournament', 'play a headless match between two AIs'),
+    'uci': ('ai.uci', 'run an AI as a UCI engine on stdin and stdout'),
+    'book': ('ai.opening_book', 'build an opening book from PGN or list the book moves of a position'),
+    'bitbases': ('ai.bitbases', 'generate the KQK, KRK and KPK endgame bitbases'),
+    'perft': ('game_logic.perft', 'count move generator leaf nodes'),
+    'importtime': ('utils.import_time', 'measure cold import times of the headless modules'),
+}
+
+
+def move_main(argv=None):
+    from ai.registry import create_ai
+    from game_logic.fen import STARTING_FEN
+    from game_logic.game import Game
+    from game_logic.notation import move_to_uci
+
+    parser = argparse.ArgumentParser(prog='engine.py move', description=COMMANDS['move'][1])
+    parser.add_argument('--fen', default=STARTING_FEN, help='position to search, the start position by default')
+    parser.add_argument('--ai', default='minimax_ab:depth=3', help="AI spec, e.g. 'minimax_ab:depth=4,time_limit=1'")
+    args = parser.parse_args(argv)
+
+    ai = create_ai(args.ai)
+    try:
+        move = ai.choose_move(Game.from_fen(args.fen))
+    finally:
+        if hasattr(ai, 'close'):
+            ai.close()
+    if move is None:
+        print('(none)')
+        return 1
+    print(move_to_uci(move))
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        lines = [f'usage: engine.py {{{",".join(COMMANDS)}}} ...', '']
+        lines += [f'  {command:<12}{help_text}' for command, (_, help_text) in COMMANDS.items()]
+        print('\n'.join(lines), file=sys.stderr)
+        return 0 if argv and argv[0] in ('-h', '--help') else 2
+    command, argv = argv[0], argv[1:]
+    module_name = COMMANDS[command][0]
+    if module_name is None:
+        return move_main(argv)
+    return importlib.import_module(module_name).main(argv)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
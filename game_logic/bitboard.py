@@ -0,0 +1,277 @@
+"""Bitboard backed chessboard.
+
+Squares are numbered y * 8 + x, so bit 0 is a1 and bit 63 is h8. Each colour keeps one
+64-bit integer per piece type code plus an occupancy integer, updated in set_piece alongside
+the piece array that the rest of the game reads through get_piece.
+
+Legal moves are generated from the bitboards. Checkers and pinned pieces are found once per
+position, so moves do not have to be made on the board to see if they leave the king in check.
+"""
+from game_logic.board import Chessboard
+from game_logic.pieces import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+
+
+def square_index(position):
+    """Returns the bit index of a (y, x) position."""
+    return position[0] * 8 + position[1]
+
+
+def index_to_square(index):
+    """Returns the (y, x) position of a bit index."""
+    return (index >> 3, index & 7)
+
+
+def iterate_bits(bitboard):
+    """Yields the index of every set bit, lowest first."""
+    while bitboard:
+        lowest = bitboard & -bitboard
+        yield lowest.bit_length() - 1
+        bitboard ^= lowest
+
+
+def _step_attacks(offsets):
+    table = []
+    for index in range(64):
+        y, x = index_to_square(index)
+        attacks = 0
+        for dy, dx in offsets:
+            if 0 <= y + dy < 8 and 0 <= x + dx < 8:
+                attacks |= 1 << square_index((y + dy, x + dx))
+        table.append(attacks)
+    return table
+
+
+def _ray(index, dy, dx):
+    y, x = index_to_square(index)
+    ray = 0
+    y, x = y + dy, x + dx
+    while 0 <= y < 8 and 0 <= x < 8:
+        ray |= 1 << square_index((y, x))
+        y, x = y + dy, x + dx
+    return ray
+
+
+KNIGHT_ATTACKS = _step_attacks(((2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1)))
+KING_ATTACKS = _step_attacks(((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)))
+# Squares attacked by a pawn of the given colour standing on each square
+PAWN_ATTACKS = {
+    'white': _step_attacks(((1, -1), (1, 1))),
+    'black': _step_attacks(((-1, -1), (-1, 1))),
+}
+
+# Rays running towards higher bit indices stop at their lowest blocker, the others at their highest
+POSITIVE_ROOK_RAYS = [[_ray(i, dy, dx) for i in range(64)] for dy, dx in ((1, 0), (0, 1))]
+NEGATIVE_ROOK_RAYS = [[_ray(i, dy, dx) for i in range(64)] for dy, dx in ((-1, 0), (0, -1))]
+POSITIVE_BISHOP_RAYS = [[_ray(i, dy, dx) for i in range(64)] for dy, dx in ((1, 1), (1, -1))]
+NEGATIVE_BISHOP_RAYS = [[_ray(i, dy, dx) for i in range(64)] for dy, dx in ((-1, 1), (-1, -1))]
+
+
+def _between(index, other):
+    # Squares strictly between two squares on a line, or 0 if they do not share a line
+    y, x = index_to_square(index)
+    other_y, other_x = index_to_square(other)
+    dy, dx = other_y - y, other_x - x
+    if index == other or not (dy == 0 or dx == 0 or abs(dy) == abs(dx)):
+        return 0
+    step_y, step_x = (dy > 0) - (dy < 0), (dx > 0) - (dx < 0)
+    between = 0
+    y, x = y + step_y, x + step_x
+    while (y, x) != (other_y, other_x):
+        between |= 1 << square_index((y, x))
+        y, x = y + step_y, x + step_x
+    return between
+
+
+BETWEEN = [[_between(index, other) for other in range(64)] for index in range(64)]
+ALL_SQUARES = (1 << 64) - 1
+
+
+def _slider_attacks(index, occupied, positive_rays, negative_rays):
+    attacks = 0
+    for rays in positive_rays:
+        ray = rays[index]
+        blockers = ray & occupied
+        if blockers:
+            ray ^= rays[(blockers & -blockers).bit_length() - 1]
+        attacks |= ray
+    for rays in negative_rays:
+        ray = rays[index]
+        blockers = ray & occupied
+        if blockers:
+            ray ^= rays[blockers.bit_length() - 1]
+        attacks |= ray
+    return attacks
+
+
+def rook_attacks(index, occupied):
+    """Returns the squares a rook on index attacks, up to and including the first blocker in each direction."""
+    return _slider_attacks(index, occupied, POSITIVE_ROOK_RAYS, NEGATIVE_ROOK_RAYS)
+
+
+def bishop_attacks(index, occupied):
+    """Returns the squares a bishop on index attacks, up to and including the first blocker in each direction."""
+    return _slider_attacks(index, occupied, POSITIVE_BISHOP_RAYS, NEGATIVE_BISHOP_RAYS)
+
+
+class BitboardChessboard(Chessboard):
+    def index_pieces(self):
+        """Rebuilds the piece lists, king positions, evaluation totals and bitboards from the board."""
+        super().index_pieces()
+        self.sync_bitboards()
+
+    def copy(self):
+        """Returns an independent copy of the board, including its history and bitboards."""
+        board_copy = super().copy()
+        board_copy.piece_bitboards = {color: list(bitboards) for color, bitboards in self.piece_bitboards.items()}
+        board_copy.color_bitboards = dict(self.color_bitboards)
+        return board_copy
+
+    def sync_bitboards(self):
+        """Rebuilds every bitboard from the piece array."""
+        self.piece_bitboards = {'white': [0] * 6, 'black': [0] * 6}
+        self.color_bitboards = {'white': 0, 'black': 0}
+        for y in range(8):
+            for x in range(8):
+                piece = self.board[y][x]
+                if piece:
+                    bit = 1 << (y * 8 + x)
+                    self.piece_bitboards[piece.color][piece.piece_type] |= bit
+                    self.color_bitboards[piece.color] |= bit
+
+    @property
+    def occupied(self):
+        """Returns the bitboard of all occupied squares."""
+        return self.color_bitboards['white'] | self.color_bitboards['black']
+
+    def set_piece(self, piece, position):
+        """Sets a piece at the given position on the chessboard."""
+        y, x = position
+        bit = 1 << (y * 8 + x)
+        old_piece = self.board[y][x]
+        if old_piece is not None:
+            self.piece_bitboards[old_piece.color][old_piece.piece_type] &= ~bit
+            self.color_bitboards[old_piece.color] &= ~bit
+        if piece is not None:
+            self.piece_bitboards[piece.color][piece.piece_type] |= bit
+            self.color_bitboards[piece.color] |= bit
+        super().set_piece(piece, position)
+
+    def is_square_under_attack(self, position, attacker_color):
+        """Checks if a square is under attack."""
+        index = position[0] * 8 + position[1]
+        return bool(self.attackers(index, attacker_color, self.occupied))
+
+    def attackers(self, index, attacker_color, occupied):
+        """Returns the bitboard of the attacker's pieces that attack a square, with sliders blocked by occupied."""
+        pieces = self.piece_bitboards[attacker_color]
+        # A pawn attacks this square if a defending pawn here would attack it back
+        defender_color = 'black' if attacker_color == 'white' else 'white'
+        found = KNIGHT_ATTACKS[index] & pieces[KNIGHT] | KING_ATTACKS[index] & pieces[KING] \
+            | PAWN_ATTACKS[defender_color][index] & pieces[PAWN]
+        straight = pieces[ROOK] | pieces[QUEEN]
+        if straight:
+            found |= rook_attacks(index, occupied) & straight
+        diagonal = pieces[BISHOP] | pieces[QUEEN]
+        if diagonal:
+            found |= bishop_attacks(index, occupied) & diagonal
+        return found
+
+    def generate_legal_moves(self, color):
+        """Yields the legal moves for a colour, in the same way as Chessboard.generate_legal_moves."""
+        return self.generate_moves(color, False)
+
+    def generate_legal_captures(self, color):
+        """Yields the legal captures and promotions for a colour, in the same way as Chessboard.generate_legal_captures."""
+        return self.generate_moves(color, True)
+
+    def generate_moves(self, color, captures_only):
+        """
+        Yields legal moves from the bitboards. Checks and pins are worked out once for the position, so only
+        en passant captures are made on the board to test them, instead of every move.
+        """
+        pieces = self.piece_bitboards[color]
+        if not pieces[KING]:
+            # Positions set up without a king are left to the array board
+            if captures_only:
+                yield from super().generate_legal_captures(color)
+            else:
+                yield from super().generate_legal_moves(color)
+            return
+        enemy_color = 'black' if color == 'white' else 'white'
+        enemy_pieces = self.piece_bitboards[enemy_color]
+        own = self.color_bitboards[color]
+        enemy = self.color_bitboards[enemy_color]
+        occupied = own | enemy
+        king = pieces[KING].bit_length() - 1
+
+        # Moves other than the king's must take or block a single checker, and none help against two
+        checkers = self.attackers(king, enemy_color, occupied)
+        if not checkers:
+            check_mask = ALL_SQUARES
+        elif checkers & (checkers - 1):
+            check_mask = 0
+        else:
+            check_mask = checkers | BETWEEN[king][checkers.bit_length() - 1]
+
+        # A pinned piece may only move along the line between its king and the pinning slider
+        pins = {}
+        snipers = rook_attacks(king, enemy) & (enemy_pieces[ROOK] | enemy_pieces[QUEEN]) \
+            | bishop_attacks(king, enemy) & (enemy_pieces[BISHOP] | enemy_pieces[QUEEN])
+        for sniper in iterate_bits(snipers):
+            blockers = BETWEEN[king][sniper] & occupied
+            if blockers & own and not blockers & (blockers - 1):
+                pins[blockers.bit_length() - 1] = BETWEEN[king][sniper] | 1 << sniper
+
+        targets_allowed = enemy if captures_only else ~own
+        for piece_type in (KNIGHT, BISHOP, ROOK, QUEEN):
+            for from_index in iterate_bits(pieces[piece_type]):
+                if piece_type == KNIGHT:
+                    attacks = KNIGHT_ATTACKS[from_index]
+                elif piece_type == BISHOP:
+                    attacks = bishop_attacks(from_index, occupied)
+                elif piece_type == ROOK:
+                    attacks = rook_attacks(from_index, occupied)
+                else:
+                    attacks = rook_attacks(from_index, occupied) | bishop_attacks(from_index, occupied)
+                targets = attacks & targets_allowed & check_mask & pins.get(from_index, ALL_SQUARES)
+                from_position = index_to_square(from_index)
+                for to_index in iterate_bits(targets):
+                    yield (from_position, index_to_square(to_index))
+
+        forward = 8 if color == 'white' else -8
+        start_rank, last_rank = (1, 7) if color == 'white' else (6, 0)
+        for from_index in iterate_bits(pieces[PAWN]):
+            targets = PAWN_ATTACKS[color][from_index] & enemy
+            one_step = from_index + forward
+            if not occupied >> one_step & 1:
+                if not captures_only or one_step >> 3 == last_rank:
+                    targets |= 1 << one_step
+                two_steps = one_step + forward
+                if not captures_only and from_index >> 3 == start_rank and not occupied >> two_steps & 1:
+                    targets |= 1 << two_steps
+            targets &= check_mask & pins.get(from_index, ALL_SQUARES)
+            from_position = index_to_square(from_index)
+            for to_index in iterate_bits(targets):
+                yield (from_position, index_to_square(to_index))
+
+        # En passant removes two pieces from a line, which pins do not cover, so it is tried on the board
+        if self.history:
+            piece, _, old_position, new_position, _ = self.history[-1]
+            if piece.piece_type == PAWN and piece.color == enemy_color and abs(new_position[0] - old_position[0]) == 2:
+                target = ((old_position[0] + new_position[0]) // 2, new_position[1])
+                for from_index in iterate_bits(PAWN_ATTACKS[enemy_color][square_index(target)] & pieces[PAWN]):
+                    from_position = index_to_square(from_index)
+                    if not self.leaves_king_in_check(from_position, target, color):
+                        yield (from_position, target)
+
+        # The king may not step onto an attacked square, including one behind it on the line of a checking slider
+        from_position = index_to_square(king)
+        without_king = occupied ^ 1 << king
+        for to_index in iterate_bits(KING_ATTACKS[king] & targets_allowed):
+            if not self.attackers(to_index, enemy_color, without_king):
+                yield (from_position, index_to_square(to_index))
+        king_piece = self.board[from_position[0]][from_position[1]]
+        if not captures_only and not checkers and not king_piece.has_moved and from_position[1] == 4:
+            for new_x in (2, 6):
+                if king_piece.can_castle((from_position[0], new_x), self):
+                    yield (from_position, (from_position[0], new_x))
@@ -1,9 +1,35 @@
+from collections import namedtuple
 from game_logic.pieces import Pawn, Rook, Knight, Bishop, Queen, King
+from game_logic.pieces import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+from game_logic.pieces import KNIGHT_OFFSETS, KING_OFFSETS, ROOK_DIRECTIONS, BISHOP_DIRECTIONS
+from game_logic.zobrist import PIECE_KEYS, CASTLING_KEYS, EN_PASSANT_KEYS
+from game_logic.zobrist import WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE
+from game_logic.psqt import MIDDLEGAME_SCORES, ENDGAME_SCORES, PHASE_WEIGHTS
+
+PIECE_CLASSES = (Pawn, Knight, Bishop, Rook, Queen, King)
+
+# Immutable copy of a board's raw state, made of tuples so any number of holders can share it and it pickles
+# cheaply for other processes. A mutable board is only built from it, by Chessboard.from_snapshot, when someone
+# wants to make moves: copy on write.
+# pieces holds (piece type code, colour, position, has_moved) for every piece on the board or in the history,
+# squares holds a piece number, or -1 for empty, for each y * 8 + x, and history holds the board history
+# entries with piece numbers in place of pieces.
+BoardSnapshot = namedtuple('BoardSnapshot', ('board_class', 'pieces', 'squares', 'history'))
+
+# (castling right, colour, king square, rook square)
+CASTLING_SQUARES = (
+    (WHITE_KINGSIDE, 'white', (0, 4), (0, 7)),
+    (WHITE_QUEENSIDE, 'white', (0, 4), (0, 0)),
+    (BLACK_KINGSIDE, 'black', (7, 4), (7, 7)),
+    (BLACK_QUEENSIDE, 'black', (7, 4), (7, 0)),
+)
 
 class Chessboard:
     def __init__(self):
         self.board = self.create_board()
         self.history = []
+        self.index_pieces()
+        self.refresh_zobrist_key()
 
     """Board layout:
 
@@ -44,6 +70,29 @@ class Chessboard:
     def reset_board(self):
         """Resets the board to its initial state."""
         self.board = self.create_board()
+        self.history = []
+        self.index_pieces()
+        self.refresh_zobrist_key()
+
+    def index_pieces(self):
+        """Rebuilds the per-colour piece lists, king positions and evaluation totals from the board."""
+        # Kept up to date by set_piece, which every move, special move and undo goes through
+        self.pieces = {'white': {}, 'black': {}}
+        self.king_positions = {'white': None, 'black': None}
+        # Material plus piece-square scores from white's point of view, and the game phase
+        self.middlegame_score = 0
+        self.endgame_score = 0
+        self.phase = 0
+        for y in range(8):
+            for x in range(8):
+                piece = self.board[y][x]
+                if piece:
+                    self.pieces[piece.color][(y, x)] = piece
+                    self.middlegame_score += MIDDLEGAME_SCORES[piece.color][piece.piece_type][y * 8 + x]
+                    self.endgame_score += ENDGAME_SCORES[piece.color][piece.piece_type][y * 8 + x]
+                    self.phase += PHASE_WEIGHTS[piece.piece_type]
+                    if piece.piece_type == KING:
+                        self.king_positions[piece.color] = (y, x)
 
 #move piece
     def try_move_piece(self, old_position, new_position, current_turn):
@@ -63,22 +112,31 @@ class Chessboard:
             if target_piece is not None and target_piece.color == current_turn:
                 return False
 
-        original_piece = piece
-        has_moved_before_move = piece.has_moved
         # Make the move
         if piece and piece.can_move_to(new_position, self):
-            piece = self.handle_pawn_special_moves(piece, old_position, new_position)
-            self.handle_castling(piece, old_position, new_position)
-            self.make_move(piece, old_position, new_position)
-            self.history.append((original_piece, target_piece, old_position, new_position, has_moved_before_move))
+            return self.make_pseudo_legal_move(old_position, new_position, current_turn)
 
-            # Check if the move leaves the king in check
-            if not self.is_in_check(current_turn):
-                return True
+        return False
 
-            # Undo the move if the king is left in check
-            self.undo_last_move(current_turn)
+    def make_pseudo_legal_move(self, old_position, new_position, current_turn):
+        """Makes a move the piece is able to make and returns True, or undoes it and returns False if it leaves the king in check."""
+        piece = self.get_piece(old_position)
+        target_piece = self.get_piece(new_position)
+        original_piece = piece
+        has_moved_before_move = piece.has_moved
 
+        piece = self.handle_pawn_special_moves(piece, old_position, new_position)
+        self.handle_castling(piece, old_position, new_position)
+        self.make_move(piece, old_position, new_position)
+        self.history.append((original_piece, target_piece, old_position, new_position, has_moved_before_move))
+
+        # Check if the move leaves the king in check
+        if not self.is_in_check(current_turn):
+            self.update_state_key()
+            return True
+
+        # Undo the move if the king is left in check
+        self.undo_last_move(current_turn)
         return False
 
     def make_move(self, piece, old_position, new_position):
@@ -93,19 +151,20 @@ class Chessboard:
             last_move = self.history.pop()
             piece, target_piece, old_position, new_position, has_moved = last_move
             #king moving 2 squares implies castling
-            if isinstance(piece, King) and abs(new_position[1] - old_position[1]) == 2:
+            if piece.piece_type == KING and abs(new_position[1] - old_position[1]) == 2:
                 self.undo_castling(new_position)
                 piece.has_moved = False
             #pawn moved diagonally onto empty square implies en passant
-            if isinstance(piece, Pawn) and abs(new_position[0] - old_position[0]) == 1 \
+            if piece.piece_type == PAWN and abs(new_position[0] - old_position[0]) == 1 \
                 and abs(new_position[1] - old_position[1]) == 1 and target_piece is None:
                 self.undo_en_passant(piece, old_position, new_position)
             #pawn moved to last rank implies promotion
-            if isinstance(piece, Pawn) and new_position[0] in [0, 7]:
+            if piece.piece_type == PAWN and new_position[0] in [0, 7]:
                 self.undo_promtion(piece, old_position, new_position)
             self.set_piece(piece, old_position)
             self.set_piece(target_piece, new_position)
             piece.has_moved = has_moved
+            self.update_state_key()
 
     def undo_castling(self, king_position):
         """Undoes castling."""
@@ -133,24 +192,42 @@ class Chessboard:
 
     def get_all_pieces(self):
         """Returns a list of all pieces on the board."""
-        pieces = []
-        for row in self.board:
-            for piece in row:
-                if piece:
-                    pieces.append(piece)
-        return pieces
+        return [*self.pieces['white'].values(), *self.pieces['black'].values()]
+
+    def get_pieces(self, color):
+        """Returns a live view of the pieces of one colour. Copy it before moving pieces while iterating."""
+        return self.pieces[color].values()
 
     def set_piece(self, piece, position):
         """Sets a piece at the given position on the chessboard."""
         y, x = position
+        index = y * 8 + x
+        old_piece = self.board[y][x]
+        if old_piece is not None:
+            color, piece_type = old_piece.color, old_piece.piece_type
+            self.zobrist_key ^= PIECE_KEYS[color][piece_type][index]
+            self.middlegame_score -= MIDDLEGAME_SCORES[color][piece_type][index]
+            self.endgame_score -= ENDGAME_SCORES[color][piece_type][index]
+            self.phase -= PHASE_WEIGHTS[piece_type]
+            del self.pieces[old_piece.color][position]
+            if piece_type == KING and self.king_positions[old_piece.color] == position:
+                self.king_positions[old_piece.color] = None
         self.board[y][x] = piece
         if piece:
             piece.position = position
+            color, piece_type = piece.color, piece.piece_type
+            self.zobrist_key ^= PIECE_KEYS[color][piece_type][index]
+            self.middlegame_score += MIDDLEGAME_SCORES[color][piece_type][index]
+            self.endgame_score += ENDGAME_SCORES[color][piece_type][index]
+            self.phase += PHASE_WEIGHTS[piece_type]
+            self.pieces[piece.color][position] = piece
+            if piece_type == KING:
+                self.king_positions[piece.color] = position
 
 #special moves
     def handle_pawn_special_moves(self, piece, old_position, new_position):
         """Handles special moves like en passant and pawn promotion."""
-        if isinstance(piece, Pawn):
+        if piece.piece_type == PAWN:
             # Check if the move is an en passant capture
             if(self.is_en_passant_move(piece, self.get_piece(new_position), new_position)) and abs(old_position[1] - new_position[1]) == 1:
                 self.set_piece(None, self.history[-1][3])
@@ -168,7 +245,7 @@ class Chessboard:
 
     def handle_castling(self, piece, old_position, new_position):
         """Handles castling moves."""
-        if isinstance(piece, King) and abs(new_position[1] - old_position[1]) == 2:
+        if piece.piece_type == KING and abs(new_position[1] - old_position[1]) == 2:
             rook_x = 0 if new_position[1] == 2 else 7
             rook_new_x = 3 if new_position[1] == 2 else 5
             rook = self.get_piece((old_position[0], rook_x))
@@ -178,6 +255,8 @@ class Chessboard:
     def is_in_check(self, color):
         """Checks if opponent is in check."""
         king_position = self.find_king(color)
+        if king_position is None:
+            return False
         return self.is_square_under_attack(king_position, 'black' if color == 'white' else 'white')
 
     def is_stalemate(self, game, color):
@@ -186,14 +265,8 @@ class Chessboard:
         if self.is_in_check(color):
             return False
 
-        # Check all moves for the current player's color.
-        valid_moves = game.get_available_moves()
-        if valid_moves != []:
-            # If any move where king is not in check game continues.
-            return False
-
-        # If no valid moves and king is not in check, it is stalemate.
-        return True
+        # If no legal move exists and the king is not in check, it is stalemate.
+        return not self.has_legal_move(color)
 
     def is_checkmate(self, game, color):
         """Checks if a player is in checkmate."""
@@ -201,14 +274,39 @@ class Chessboard:
         if not self.is_in_check(color):
             return False
 
-        # Check all moves for the current player's color.
-        valid_moves = game.get_available_moves()
-        if valid_moves != []:
-            # If any valid move takes the king out of check, game continues.
-            return False
-
-        # If no valid moves and king is in check, it is checkmate.
-        return True
+        # If no legal move takes the king out of check, it is checkmate.
+        return not self.has_legal_move(color)
+
+    def generate_legal_moves(self, color):
+        """Yields the legal moves for a colour as (from_position, to_position), one at a time.
+
+        The board is unchanged between moves, but must not be modified while the generator is in use.
+        """
+        for piece in list(self.pieces[color].values()):
+            from_position = piece.position
+            for to_position in piece.get_pseudo_legal_moves(self):
+                if not self.leaves_king_in_check(from_position, to_position, color):
+                    yield (from_position, to_position)
+
+    def generate_legal_captures(self, color):
+        """Yields the legal captures and promotions for a colour, in the same way as generate_legal_moves."""
+        board = self.board
+        for piece in list(self.pieces[color].values()):
+            from_position = piece.position
+            is_pawn = piece.piece_type == PAWN
+            for to_position in piece.get_pseudo_legal_moves(self):
+                y, x = to_position
+                # Pseudo-legal moves never land on a friendly piece, and pawns only move diagonally to capture
+                if board[y][x] is None and not (is_pawn and (y in (0, 7) or x != from_position[1])):
+                    continue
+                if not self.leaves_king_in_check(from_position, to_position, color):
+                    yield (from_position, to_position)
+
+    def has_legal_move(self, color):
+        """Checks if a colour has any legal move, stopping at the first one found."""
+        for _ in self.generate_legal_moves(color):
+            return True
+        return False
 
     #move validity checks and info
     def is_valid_position(self, position):
@@ -227,6 +325,14 @@ class Chessboard:
 
         return False
 
+    def leaves_king_in_check(self, from_position, to_position, color):
+        """Checks if a move the piece is able to make would leave its own king in check."""
+        if not self.make_pseudo_legal_move(from_position, to_position, color):
+            return True
+
+        self.undo_last_move(color)
+        return False
+
     def is_capture_move(self, piece, new_position):
             """Checks if a move is a capture move."""
             target_piece = self.get_piece(new_position)
@@ -240,7 +346,7 @@ class Chessboard:
         # Check if the move is an en passant capture
         if self.history:
             last_move_piece, last_move_target_piece, last_move_old_position, last_move_new_position, has_moved = self.history[-1]
-            if target_piece is None and isinstance(piece, Pawn) and isinstance(last_move_piece, Pawn) \
+            if target_piece is None and piece.piece_type == PAWN and last_move_piece.piece_type == PAWN \
                 and abs(piece.position[1] - new_position[1]) == 1 \
                 and piece.color != last_move_piece.color \
                 and ((piece.position[0] == 3  and last_move_new_position[0] == 3) or (piece.position[0] == 4  and last_move_new_position[0] == 4))  \
@@ -250,23 +356,101 @@ class Chessboard:
 
 #helper methods
     def is_square_under_attack(self, position, attacker_color):
-        """Checks if a square is under attack."""
-        for row in self.board:
-            for piece in row:
-                if piece and piece.color == attacker_color:
-                    if piece.can_move_to(position, self):
+        """Checks if a square is under attack, looking outward from it for the first piece on each line."""
+        board = self.board
+        y, x = position
+
+        for dy, dx in KNIGHT_OFFSETS:
+            new_y, new_x = y + dy, x + dx
+            if 0 <= new_y < 8 and 0 <= new_x < 8:
+                piece = board[new_y][new_x]
+                if piece is not None and piece.color == attacker_color and piece.piece_type == KNIGHT:
+                    return True
+
+        # Attacking pawns stand one row behind the square, from the attacker's point of view
+        pawn_y = y - 1 if attacker_color == 'white' else y + 1
+        if 0 <= pawn_y < 8:
+            for pawn_x in (x - 1, x + 1):
+                if 0 <= pawn_x < 8:
+                    piece = board[pawn_y][pawn_x]
+                    if piece is not None and piece.color == attacker_color and piece.piece_type == PAWN:
                         return True
+
+        for dy, dx in KING_OFFSETS:
+            new_y, new_x = y + dy, x + dx
+            if 0 <= new_y < 8 and 0 <= new_x < 8:
+                piece = board[new_y][new_x]
+                if piece is not None and piece.color == attacker_color and piece.piece_type == KING:
+                    return True
+
+        for directions, slider in ((ROOK_DIRECTIONS, ROOK), (BISHOP_DIRECTIONS, BISHOP)):
+            for dy, dx in directions:
+                new_y, new_x = y + dy, x + dx
+                while 0 <= new_y < 8 and 0 <= new_x < 8:
+                    piece = board[new_y][new_x]
+                    if piece is not None:
+                        if piece.color == attacker_color and piece.piece_type in (slider, QUEEN):
+                            return True
+                        break
+                    new_y += dy
+                    new_x += dx
         return False
 
     def find_king(self, color):
-        """Finds and returns the position of the king with the specified color."""
-        for y in range(8):
-            for x in range(8):
-                piece = self.board[y][x]
-                if isinstance(piece, King) and piece.color == color:
-                    return (y, x)
-
-        return None # If the king is not found, return None
+        """Returns the position of the king with the specified color, or None if it is not on the board."""
+        return self.king_positions[color]
+
+    def get_castling_rights(self):
+        """Returns the castling rights as a bit mask, from which kings and rooks have not moved yet."""
+        rights = 0
+        for right, color, (king_y, king_x), (rook_y, rook_x) in CASTLING_SQUARES:
+            king = self.board[king_y][king_x]
+            rook = self.board[rook_y][rook_x]
+            if king is not None and king.piece_type == KING and king.color == color and not king.has_moved \
+                and rook is not None and rook.piece_type == ROOK and rook.color == color and not rook.has_moved:
+                rights |= right
+        return rights
+
+    def get_en_passant_file(self):
+        """Returns the file of a pawn that can be captured en passant, or None."""
+        if not self.history:
+            return None
+        piece, _, old_position, new_position, _ = self.history[-1]
+        if piece.piece_type != PAWN or abs(new_position[0] - old_position[0]) != 2:
+            return None
+        # Only count it when an enemy pawn stands ready to capture, so transpositions share a key
+        y, x = new_position
+        for beside_x in (x - 1, x + 1):
+            if 0 <= beside_x < 8:
+                beside_piece = self.board[y][beside_x]
+                if beside_piece is not None and beside_piece.piece_type == PAWN and beside_piece.color != piece.color:
+                    return x
+        return None
+
+    def compute_zobrist_key(self):
+        """Computes the Zobrist key from scratch. It does not include the side to move, see Game.zobrist_key."""
+        key = CASTLING_KEYS[self.get_castling_rights()] ^ EN_PASSANT_KEYS[self.get_en_passant_file()]
+        for color in ('white', 'black'):
+            for (y, x), piece in self.pieces[color].items():
+                key ^= PIECE_KEYS[color][piece.piece_type][y * 8 + x]
+        return key
+
+    def refresh_zobrist_key(self):
+        """Recomputes the Zobrist key and castling and en passant state, e.g. after setting up a position by hand."""
+        self.castling_rights = self.get_castling_rights()
+        self.en_passant_file = self.get_en_passant_file()
+        self.zobrist_key = self.compute_zobrist_key()
+
+    def update_state_key(self):
+        """Updates the castling and en passant terms of the Zobrist key after a move or undo."""
+        castling_rights = self.get_castling_rights()
+        if castling_rights != self.castling_rights:
+            self.zobrist_key ^= CASTLING_KEYS[self.castling_rights] ^ CASTLING_KEYS[castling_rights]
+            self.castling_rights = castling_rights
+        en_passant_file = self.get_en_passant_file()
+        if en_passant_file != self.en_passant_file:
+            self.zobrist_key ^= EN_PASSANT_KEYS[self.en_passant_file] ^ EN_PASSANT_KEYS[en_passant_file]
+            self.en_passant_file = en_passant_file
 
     def print_board(self):
         """For testing: prints the board to the console."""
@@ -274,13 +458,64 @@ class Chessboard:
             print(' '.join('. ' if piece is None else str(piece) for piece in row))
 
     def copy(self):
-        """Returns a copy of the board."""
-        board_copy = Chessboard()
-        for y in range(8):
-            for x in range(8):
-                piece = self.board[y][x]
-                if piece:
-                    board_copy.board[y][x] = piece.copy()
-                else:
-                    board_copy.board[y][x] = None
-        return board_copy
\ No newline at end of file
+        """Returns an independent copy of the board, including its history, without setting up a new board first."""
+        # Each piece is copied once, so a piece on the board and in the history stays the same object in the copy
+        copies = {}
+
+        def copy_piece(piece):
+            if piece is None:
+                return None
+            piece_copy = copies.get(id(piece))
+            if piece_copy is None:
+                piece_copy = copies[id(piece)] = piece.copy()
+            return piece_copy
+
+        board_copy = self.__class__.__new__(self.__class__)
+        # Scalar state (Zobrist key, castling and en passant state, evaluation totals) is shared as is
+        board_copy.__dict__.update(self.__dict__)
+        board_copy.board = [[copy_piece(piece) for piece in row] for row in self.board]
+        board_copy.history = [(copy_piece(piece), copy_piece(target_piece), old_position, new_position, has_moved)
+                              for piece, target_piece, old_position, new_position, has_moved in self.history]
+        board_copy.pieces = {color: {position: copies[id(piece)] for position, piece in pieces.items()}
+                             for color, pieces in self.pieces.items()}
+        board_copy.king_positions = dict(self.king_positions)
+        return board_copy
+
+    def snapshot(self):
+        """Returns an immutable BoardSnapshot of the board and its history, see BoardSnapshot."""
+        # Pieces are numbered in the order they are found, squares and history refer to them by number
+        numbers = {}
+        pieces = []
+
+        def number(piece):
+            if piece is None:
+                return -1
+            piece_number = numbers.get(id(piece))
+            if piece_number is None:
+                piece_number = numbers[id(piece)] = len(pieces)
+                pieces.append((piece.piece_type, piece.color, piece.position, piece.has_moved))
+            return piece_number
+
+        squares = tuple(number(piece) for row in self.board for piece in row)
+        history = tuple((number(piece), number(target_piece), old_position, new_position, has_moved)
+                        for piece, target_piece, old_position, new_position, has_moved in self.history)
+        return BoardSnapshot(self.__class__, tuple(pieces), squares, history)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Returns a new board, of the snapshot's board class, with the snapshot's pieces and history."""
+        pieces = []
+        for piece_type, color, position, has_moved in snapshot.pieces:
+            piece = PIECE_CLASSES[piece_type](color, position)
+            piece.has_moved = has_moved
+            pieces.append(piece)
+        pieces.append(None)  # Number -1
+
+        board = snapshot.board_class.__new__(snapshot.board_class)
+        squares = snapshot.squares
+        board.board = [[pieces[squares[y * 8 + x]] for x in range(8)] for y in range(8)]
+        board.history = [(pieces[piece], pieces[target_piece], old_position, new_position, has_moved)
+                         for piece, target_piece, old_position, new_position, has_moved in snapshot.history]
+        board.index_pieces()
+        board.refresh_zobrist_key()
+        return board
@@ -0,0 +1,130 @@
+"""Forsyth-Edwards Notation (FEN) parsing and serialisation.
+
+A FEN has six space-separated fields: piece placement from rank 8 down to rank 1, side to move,
+castling rights, en passant target square, halfmove clock and fullmove number. The last two may be
+left out and default to 0 and 1.
+
+Use Game.from_fen and Game.to_fen rather than calling these functions directly.
+"""
+from game_logic.board import Chessboard, CASTLING_SQUARES
+from game_logic.notation import algebraic_to_square, square_to_algebraic
+from game_logic.pieces import Pawn, Rook, Knight, Bishop, Queen, King, PAWN, ROOK, KING
+from game_logic.zobrist import WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE
+
+STARTING_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+# Piece class and colour of each FEN letter
+PIECE_LETTERS = {letter: (piece_class, 'white') for letter, piece_class in
+                 (('P', Pawn), ('N', Knight), ('B', Bishop), ('R', Rook), ('Q', Queen), ('K', King))}
+PIECE_LETTERS.update({letter.lower(): (piece_class, 'black') for letter, (piece_class, _) in PIECE_LETTERS.items()})
+# Letter of each piece type code, upper case for white
+TYPE_LETTERS = 'PNBRQK'
+CASTLING_LETTERS = (('K', WHITE_KINGSIDE), ('Q', WHITE_QUEENSIDE), ('k', BLACK_KINGSIDE), ('q', BLACK_QUEENSIDE))
+
+
+def parse_fen(fen, board_class=Chessboard):
+    """
+    Returns (board, current_turn, halfmove_clock, fullmove_number) for a FEN.
+    The board is built directly from the placement instead of from a start position, so parsing is cheap.
+    Raises ValueError for a malformed FEN.
+    """
+    fields = fen.split()
+    if not 2 <= len(fields) <= 6:
+        raise ValueError(f'Invalid FEN, expected 2 to 6 fields: {fen!r}')
+    placement, turn = fields[0], fields[1]
+    castling = fields[2] if len(fields) > 2 else '-'
+    en_passant = fields[3] if len(fields) > 3 else '-'
+    try:
+        halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+        fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+    except ValueError:
+        raise ValueError(f'Invalid FEN move counters: {fen!r}') from None
+    if turn not in ('w', 'b'):
+        raise ValueError(f'Invalid FEN side to move: {fen!r}')
+
+    ranks = placement.split('/')
+    if len(ranks) != 8:
+        raise ValueError(f'Invalid FEN, expected 8 ranks: {fen!r}')
+    rows = []
+    for rank_index, rank in enumerate(ranks):
+        y = 7 - rank_index
+        row = []
+        for char in rank:
+            letter = PIECE_LETTERS.get(char)
+            if letter is None:
+                if char not in '12345678':
+                    raise ValueError(f'Invalid FEN piece {char!r}: {fen!r}')
+                row.extend([None] * int(char))
+                continue
+            piece_class, color = letter
+            piece = piece_class(color, (y, len(row)))
+            # Kings and rooks only keep has_moved False while they still have castling rights
+            if piece_class is King or piece_class is Rook:
+                piece.has_moved = True
+            row.append(piece)
+        if len(row) != 8:
+            raise ValueError(f'Invalid FEN rank {rank!r}: {fen!r}')
+        rows.append(row)
+    rows.reverse()
+
+    if castling != '-':
+        if any(char not in 'KQkq' for char in castling):
+            raise ValueError(f'Invalid FEN castling rights: {fen!r}')
+        # CASTLING_LETTERS lists the rights in the same order as CASTLING_SQUARES
+        for (letter, _), (_, color, (king_y, king_x), (rook_y, rook_x)) in zip(CASTLING_LETTERS, CASTLING_SQUARES):
+            if letter not in castling:
+                continue
+            king, rook = rows[king_y][king_x], rows[rook_y][rook_x]
+            if king is None or king.piece_type != KING or king.color != color \
+                or rook is None or rook.piece_type != ROOK or rook.color != color:
+                raise ValueError(f'FEN castling right {letter} without king and rook on their squares: {fen!r}')
+            king.has_moved = False
+            rook.has_moved = False
+
+    board = board_class.__new__(board_class)
+    board.board = rows
+    board.history = []
+    if en_passant != '-':
+        # Recreate the double pawn push that allows the en passant capture
+        target_y, target_x = algebraic_to_square(en_passant)
+        direction = 1 if target_y == 5 else -1
+        pawn = rows[target_y - direction][target_x] if target_y in (2, 5) else None
+        if pawn is None or pawn.piece_type != PAWN or pawn.color != ('white' if direction == -1 else 'black'):
+            raise ValueError(f'FEN en passant square without a pawn that just moved two squares: {fen!r}')
+        pawn.has_moved = True
+        board.history.append((pawn, None, (target_y + direction, target_x), pawn.position, False))
+    board.index_pieces()
+    board.refresh_zobrist_key()
+    return board, 'white' if turn == 'w' else 'black', halfmove_clock, fullmove_number
+
+
+def board_to_fen(board, current_turn, halfmove_clock=0, fullmove_number=1):
+    """Returns the FEN of a board with the given side to move and move counters."""
+    ranks = []
+    for y in range(7, -1, -1):
+        rank = ''
+        empty = 0
+        for piece in board.board[y]:
+            if piece is None:
+                empty += 1
+                continue
+            if empty:
+                rank += str(empty)
+                empty = 0
+            letter = TYPE_LETTERS[piece.piece_type]
+            rank += letter if piece.color == 'white' else letter.lower()
+        if empty:
+            rank += str(empty)
+        ranks.append(rank)
+
+    rights = board.get_castling_rights()
+    castling = ''.join(letter for letter, right in CASTLING_LETTERS if rights & right) or '-'
+
+    en_passant = '-'
+    if board.history:
+        piece, _, old_position, new_position, _ = board.history[-1]
+        if piece.piece_type == PAWN and abs(new_position[0] - old_position[0]) == 2:
+            en_passant = square_to_algebraic(((old_position[0] + new_position[0]) // 2, new_position[1]))
+
+    side = 'w' if current_turn == 'white' else 'b'
+    return f'{"/".join(ranks)} {side} {castling} {en_passant} {halfmove_clock} {fullmove_number}'
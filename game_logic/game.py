@@ -1,16 +1,52 @@
+from collections import namedtuple
 from game_logic.board import Chessboard
+from game_logic.fen import parse_fen, board_to_fen
+from game_logic.pieces import PAWN
+from game_logic.zobrist import SIDE_KEY
+
+# Immutable copy of a game: a BoardSnapshot, the side to move, game flags, move counters,
+# the pushed states without move lists, and the length of the history that came with the setup
+GameSnapshot = namedtuple('GameSnapshot', ('board', 'current_turn', 'game_over', 'is_checkmate', 'is_stalemate',
+                                           'is_current_player_in_check', 'halfmove_clock', 'fullmove_number',
+                                           'states', 'start_history_length'))
 
 
 class Game:
-    def __init__(self):
-        self.board = Chessboard()
+    def __init__(self, board=None):
+        self.board = board if board is not None else Chessboard()
         self.current_turn = 'white'
         self.game_over = False
         self.is_stalemate = False
         self.is_checkmate = False
         self.is_current_player_in_check = False
-        self.current_player_available_moves = []
-        self.update_available_moves()
+        # Moves since the last capture or pawn move, and the move number, which goes up after black moves
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        # Legal moves are only generated when asked for, see get_available_moves
+        self.current_player_available_moves = None
+        # Derived state from before each move, restored by pop
+        self.state_stack = []
+        # History entries that came with the setup and were never played, e.g. the double pawn push
+        # a FEN's en passant square stands for. undo_move does not take them back.
+        self.start_history_length = 0
+
+    @classmethod
+    def from_fen(cls, fen, board_class=Chessboard):
+        """Returns a new game set up from a FEN, optionally on another board class such as BitboardChessboard."""
+        board, current_turn, halfmove_clock, fullmove_number = parse_fen(fen, board_class)
+        game = cls.__new__(cls)
+        game.board = board
+        game.current_turn = current_turn
+        game.halfmove_clock = halfmove_clock
+        game.fullmove_number = fullmove_number
+        game.state_stack = []
+        game.start_history_length = len(board.history)
+        game.update_game_state()
+        return game
+
+    def to_fen(self):
+        """Returns the FEN of the current position."""
+        return board_to_fen(self.board, self.current_turn, self.halfmove_clock, self.fullmove_number)
 
     def switch_turn(self):
         self.current_turn = 'black' if self.current_turn == 'white' else 'white'
@@ -21,69 +57,128 @@ class Game:
         Switches turn if move is successful, checks for endgame conditions.
         Returns True if move is successful, False otherwise.
         """
+        return self.push(from_position, to_position)
+
+    def push(self, from_position, to_position):
+        """Makes a move and records the current state so pop can restore it. Returns False for an illegal move."""
+        state = (self.current_turn, self.game_over, self.is_checkmate, self.is_stalemate,
+                 self.is_current_player_in_check, self.halfmove_clock, self.fullmove_number,
+                 self.current_player_available_moves)
         if not self.board.try_move_piece(from_position, to_position, self.current_turn):
             return False
 
+        self.state_stack.append(state)
+        piece, target_piece = self.board.history[-1][:2]
+        self.halfmove_clock = 0 if target_piece is not None or piece.piece_type == PAWN else self.halfmove_clock + 1
+        if self.current_turn == 'black':
+            self.fullmove_number += 1
         self.switch_turn()
+        self.update_game_state()
+        return True
 
-        self.update_available_moves()
-
-        # Check for endgame conditions
-        if self.board.is_in_check(self.current_turn):
-            self.is_current_player_in_check = True
-        else:
-            self.is_current_player_in_check = False
+    def pop(self):
+        """Takes back the last pushed move and restores the state from before it, even if the game was over."""
+        (self.current_turn, self.game_over, self.is_checkmate, self.is_stalemate, self.is_current_player_in_check,
+         self.halfmove_clock, self.fullmove_number, self.current_player_available_moves) = self.state_stack.pop()
+        self.board.undo_last_move(self.current_turn)
 
-        if self.board.is_checkmate(self, self.current_turn):
-            self.game_over = True
-            self.is_checkmate = True
-        elif self.board.is_stalemate(self, self.current_turn):
-            self.game_over = True
-            self.is_stalemate = True
+    def update_game_state(self):
+        """Updates check and endgame flags for the current player, e.g. after the board was set up by hand."""
+        self.current_player_available_moves = None
+        self.is_current_player_in_check = self.board.is_in_check(self.current_turn)
 
-        return True # Return True if move succeeded
+        # Finding a single legal move is enough to know the game continues
+        has_legal_move = self.board.has_legal_move(self.current_turn)
+        self.game_over = not has_legal_move
+        self.is_checkmate = not has_legal_move and self.is_current_player_in_check
+        self.is_stalemate = not has_legal_move and not self.is_current_player_in_check
 
     def update_available_moves(self):
         """Updates list of all available moves for current player."""
-        self.current_player_available_moves = []
-        for y in range(8):
-            for x in range(8):
-                piece = self.board.get_piece((y, x))
-                if piece and piece.color == self.current_turn:
-                    valid_moves = piece.get_valid_moves(self, self.current_turn)
-                    if valid_moves:
-                        for move in valid_moves:
-                            self.current_player_available_moves.append((piece.position, move))
+        self.current_player_available_moves = list(self.board.generate_legal_moves(self.current_turn))
 
     def get_available_moves(self):
-        """Returns a list of all available moves for current player."""
+        """Returns a list of all available moves for current player, generating it on first use."""
+        if self.current_player_available_moves is None:
+            self.update_available_moves()
         return self.current_player_available_moves
 
+    def get_capture_moves(self):
+        """Returns a list of the captures and promotions available to the current player."""
+        return list(self.board.generate_legal_captures(self.current_turn))
+
     def undo_move(self):
         """Undo the last move."""
-        if self.board.history == [] or self.game_over:
+        if len(self.board.history) <= self.start_history_length or self.game_over:
             return
+        if self.state_stack:
+            self.pop()
+            return
+        # The move was made on the board directly, so there is no recorded state to restore
         self.board.undo_last_move(self.current_turn)
         self.switch_turn()
+        self.update_game_state()
+
+    @property
+    def zobrist_key(self):
+        """Returns the 64-bit Zobrist key of the position, including the side to move."""
+        if self.current_turn == 'black':
+            return self.board.zobrist_key ^ SIDE_KEY
+        return self.board.zobrist_key
+
+    def verify_zobrist_key(self):
+        """Debug check: returns True if the incremental Zobrist key matches one computed from scratch."""
+        key = self.board.compute_zobrist_key()
+        if self.current_turn == 'black':
+            key ^= SIDE_KEY
+        return key == self.zobrist_key
 
     def opposite_color(self, color):
         return 'black' if color == 'white' else 'white'
 
     def reset_game(self):
-        self.board = Chessboard()
+        self.board = self.board.__class__()
         self.current_turn = 'white'
         self.game_over = False
         self.is_stalemate = False
         self.is_checkmate = False
+        self.is_current_player_in_check = False
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self.current_player_available_moves = None
+        self.state_stack = []
 
     def copy(self):
-        """Returns a copy of the game."""
-        copy = Game()
-        copy.board = self.board.copy()
-        copy.current_turn = self.current_turn
-        copy.game_over = self.game_over
-        copy.is_stalemate = self.is_stalemate
-        copy.is_checkmate = self.is_checkmate
-        copy.is_current_player_in_check = self.is_current_player_in_check
-        copy.current_player_available_moves = self.current_player_available_moves
-        return copy
+        """Returns an independent copy of the game, including its move history, so moves can be undone in either."""
+        game_copy = self.__class__.__new__(self.__class__)
+        game_copy.__dict__.update(self.__dict__)
+        game_copy.board = self.board.copy()
+        game_copy.state_stack = list(self.state_stack)
+        if self.current_player_available_moves is not None:
+            game_copy.current_player_available_moves = list(self.current_player_available_moves)
+        return game_copy
+
+    def snapshot(self):
+        """Returns an immutable GameSnapshot, which can be shared and turned back into a game with from_snapshot."""
+        # Cached move lists are left out, restored games generate them again when asked
+        states = tuple(state[:-1] for state in self.state_stack)
+        return GameSnapshot(self.board.snapshot(), self.current_turn, self.game_over, self.is_checkmate,
+                            self.is_stalemate, self.is_current_player_in_check, self.halfmove_clock,
+                            self.fullmove_number, states, self.start_history_length)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Returns a new game from a snapshot, with the same history so its moves can be popped."""
+        game = cls.__new__(cls)
+        game.board = Chessboard.from_snapshot(snapshot.board)
+        game.current_turn = snapshot.current_turn
+        game.game_over = snapshot.game_over
+        game.is_checkmate = snapshot.is_checkmate
+        game.is_stalemate = snapshot.is_stalemate
+        game.is_current_player_in_check = snapshot.is_current_player_in_check
+        game.halfmove_clock = snapshot.halfmove_clock
+        game.fullmove_number = snapshot.fullmove_number
+        game.current_player_available_moves = None
+        game.state_stack = [state + (None,) for state in snapshot.states]
+        game.start_history_length = snapshot.start_history_length
+        return game
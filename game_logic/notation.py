@@ -0,0 +1,111 @@
+import re
+
+from game_logic.pieces import PAWN, KING
+
+FILES = 'abcdefgh'
+
+
+def square_to_algebraic(position):
+    """Converts a (y, x) board position to algebraic notation, e.g. (1, 4) -> 'e2'."""
+    y, x = position
+    return f'{FILES[x]}{y + 1}'
+
+
+def algebraic_to_square(name):
+    """Converts algebraic notation to a (y, x) board position, e.g. 'e2' -> (1, 4)."""
+    if len(name) != 2 or name[0] not in FILES or name[1] not in '12345678':
+        raise ValueError(f'Invalid square: {name!r}')
+    return (int(name[1]) - 1, FILES.index(name[0]))
+
+
+def move_to_uci(move):
+    """Converts a (from_position, to_position) move to coordinate notation, e.g. 'e2e4'."""
+    from_position, to_position = move
+    return square_to_algebraic(from_position) + square_to_algebraic(to_position)
+
+
+def uci_to_move(text):
+    """Converts coordinate notation to a (from_position, to_position) move.
+
+    A trailing promotion letter is accepted and ignored: pawns always promote to a queen.
+    """
+    if len(text) not in (4, 5):
+        raise ValueError(f'Invalid move: {text!r}')
+    return (algebraic_to_square(text[0:2]), algebraic_to_square(text[2:4]))
+
+
+# Piece letter of each piece type code, as used in SAN
+PIECE_LETTERS = 'PNBRQK'
+SAN_PATTERN = re.compile(r'([NBRQK])?([a-h])?([1-8])?(x)?([a-h][1-8])(?:=?([NBRQ]))?')
+
+
+def move_to_san(game, move):
+    """Returns the standard algebraic notation of a legal move in the game's current position, e.g. 'Nbd2' or 'exd6+'."""
+    board = game.board
+    from_position, to_position = move
+    piece = board.get_piece(from_position)
+    if piece.piece_type == KING and abs(to_position[1] - from_position[1]) == 2:
+        san = 'O-O' if to_position[1] == 6 else 'O-O-O'
+    else:
+        capture = board.is_capture_move(piece, to_position)
+        if piece.piece_type == PAWN:
+            san = FILES[from_position[1]] + 'x' if capture else ''
+            san += square_to_algebraic(to_position)
+            if to_position[0] in (0, 7):
+                san += '=Q'
+        else:
+            # Name the origin file, rank or both if another piece of the same type can reach the square
+            others = [other for other, target in game.get_available_moves()
+                      if target == to_position and other != from_position
+                      and board.get_piece(other).piece_type == piece.piece_type]
+            origin = ''
+            if others:
+                if all(other[1] != from_position[1] for other in others):
+                    origin = FILES[from_position[1]]
+                elif all(other[0] != from_position[0] for other in others):
+                    origin = str(from_position[0] + 1)
+                else:
+                    origin = square_to_algebraic(from_position)
+            san = PIECE_LETTERS[piece.piece_type] + origin + ('x' if capture else '') + square_to_algebraic(to_position)
+
+    game.push(from_position, to_position)
+    if game.is_checkmate:
+        san += '#'
+    elif game.is_current_player_in_check:
+        san += '+'
+    game.pop()
+    return san
+
+
+def san_to_move(game, san):
+    """
+    Returns the legal (from_position, to_position) move that a SAN string names in the game's current position.
+    Raises ValueError if it names no legal move, more than one, or an underpromotion, which this engine does not support.
+    """
+    text = san.rstrip('+#!?')
+    moves = game.get_available_moves()
+    board = game.board
+    if text in ('O-O', 'O-O-O', '0-0', '0-0-0'):
+        target_x = 6 if len(text) == 3 else 2
+        for from_position, to_position in moves:
+            if board.get_piece(from_position).piece_type == KING and from_position[1] == 4 \
+                and to_position[1] == target_x:
+                return (from_position, to_position)
+        raise ValueError(f'Illegal castling: {san!r}')
+
+    match = SAN_PATTERN.fullmatch(text)
+    if match is None:
+        raise ValueError(f'Invalid SAN: {san!r}')
+    piece_letter, from_file, from_rank, _, to_square, promotion = match.groups()
+    if promotion is not None and promotion != 'Q':
+        raise ValueError(f'Only promotion to a queen is supported: {san!r}')
+    piece_type = PIECE_LETTERS.index(piece_letter or 'P')
+    to_position = algebraic_to_square(to_square)
+    from_x = FILES.index(from_file) if from_file else None
+    from_y = int(from_rank) - 1 if from_rank else None
+    candidates = [(from_position, target) for from_position, target in moves
+                  if target == to_position and board.get_piece(from_position).piece_type == piece_type
+                  and (from_x is None or from_position[1] == from_x) and (from_y is None or from_position[0] == from_y)]
+    if len(candidates) != 1:
+        raise ValueError(f'{"Ambiguous" if candidates else "Illegal"} move: {san!r}')
+    return candidates[0]
@@ -0,0 +1,128 @@
+"""Perft: counts the leaf nodes of the legal move tree to a fixed depth.
+
+Perft is the correctness and speed baseline for the move generator. Run it with:
+
+    python -m game_logic.perft --position startpos --depth 3 --divide
+
+Reference counts come from the standard perft suites. Only positions and depths
+without promotions are listed, since pawns in this engine always promote to a queen.
+"""
+import argparse
+import sys
+import time
+
+from game_logic.bitboard import BitboardChessboard
+from game_logic.board import Chessboard
+from game_logic.game import Game
+from game_logic.notation import move_to_uci
+
+# name -> (fen, {depth: expected leaf nodes})
+PERFT_POSITIONS = {
+    'startpos': (
+        'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+        {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609},
+    ),
+    'kiwipete': (
+        'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+        {1: 48, 2: 2039, 3: 97862},
+    ),
+    'position3': (
+        '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+        {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624},
+    ),
+    'position6': (
+        'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+        {1: 46, 2: 2079, 3: 89890},
+    ),
+}
+
+
+def perft(game, depth, verify_hash=False):
+    """Returns the number of leaf nodes reached from the current position in depth plies.
+
+    With verify_hash, the incremental Zobrist key is checked against a from-scratch key at every node.
+    """
+    if verify_hash and not game.verify_zobrist_key():
+        raise AssertionError(f'Zobrist key mismatch after {[move_to_uci(m[2:4]) for m in game.board.history]}')
+    moves = game.get_available_moves()
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+
+    nodes = 0
+    for from_position, to_position in moves:
+        game.push(from_position, to_position)
+        nodes += perft(game, depth - 1, verify_hash)
+        game.pop()
+    return nodes
+
+
+def divide(game, depth, verify_hash=False):
+    """Returns a dict mapping each root move to the perft count below it."""
+    results = {}
+    for move in list(game.get_available_moves()):
+        game.push(move[0], move[1])
+        results[move] = perft(game, depth - 1, verify_hash)
+        game.pop()
+    return results
+
+
+def run_perft(fen, depth, show_divide=False, expected=None, board_class=Chessboard, verify_hash=False, out=sys.stdout):
+    """Runs perft on a position, prints a report and returns True if the node count matches expected."""
+    game = Game.from_fen(fen, board_class)
+    start = time.perf_counter()
+    if show_divide:
+        results = divide(game, depth, verify_hash)
+        nodes = sum(results.values())
+    else:
+        nodes = perft(game, depth, verify_hash)
+    elapsed = time.perf_counter() - start
+
+    if show_divide:
+        for move in sorted(results, key=move_to_uci):
+            print(f'{move_to_uci(move)}: {results[move]}', file=out)
+    nps = nodes / elapsed if elapsed > 0 else float('inf')
+    print(f'depth {depth}  nodes {nodes}  time {elapsed:.3f}s  nps {nps:.0f}', file=out)
+
+    if expected is None:
+        return True
+    if nodes != expected:
+        print(f'MISMATCH: expected {expected}, got {nodes}', file=out)
+        return False
+    print('OK', file=out)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Count move generator leaf nodes to a given depth.')
+    parser.add_argument('--position', choices=sorted(PERFT_POSITIONS), default='startpos',
+                        help='reference position to run')
+    parser.add_argument('--fen', help='run a custom position instead of a reference position')
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--divide', action='store_true', help='print the node count under each root move')
+    parser.add_argument('--suite', action='store_true',
+                        help='run every reference position up to --depth and check the counts')
+    parser.add_argument('--bitboard', action='store_true', help='use the bitboard backed chessboard')
+    parser.add_argument('--verify-hash', action='store_true',
+                        help='check the incremental Zobrist key against a from-scratch key at every node')
+    args = parser.parse_args(argv)
+    board_class = BitboardChessboard if args.bitboard else Chessboard
+
+    if args.suite:
+        ok = True
+        for name, (fen, counts) in PERFT_POSITIONS.items():
+            for depth in sorted(d for d in counts if d <= args.depth):
+                print(f'{name}:', end=' ')
+                ok = run_perft(fen, depth, expected=counts[depth], board_class=board_class,
+                                    verify_hash=args.verify_hash) and ok
+        return 0 if ok else 1
+
+    if args.fen:
+        ok = run_perft(args.fen, args.depth, args.divide, board_class=board_class, verify_hash=args.verify_hash)
+    else:
+        fen, counts = PERFT_POSITIONS[args.position]
+        ok = run_perft(fen, args.depth, args.divide, counts.get(args.depth), board_class, args.verify_hash)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""Portable Game Notation (PGN) reading and writing.
+
+read_games streams the games of a PGN file one at a time, so archives of any size can be replayed
+while only one game is held in memory. Each move is resolved against the legal moves of the game,
+so every returned move can be played with Game.push. Comments, recursive variations, NAGs and
+escape lines are skipped. A game that cannot be replayed, e.g. because of an illegal move or an
+underpromotion, is still returned with the moves up to the problem and an error message, and
+reading carries on with the next game.
+
+write_game writes a game's moves, taken from its board history, as SAN movetext with tag pairs.
+"""
+import re
+from game_logic.board import Chessboard
+from game_logic.fen import STARTING_FEN
+from game_logic.game import Game
+from game_logic.notation import move_to_san, san_to_move
+
+SEVEN_TAG_ROSTER = ('Event', 'Site', 'Date', 'Round', 'White', 'Black', 'Result')
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+LINE_LENGTH = 80
+
+TAG_PATTERN = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+# Comments, variation brackets, NAGs, move numbers, results and moves, in that order of preference
+TOKEN_PATTERN = re.compile(r'\{[^}]*\}?|;[^\n]*|\(|\)|\$\d+|1-0|0-1|1/2-1/2|\*|\d+\.+|[^\s{}();$]+')
+
+
+class PGNGame:
+    """A game read from PGN: its tag pairs, its moves as (from_position, to_position) tuples, and the final Game."""
+    def __init__(self, headers, moves, game, result, error=None):
+        self.headers = headers
+        self.moves = moves
+        self.game = game
+        self.result = result
+        # None if every move could be replayed, otherwise a message saying what went wrong
+        self.error = error
+
+    def __repr__(self):
+        return f'PGNGame({self.headers.get("White", "?")!r} - {self.headers.get("Black", "?")!r}, ' \
+               f'{len(self.moves)} moves, {self.result!r})'
+
+
+def read_games(stream, board_class=Chessboard):
+    """
+    Yields a PGNGame for each game in a text stream, such as an open file, reading it one line at a time.
+    board_class is the board the games are replayed on, e.g. BitboardChessboard.
+    """
+    header_lines = []
+    movetext_lines = []
+    in_comment = False
+    for line in stream:
+        if not in_comment:
+            stripped = line.strip()
+            if stripped.startswith('%'):
+                # Escape mechanism, the rest of the line is ignored
+                continue
+            if stripped.startswith('['):
+                # A tag pair after movetext starts the next game
+                if movetext_lines:
+                    yield parse_game(header_lines, movetext_lines, board_class)
+                    header_lines, movetext_lines = [], []
+                header_lines.append(stripped)
+                continue
+            if not stripped and not movetext_lines:
+                continue
+        movetext_lines.append(line)
+        in_comment = _ends_in_comment(line, in_comment)
+    if header_lines or movetext_lines:
+        yield parse_game(header_lines, movetext_lines, board_class)
+
+
+def _ends_in_comment(line, in_comment):
+    # Returns True if a brace comment is still open at the end of the line
+    for char in line:
+        if in_comment:
+            in_comment = char != '}'
+        elif char == '{':
+            in_comment = True
+        elif char == ';':
+            break
+    return in_comment
+
+
+def parse_game(header_lines, movetext_lines, board_class=Chessboard):
+    """Returns a PGNGame from the tag pair lines and movetext lines of one game."""
+    headers = {}
+    moves = []
+    result = None
+    game = Game(board_class())
+    try:
+        for line in header_lines:
+            match = TAG_PATTERN.fullmatch(line)
+            if match is None:
+                raise ValueError(f'Invalid tag pair: {line!r}')
+            headers[match.group(1)] = match.group(2).replace('\\"', '"').replace('\\\\', '\\')
+        if 'FEN' in headers:
+            game = Game.from_fen(headers['FEN'], board_class)
+
+        variation_depth = 0
+        for token in TOKEN_PATTERN.findall(''.join(movetext_lines)):
+            first = token[0]
+            if first == '(':
+                variation_depth += 1
+            elif first == ')':
+                if variation_depth == 0:
+                    raise ValueError('Unmatched ")" in movetext')
+                variation_depth -= 1
+            elif first == '{':
+                if token[-1] != '}':
+                    raise ValueError('Unterminated comment in movetext')
+            elif variation_depth or first in ';$' or token[-1] == '.':
+                continue
+            elif token in RESULTS:
+                result = token
+            else:
+                if result is not None:
+                    raise ValueError(f'Move {token!r} after the result')
+                try:
+                    move = san_to_move(game, token)
+                except ValueError as error:
+                    raise ValueError(f'Move {game.fullmove_number}: {error}') from None
+                game.push(*move)
+                moves.append(move)
+        if variation_depth:
+            raise ValueError('Unterminated variation in movetext')
+    except ValueError as error:
+        return PGNGame(headers, moves, game, result or headers.get('Result', '*'), str(error))
+    return PGNGame(headers, moves, game, result or headers.get('Result', '*'))
+
+
+def game_result(game):
+    """Returns the PGN result of a game: '1-0', '0-1', '1/2-1/2', or '*' if it is not over."""
+    if game.is_checkmate:
+        return '0-1' if game.current_turn == 'white' else '1-0'
+    if game.game_over:
+        return '1/2-1/2'
+    return '*'
+
+
+def game_to_pgn(game, headers=None):
+    """
+    Returns the PGN text of a game's moves, which are taken from its board history.
+    headers adds or overrides tag pairs; the Seven Tag Roster is always written, with '?' for unknown values.
+    """
+    # Take every pushed move back on a copy to find the start position
+    start = game.copy()
+    for _ in range(len(start.state_stack)):
+        start.pop()
+    moves = [entry[2:4] for entry in game.board.history[len(start.board.history):]]
+
+    tags = {name: '?' for name in SEVEN_TAG_ROSTER}
+    tags['Date'] = '????.??.??'
+    tags['Result'] = game_result(game)
+    start_fen = start.to_fen()
+    if start_fen != STARTING_FEN:
+        tags['SetUp'] = '1'
+        tags['FEN'] = start_fen
+    tags.update(headers or {})
+
+    lines = [f'[{name} "{_escape(str(value))}"]' for name, value in tags.items()]
+    lines.append('')
+
+    words = []
+    for index, move in enumerate(moves):
+        if start.current_turn == 'white':
+            words.append(f'{start.fullmove_number}.')
+        elif index == 0:
+            words.append(f'{start.fullmove_number}...')
+        words.append(move_to_san(start, move))
+        start.push(*move)
+    words.append(tags['Result'])
+
+    line = ''
+    for word in words:
+        if line and len(line) + 1 + len(word) > LINE_LENGTH:
+            lines.append(line)
+            line = word
+        else:
+            line = f'{line} {word}' if line else word
+    lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def write_game(out, game, headers=None):
+    """Writes a game as PGN to a text stream, followed by a blank line, so games can be appended to one file."""
+    out.write(game_to_pgn(game, headers))
+    out.write('\n')
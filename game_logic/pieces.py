@@ -1,4 +1,16 @@
+KNIGHT_OFFSETS = ((2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1))
+KING_OFFSETS = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
+ROOK_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+BISHOP_DIRECTIONS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+# Integer piece type codes, used to index per-type tables and for type tests without isinstance
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+
 class Piece:
+    # No per-instance __dict__: pieces only hold these attributes, and subclasses add none
+    __slots__ = ('color', 'position', 'has_moved')
+    piece_type = None
+
     def __init__(self, color, position, has_moved=False):
         self.color = color
         self.position = position # y,x
@@ -8,13 +20,46 @@ class Piece:
         # Implement how a piece moves
         return False
 
+    def get_pseudo_legal_moves(self, board):
+        """Returns the squares this piece can reach, without checking if its own king is left in check."""
+        return []
+
     def get_valid_moves(self, game, color):
-        valid_moves = []
-        for row in range(8):
-            for col in range(8):
-                if self.color is color and self.can_move_to((row, col), game.board) and not game.board.is_in_check_after_move(self.position, (row,col), self.color):
-                    valid_moves.append((row, col))
-        return valid_moves
+        if self.color != color:
+            return []
+        board = game.board
+        return [move for move in self.get_pseudo_legal_moves(board)
+                if not board.leaves_king_in_check(self.position, move, self.color)]
+
+    def slide_moves(self, board, directions):
+        """Walks each direction until the edge of the board or the first piece, which is included if it can be captured."""
+        moves = []
+        y, x = self.position
+        for dy, dx in directions:
+            new_y, new_x = y + dy, x + dx
+            while 0 <= new_y < 8 and 0 <= new_x < 8:
+                target_piece = board.board[new_y][new_x]
+                if target_piece is None:
+                    moves.append((new_y, new_x))
+                else:
+                    if target_piece.color != self.color:
+                        moves.append((new_y, new_x))
+                    break
+                new_y += dy
+                new_x += dx
+        return moves
+
+    def step_moves(self, board, offsets):
+        """Returns the squares at the given offsets that are on the board and not occupied by a friendly piece."""
+        moves = []
+        y, x = self.position
+        for dy, dx in offsets:
+            new_y, new_x = y + dy, x + dx
+            if 0 <= new_y < 8 and 0 <= new_x < 8:
+                target_piece = board.board[new_y][new_x]
+                if target_piece is None or target_piece.color != self.color:
+                    moves.append((new_y, new_x))
+        return moves
 
     def is_same_color_turn(self, game):
         return self.color == game.current_turn
@@ -23,12 +68,17 @@ class Piece:
         return f'{self.color[0]}{self.__class__.__name__[0]}'
 
     def copy(self):
-        return self.__class__(self.color, self.position)
+        piece = self.__class__(self.color, self.position)
+        piece.has_moved = self.has_moved
+        return piece
 
 # Define specific piece classes like Pawn, Rook, Knight, etc.
 # These classes should inherit from Piece and implement specific movement rules.
 
 class Pawn(Piece):
+    __slots__ = ()
+    piece_type = PAWN
+
     def __str__(self):
         return super().__str__().lower()
 
@@ -72,10 +122,35 @@ class Pawn(Piece):
 
         return False
 
+    def get_pseudo_legal_moves(self, board):
+        moves = []
+        y, x = self.position
+        forward = 1 if self.color == 'white' else -1
+        start_row = 1 if self.color == 'white' else 6
+        new_y = y + forward
+        if not 0 <= new_y < 8:
+            return moves
+
+        # Forward moves
+        if board.board[new_y][x] is None:
+            moves.append((new_y, x))
+            if y == start_row and board.board[new_y + forward][x] is None:
+                moves.append((new_y + forward, x))
+
+        # Captures, including en passant
+        for new_x in (x - 1, x + 1):
+            if 0 <= new_x < 8:
+                target_piece = board.board[new_y][new_x]
+                if target_piece is not None:
+                    if target_piece.color != self.color:
+                        moves.append((new_y, new_x))
+                elif board.is_en_passant_move(self, None, (new_y, new_x)):
+                    moves.append((new_y, new_x))
+        return moves
+
 class Rook(Piece):
-    def __init__(self, color, position):
-        super().__init__(color, position)
-        self.has_moved = False
+    __slots__ = ()
+    piece_type = ROOK
 
     def move_like_rook(self, new_position, board):
         if not new_position or not self.position:
@@ -106,7 +181,13 @@ class Rook(Piece):
     def can_move_to(self, new_position, board):
         return self.move_like_rook(new_position, board)
 
+    def get_pseudo_legal_moves(self, board):
+        return self.slide_moves(board, ROOK_DIRECTIONS)
+
 class Knight(Piece):
+    __slots__ = ()
+    piece_type = KNIGHT
+
     def __str__(self):
         return f'{self.color[0]}{self.__class__.__name__[1].upper()}'
 
@@ -119,7 +200,13 @@ class Knight(Piece):
         target_piece = board.get_piece(new_position)
         return (dx, dy) in [(1, 2), (2, 1)] and (target_piece is None or target_piece.color != self.color)
 
+    def get_pseudo_legal_moves(self, board):
+        return self.step_moves(board, KNIGHT_OFFSETS)
+
 class Bishop(Piece):
+    __slots__ = ()
+    piece_type = BISHOP
+
     def move_like_bishop(self, new_position, board):
         if not new_position or not self.position:
             return False  # Invalid positions
@@ -146,26 +233,30 @@ class Bishop(Piece):
     def can_move_to(self, new_position, board):
         return self.move_like_bishop(new_position, board)
 
+    def get_pseudo_legal_moves(self, board):
+        return self.slide_moves(board, BISHOP_DIRECTIONS)
+
 
 class Queen(Piece):
-    def can_move_to(self, new_position, board):
-        # Create instances of Rook and Bishop for movement logic
-        virtual_rook = Rook(self.color, self.position)
-        virtual_bishop = Bishop(self.color, self.position)
+    __slots__ = ()
+    piece_type = QUEEN
 
-        # Check if the queen moves like a rook or a bishop
+    def can_move_to(self, new_position, board):
+        # Check if the queen moves like a rook or a bishop, reusing their movement logic on this piece
         if new_position[1] == self.position[1] or new_position[0] == self.position[0]:
-            return virtual_rook.move_like_rook(new_position, board)
+            return Rook.move_like_rook(self, new_position, board)
         elif abs(new_position[1] - self.position[1]) == abs(new_position[0] - self.position[0]):
-            return virtual_bishop.move_like_bishop(new_position, board)
+            return Bishop.move_like_bishop(self, new_position, board)
         else:
             return False
 
+    def get_pseudo_legal_moves(self, board):
+        return self.slide_moves(board, ROOK_DIRECTIONS + BISHOP_DIRECTIONS)
+
 
 class King(Piece):
-    def __init__(self, color, position):
-        super().__init__(color, position)
-        self.has_moved = False
+    __slots__ = ()
+    piece_type = KING
 
     def can_castle(self, new_position, board):
         if self.has_moved or new_position[0] != self.position[0]:
@@ -173,14 +264,19 @@ class King(Piece):
 
         rook_x = 0 if new_position[1] == 2 else 7
         rook = board.get_piece((self.position[0], rook_x))
-        if not isinstance(rook, Rook) or rook.has_moved:
+        if rook is None or rook.piece_type != ROOK or rook.has_moved:
             return False
 
-        # Check if squares between king and rook are empty and not under attack
+        # Check if squares between king and rook are empty
         step = 1 if rook_x == 7 else -1
         for x in range(self.position[1] + step, rook_x, step):
-            if board.get_piece((self.position[0], x)) is not None or \
-            board.is_square_under_attack((self.position[0], x), 'black' if self.color == 'white' else 'white'):
+            if board.get_piece((self.position[0], x)) is not None:
+                return False
+
+        # Check the king does not pass through an attacked square (the b-file square on the queenside may be attacked)
+        opponent_color = 'black' if self.color == 'white' else 'white'
+        for x in (self.position[1] + step, self.position[1] + 2 * step):
+            if board.is_square_under_attack((self.position[0], x), opponent_color):
                 return False
 
         # Check if king's current position is under attack
@@ -200,3 +296,12 @@ class King(Piece):
         dy = abs(new_position[0] - self.position[0])
         target_piece = board.get_piece(new_position)
         return (dx in [0, 1] and dy in [0, 1]) and (target_piece is None or target_piece.color != self.color)
+
+    def get_pseudo_legal_moves(self, board):
+        moves = self.step_moves(board, KING_OFFSETS)
+        y, x = self.position
+        if not self.has_moved and x == 4:
+            for new_x in (2, 6):
+                if self.can_castle((y, new_x), board):
+                    moves.append((y, new_x))
+        return moves
@@ -0,0 +1,135 @@
+"""Material and piece-square tables for a phase-tapered evaluation.
+
+Scores are in centipawns. Each piece adds a middlegame and an endgame value for its square,
+and the two totals are blended by the game phase, which falls from 24 with all minor and major
+pieces on the board to 0 with only kings and pawns. Chessboard keeps the totals up to date in
+set_piece, so reading them is O(1).
+
+Tables are written from white's point of view with rank 8 on the first line, as on a diagram.
+"""
+
+MAX_PHASE = 24
+# Indexed by piece type code: pawn, knight, bishop, rook, queen, king
+PHASE_WEIGHTS = (0, 1, 1, 2, 4, 0)
+
+MIDDLEGAME_VALUES = (100, 320, 330, 500, 900, 0)
+ENDGAME_VALUES = (120, 300, 320, 520, 920, 0)
+
+PAWN_TABLE = (
+     0,   0,   0,   0,   0,   0,   0,   0,
+    50,  50,  50,  50,  50,  50,  50,  50,
+    10,  10,  20,  30,  30,  20,  10,  10,
+     5,   5,  10,  25,  25,  10,   5,   5,
+     0,   0,   0,  20,  20,   0,   0,   0,
+     5,  -5, -10,   0,   0, -10,  -5,   5,
+     5,  10,  10, -20, -20,  10,  10,   5,
+     0,   0,   0,   0,   0,   0,   0,   0,
+)
+
+PAWN_ENDGAME_TABLE = (
+     0,   0,   0,   0,   0,   0,   0,   0,
+    80,  80,  80,  80,  80,  80,  80,  80,
+    50,  50,  50,  50,  50,  50,  50,  50,
+    30,  30,  30,  30,  30,  30,  30,  30,
+    20,  20,  20,  20,  20,  20,  20,  20,
+    10,  10,  10,  10,  10,  10,  10,  10,
+    10,  10,  10,  10,  10,  10,  10,  10,
+     0,   0,   0,   0,   0,   0,   0,   0,
+)
+
+KNIGHT_TABLE = (
+   -50, -40, -30, -30, -30, -30, -40, -50,
+   -40, -20,   0,   0,   0,   0, -20, -40,
+   -30,   0,  10,  15,  15,  10,   0, -30,
+   -30,   5,  15,  20,  20,  15,   5, -30,
+   -30,   0,  15,  20,  20,  15,   0, -30,
+   -30,   5,  10,  15,  15,  10,   5, -30,
+   -40, -20,   0,   5,   5,   0, -20, -40,
+   -50, -40, -30, -30, -30, -30, -40, -50,
+)
+
+BISHOP_TABLE = (
+   -20, -10, -10, -10, -10, -10, -10, -20,
+   -10,   0,   0,   0,   0,   0,   0, -10,
+   -10,   0,   5,  10,  10,   5,   0, -10,
+   -10,   5,   5,  10,  10,   5,   5, -10,
+   -10,   0,  10,  10,  10,  10,   0, -10,
+   -10,  10,  10,  10,  10,  10,  10, -10,
+   -10,   5,   0,   0,   0,   0,   5, -10,
+   -20, -10, -10, -10, -10, -10, -10, -20,
+)
+
+ROOK_TABLE = (
+     0,   0,   0,   0,   0,   0,   0,   0,
+     5,  10,  10,  10,  10,  10,  10,   5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+     0,   0,   0,   5,   5,   0,   0,   0,
+)
+
+ROOK_ENDGAME_TABLE = (0,) * 64
+
+QUEEN_TABLE = (
+   -20, -10, -10,  -5,  -5, -10, -10, -20,
+   -10,   0,   0,   0,   0,   0,   0, -10,
+   -10,   0,   5,   5,   5,   5,   0, -10,
+    -5,   0,   5,   5,   5,   5,   0,  -5,
+     0,   0,   5,   5,   5,   5,   0,  -5,
+   -10,   5,   5,   5,   5,   5,   0, -10,
+   -10,   0,   5,   0,   0,   0,   0, -10,
+   -20, -10, -10,  -5,  -5, -10, -10, -20,
+)
+
+KING_TABLE = (
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -20, -30, -30, -40, -40, -30, -30, -20,
+   -10, -20, -20, -20, -20, -20, -20, -10,
+    20,  20,   0,   0,   0,   0,  20,  20,
+    20,  30,  10,   0,   0,  10,  30,  20,
+)
+
+KING_ENDGAME_TABLE = (
+   -50, -40, -30, -20, -20, -30, -40, -50,
+   -30, -20, -10,   0,   0, -10, -20, -30,
+   -30, -10,  20,  30,  30,  20, -10, -30,
+   -30, -10,  30,  40,  40,  30, -10, -30,
+   -30, -10,  30,  40,  40,  30, -10, -30,
+   -30, -10,  20,  30,  30,  20, -10, -30,
+   -30, -30,   0,   0,   0,   0, -30, -30,
+   -50, -30, -30, -30, -30, -30, -30, -50,
+)
+
+MIDDLEGAME_TABLES = (PAWN_TABLE, KNIGHT_TABLE, BISHOP_TABLE, ROOK_TABLE, QUEEN_TABLE, KING_TABLE)
+ENDGAME_TABLES = (PAWN_ENDGAME_TABLE, KNIGHT_TABLE, BISHOP_TABLE, ROOK_ENDGAME_TABLE, QUEEN_TABLE, KING_ENDGAME_TABLE)
+
+
+def _square_scores(values, tables):
+    # Returns scores[color][piece type code][y * 8 + x], positive for white and negative for black
+    scores = {'white': [], 'black': []}
+    for piece_type, table in enumerate(tables):
+        white = [0] * 64
+        black = [0] * 64
+        for y in range(8):
+            for x in range(8):
+                # Table row 0 is rank 8 for white, and mirrors to rank 1 for black
+                white[y * 8 + x] = values[piece_type] + table[(7 - y) * 8 + x]
+                black[y * 8 + x] = -(values[piece_type] + table[y * 8 + x])
+        scores['white'].append(white)
+        scores['black'].append(black)
+    return scores
+
+
+MIDDLEGAME_SCORES = _square_scores(MIDDLEGAME_VALUES, MIDDLEGAME_TABLES)
+ENDGAME_SCORES = _square_scores(ENDGAME_VALUES, ENDGAME_TABLES)
+
+
+def tapered_score(middlegame_score, endgame_score, phase):
+    """Blends middlegame and endgame scores by the game phase."""
+    phase = min(phase, MAX_PHASE)
+    return (middlegame_score * phase + endgame_score * (MAX_PHASE - phase)) // MAX_PHASE
@@ -0,0 +1,33 @@
+"""Random keys for Zobrist hashing of positions.
+
+A position's key is the XOR of one key per piece on its square, one key for the set of
+castling rights, one for the en passant file and one when black is to move. Moving a
+piece only changes a couple of terms, so the key is updated incrementally.
+"""
+import random
+
+from game_logic.pieces import PAWN, KING
+
+# Fixed seed so keys, and anything stored by key, are the same in every run
+_random = random.Random(20240101)
+
+# PIECE_KEYS[color][piece type code][y * 8 + x]
+PIECE_KEYS = {
+    color: [[_random.getrandbits(64) for _ in range(64)] for _ in range(PAWN, KING + 1)]
+    for color in ('white', 'black')
+}
+
+WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE = 1, 2, 4, 8
+_castling_right_keys = [_random.getrandbits(64) for _ in range(4)]
+# One key per combination of castling rights, indexed by the rights bit mask
+CASTLING_KEYS = [0] * 16
+for _rights in range(16):
+    for _bit in range(4):
+        if _rights & (1 << _bit):
+            CASTLING_KEYS[_rights] ^= _castling_right_keys[_bit]
+
+# Indexed by the file of the pawn that can be captured en passant, None when there is none
+EN_PASSANT_KEYS = {None: 0}
+EN_PASSANT_KEYS.update({x: _random.getrandbits(64) for x in range(8)})
+
+SIDE_KEY = _random.getrandbits(64)
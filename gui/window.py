@@ -17,7 +17,7 @@ class Button:
 
 import sys
 from utils.utilities import load_png_keep_aspect_ratio
-from game_logic.pieces import King
+from game_logic.pieces import KING
 
 class Window:
     def __init__(self, width=1028, height=1088, white_perspective=False, isAI=False):
@@ -33,6 +33,10 @@ class Window:
 
         self.new_game_button = Button(10, 10, 100, 40, 'New Game', (200, 100, 100))
         self.undo_button = Button(120, 10, 100, 40, 'Undo', (200, 100, 100))
+        self.cancel_button = Button(230, 10, 100, 40, 'Cancel', (200, 100, 100))
+
+        # Set by main to the BackgroundSearch running the AI, if there is one
+        self.ai_search = None
 
         self.dragging_piece = None
         self.dragging_from_pos = None
@@ -49,6 +53,7 @@ class Window:
         """
         pieces = ['bp', 'bR', 'bN', 'bB', 'bQ', 'bK', 'wp', 'wR', 'wN', 'wB', 'wQ', 'wK']
         self.images = {piece: load_png_keep_aspect_ratio(f'gui/assets/pieces/PNGs/{piece}.png', self.piece_size) for piece in pieces}
+        self.thinking_font = pygame.font.SysFont(None, 32)
 
 
     def render(self, game):
@@ -105,6 +110,23 @@ class Window:
         # Draw buttons on the screen
         self.new_game_button.draw(self.window)
         self.undo_button.draw(self.window)
+        if self.is_ai_thinking():
+            self.cancel_button.draw(self.window)
+            self.draw_thinking_indicator()
+
+    def draw_thinking_indicator(self):
+        # Animated "Thinking..." next to the buttons, redrawn every frame while the AI searches
+        dots = '.' * (pygame.time.get_ticks() // 400 % 4)
+        text = self.thinking_font.render('Thinking' + dots, True, (0, 0, 0))
+        self.window.blit(text, text.get_rect(midleft=(self.cancel_button.rect.right + 20, self.top_panel_height // 2)))
+
+    def is_ai_thinking(self):
+        return self.ai_search is not None and self.ai_search.is_thinking()
+
+    def cancel_ai_search(self, game):
+        # Stop the AI and take back the move it was answering, so it is the player's turn again
+        self.ai_search.cancel()
+        game.undo_move()
 
     def render_mate(self, game, text):
         font = pygame.font.SysFont(None, 72)
@@ -165,7 +187,7 @@ class Window:
                     self.window.blit(piece_image, (x_pos, y_pos))
 
                     # Highlight the king in red border if it's in check
-                    if isinstance(piece, King) and piece.color is game.current_turn and game.is_current_player_in_check:
+                    if piece.piece_type == KING and piece.color == game.current_turn and game.is_current_player_in_check:
                         self.highlight_square((row_view, col_view), (255, 0, 0))
 
         # Draw the dragging piece at the cursor position
@@ -229,6 +251,9 @@ class Window:
                 sys.exit()
             elif game.game_over:
                 return
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                if self.is_ai_thinking():
+                    self.cancel_ai_search(game)
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 self.handle_mouse_down(event.pos, game)
             elif event.type == pygame.MOUSEMOTION:
@@ -239,6 +264,9 @@ class Window:
                 self.update_sizes()
 
     def handle_mouse_down(self, pos, game):
+        if self.is_ai_thinking():
+            # Pieces can't be picked up while the AI is choosing its move
+            return
         row, col = self.get_square_from_cursor(pos, game)
         piece = game.board.get_piece((row, col))
         if piece and piece.color == game.current_turn:
@@ -265,7 +293,14 @@ class Window:
         self.dragging_piece_pos = None
 
         # Check if any button is clicked
-        if self.new_game_button.rect.collidepoint(pos):
+        if self.is_ai_thinking():
+            # Undo while the AI is thinking only takes back the player's move
+            if self.cancel_button.rect.collidepoint(pos) or self.undo_button.rect.collidepoint(pos):
+                self.cancel_ai_search(game)
+            elif self.new_game_button.rect.collidepoint(pos):
+                self.ai_search.cancel()
+                game.reset_game()
+        elif self.new_game_button.rect.collidepoint(pos):
             game.reset_game()
         elif self.undo_button.rect.collidepoint(pos):
             game.undo_move()
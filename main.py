@@ -1,14 +1,17 @@
 import random
-import pygame
 import sys
 from ai.chess_ai import ChessAI
 from ai.minimax.minimax_chess_ai import MinimaxChessAI
 from ai.minimax.minimax_with_ab_pruning_chess_ai import MinimaxWithABPruningChessAI
 from ai.random.random_chess_ai import RandomChessAI
+from ai.background_search import BackgroundSearch
 from game_logic.game import Game
-from gui.window import Window
 
 def main():
+    # The GUI modules are only imported when the window is opened, see engine.py for the headless entry point
+    import pygame
+    from gui.window import Window
+
     # Initialize Pygame
     pygame.init()
 
@@ -23,6 +26,10 @@ def main():
     # Set up the game window
     window = Window(white_perspective = player_color == 'white', isAI=ai_player is not None)
 
+    # Search on a background thread so the window keeps handling events and rendering while the AI thinks
+    ai_search = BackgroundSearch(ai_player) if ai_player else None
+    window.ai_search = ai_search
+
     # Create an instance of the Game class
     game = Game()
 
@@ -38,16 +45,18 @@ def main():
         # Render the current game state
         window.render(game)
 
-        # If it's the AI's turn, make a move
-        if not game.game_over and ai_player and game.current_turn != player_color:
-            ai_move = ai_player.choose_move(game)
-            if(ai_move is None):
-                print('AI could not find a move')
-                ai_player.choose_move(game)
-            print('AI move was: ' + str(ai_move[0]) + '-->' + str(ai_move[1]))
-            if(ai_move != None):
-                if not game.attempt_move(ai_move[0], ai_move[1]):
-                    raise Exception("AI made an invalid move:" + str(ai_move[0]) + '-->' + str(ai_move[1]) + '\n' + game.board.print_board())
+        # If it's the AI's turn, start a search, or make the move once the search of this position has finished
+        if not game.game_over and ai_search and game.current_turn != player_color:
+            if ai_search.has_result(game):
+                ai_move = ai_search.result()
+                if(ai_move is None):
+                    print('AI could not find a move')
+                else:
+                    print('AI move was: ' + str(ai_move[0]) + '-->' + str(ai_move[1]))
+                    if not game.attempt_move(ai_move[0], ai_move[1]):
+                        raise Exception("AI made an invalid move:" + str(ai_move[0]) + '-->' + str(ai_move[1]) + '\n' + game.board.print_board())
+            elif not ai_search.is_thinking():
+                ai_search.start(game)
 
         #for testing
         #game.board.print_board()
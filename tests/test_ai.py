@@ -0,0 +1,286 @@
+import unittest
+import sys
+import os
+import threading
+import time
+import pickle
+# Compute the path to the root directory (ChessAI/) and adds it to sys.path. Allows for running tests from root directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ai.minimax.minimax_chess_ai import MinimaxChessAI
+from ai.minimax.minimax_with_ab_pruning_chess_ai import MinimaxWithABPruningChessAI
+from ai.minimax.move_ordering import MoveOrderer
+from ai.minimax.evaluation import evaluate_board
+from ai.background_search import BackgroundSearch
+from ai.minimax.transposition_table import TranspositionTable, EXACT, LOWER_BOUND
+from game_logic.game import Game
+from game_logic.perft import PERFT_POSITIONS
+from game_logic.pieces import King, Queen, Rook
+from game_logic.psqt import MAX_PHASE
+
+class TestMinimaxAI(unittest.TestCase):
+    def setUp(self):
+        # White to move can mate with the rook on the back rank
+        self.game = Game()
+        for y in range(8):
+            for x in range(8):
+                self.game.board.set_piece(None, (y, x))
+        self.game.board.set_piece(King('black', (7, 7)), (7, 7))
+        self.game.board.set_piece(Queen('white', (5, 6)), (5, 6))
+        self.game.board.set_piece(Rook('white', (0, 0)), (0, 0))
+        self.game.board.set_piece(King('white', (0, 4)), (0, 4))
+        self.game.board.get_piece((0, 4)).has_moved = True
+        self.game.update_game_state()
+
+    def test_minimax_finds_mate_in_one(self):
+        self.assertEqual(MinimaxChessAI(1).choose_move(self.game), ((0, 0), (7, 0)))
+
+    def test_minimax_minimizes_for_black(self):
+        game = Game.from_fen('3rk3/8/8/3Q4/8/8/8/4K3 b - - 0 1')
+        self.assertEqual(MinimaxChessAI(1).choose_move(game), ((7, 3), (4, 3)))
+
+    def test_ab_pruning_finds_mate_in_one(self):
+        self.assertEqual(MinimaxWithABPruningChessAI(1).choose_move(self.game), ((0, 0), (7, 0)))
+
+    def test_search_leaves_game_unchanged(self):
+        game = Game()
+        game.attempt_move((1, 4), (3, 4))
+        moves_before = list(game.get_available_moves())
+        move = MinimaxWithABPruningChessAI(1).choose_move(game)
+        self.assertIn(move, moves_before)
+        self.assertEqual(game.current_turn, 'black')
+        self.assertEqual(len(game.board.history), 1)
+        self.assertEqual(game.get_available_moves(), moves_before)
+
+class TestIterativeDeepening(unittest.TestCase):
+    def test_time_limit(self):
+        game = Game.from_fen(PERFT_POSITIONS['kiwipete'][0])
+        ai = MinimaxWithABPruningChessAI(64, time_limit=0.3)
+        start = time.perf_counter()
+        move = ai.choose_move(game)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertIn(move, game.get_available_moves())
+
+    def test_node_limit(self):
+        game = Game.from_fen(PERFT_POSITIONS['kiwipete'][0])
+        ai = MinimaxWithABPruningChessAI(64, node_limit=500)
+        move = ai.choose_move(game)
+        self.assertLessEqual(ai.nodes, 500)
+        self.assertIn(move, game.get_available_moves())
+
+    def test_aborted_first_move_returns_root_move(self):
+        # The search runs out of nodes inside the first root move, several plies below the root
+        ai = MinimaxWithABPruningChessAI(3, node_limit=1)
+        move = ai.choose_move(Game())
+        self.assertIn(move, Game().get_available_moves())
+
+    def test_stop_without_search_does_not_abort_next_search(self):
+        ai = MinimaxWithABPruningChessAI(3)
+        ai.stop()
+        for _ in range(2):
+            self.assertIn(ai.choose_move(Game()), Game().get_available_moves())
+            self.assertEqual(ai.completed_depth, 3)
+
+    def test_returns_move_of_last_completed_depth(self):
+        game = Game.from_fen(PERFT_POSITIONS['position3'][0])
+        full = MinimaxWithABPruningChessAI(1)
+        expected = full.choose_move(game)
+        limited = MinimaxWithABPruningChessAI(64, node_limit=full.nodes + 1)
+        self.assertEqual(limited.choose_move(game), expected)
+        self.assertEqual(limited.completed_depth, 1)
+
+    def test_finds_mate_for_black(self):
+        game = Game.from_fen('kr6/8/8/8/8/8/5PPP/6K1 b - - 0 1')
+        self.assertEqual(MinimaxWithABPruningChessAI(1).choose_move(game), ((7, 1), (0, 1)))
+
+class TestMoveOrdering(unittest.TestCase):
+    def test_order(self):
+        # White can take the black queen with the pawn or the rook
+        game = Game.from_fen('4k3/8/8/2n5/3q4/4P3/8/R2RK3 w - - 0 1')
+        orderer = MoveOrderer()
+        quiet_move = ((0, 0), (1, 0))
+        orderer.killers[0][0] = ((0, 4), (1, 4))
+        orderer.history[('white', quiet_move)] = 50
+        moves = orderer.order_moves(game, game.get_available_moves(), 0, hash_move=((0, 0), (0, 1)))
+        self.assertEqual(moves[0], ((0, 0), (0, 1)))  # Hash move
+        self.assertEqual(moves[1], ((2, 4), (3, 3)))  # Pawn takes queen
+        self.assertEqual(moves[2], ((0, 3), (3, 3)))  # Rook takes queen
+        self.assertEqual(moves[3], ((0, 4), (1, 4)))  # Killer move
+        self.assertEqual(moves[4], quiet_move)  # Best history score
+
+    def test_ordering_keeps_score_and_raises_first_move_cutoffs(self):
+        game = Game.from_fen(PERFT_POSITIONS['position6'][0])
+        unordered = MinimaxWithABPruningChessAI(2, order_moves=False, quiescence_depth=0)
+        ordered = MinimaxWithABPruningChessAI(2, quiescence_depth=0)
+        unordered.choose_move(game)
+        ordered.choose_move(game)
+        self.assertEqual(unordered.best_score, ordered.best_score)
+        self.assertLess(ordered.nodes, unordered.nodes)
+        self.assertGreater(ordered.move_orderer.statistics()['first_move_cutoff_rate'],
+                           unordered.move_orderer.statistics()['first_move_cutoff_rate'])
+
+class TestQuiescence(unittest.TestCase):
+    def setUp(self):
+        # The d5 pawn is defended, so taking it with the queen loses the queen
+        self.game = Game.from_fen('4k3/8/4p3/3p4/8/8/8/3QK3 w - - 0 1')
+
+    def test_horizon_without_quiescence_sees_free_pawn(self):
+        ai = MinimaxWithABPruningChessAI(1, quiescence_depth=0)
+        score = ai.minimax(self.game, 1, True, float('-inf'), float('inf'))
+        self.assertGreater(score, evaluate_board(self.game.board) + 100)
+
+    def test_quiescence_resolves_exchange(self):
+        ai = MinimaxWithABPruningChessAI(1)
+        score = ai.minimax(self.game, 1, True, float('-inf'), float('inf'))
+        self.assertLess(score, evaluate_board(self.game.board) + 100)
+        self.assertNotEqual(ai.choose_move(self.game), ((0, 3), (4, 3)))
+
+    def test_capture_moves(self):
+        self.assertEqual(self.game.get_capture_moves(), [((0, 3), (4, 3))])
+
+class TestParallelSearch(unittest.TestCase):
+    def setUp(self):
+        self.game = Game.from_fen(PERFT_POSITIONS['position3'][0])
+        self.ai = MinimaxWithABPruningChessAI(2, workers=2)
+
+    def tearDown(self):
+        self.ai.close()
+
+    def test_matches_serial_search(self):
+        serial = MinimaxWithABPruningChessAI(2)
+        serial.choose_move(self.game)
+        move = self.ai.choose_move(self.game)
+        self.assertIn(move, self.game.get_available_moves())
+        self.assertEqual(self.ai.best_score, serial.best_score)
+        self.assertEqual(self.ai.completed_depth, 2)
+
+    def test_pool_is_kept_between_moves(self):
+        self.ai.choose_move(self.game)
+        pool = self.ai.pool
+        self.ai.choose_move(self.game)
+        self.assertIs(self.ai.pool, pool)
+        self.assertIsNone(pickle.loads(pickle.dumps(self.ai)).pool)
+
+    def test_node_limit_is_shared_by_workers(self):
+        ai = MinimaxWithABPruningChessAI(64, node_limit=2000, workers=2)
+        try:
+            move = ai.choose_move(self.game)
+        finally:
+            ai.close()
+        self.assertLessEqual(ai.nodes, 2000)
+        self.assertIn(move, self.game.get_available_moves())
+
+    def test_pool_is_restarted_when_settings_change(self):
+        self.ai.choose_move(self.game)
+        pool = self.ai.pool
+        self.ai.tt_size_mb = 1
+        self.ai.choose_move(self.game)
+        self.assertIsNot(self.ai.pool, pool)
+        self.assertEqual(self.ai.pool.settings['tt_size_mb'], 1)
+
+class TestBackgroundSearch(unittest.TestCase):
+    def test_move_is_returned_for_the_searched_position(self):
+        game = Game.from_fen(PERFT_POSITIONS['position3'][0])
+        search = BackgroundSearch(MinimaxWithABPruningChessAI(2))
+        done = []
+        future = search.start(game, done.append)
+        move = future.result(timeout=30)
+        search.thread.join()
+        self.assertEqual(done, [future])
+        self.assertTrue(search.has_result(game))
+        self.assertEqual(search.result(), move)
+        self.assertIn(move, game.get_available_moves())
+
+    def test_cancel_discards_the_move(self):
+        game = Game.from_fen(PERFT_POSITIONS['kiwipete'][0])
+        search = BackgroundSearch(MinimaxWithABPruningChessAI(6))
+        search.start(game)
+        self.assertTrue(search.is_thinking())
+        search.cancel()
+        search.thread.join(timeout=30)
+        self.assertFalse(search.is_thinking())
+        self.assertFalse(search.has_result(game))
+
+    def test_cancel_before_search_thread_runs(self):
+        # Hold the search thread back until the cancel has been sent. Without limits the search only ends through it.
+        class GatedAI(MinimaxWithABPruningChessAI):
+            gate = threading.Event()
+
+            def choose_move(self, game):
+                self.gate.wait()
+                return super().choose_move(game)
+
+        search = BackgroundSearch(GatedAI(64))
+        search.start(Game.from_fen(PERFT_POSITIONS['kiwipete'][0]))
+        search.cancel()
+        GatedAI.gate.set()
+        search.thread.join(timeout=10)
+        self.assertFalse(search.is_thinking())
+
+    def test_result_from_another_position_is_not_used(self):
+        game = Game()
+        search = BackgroundSearch(MinimaxWithABPruningChessAI(1))
+        search.start(game).result(timeout=30)
+        game.attempt_move((1, 4), (3, 4))
+        self.assertFalse(search.has_result(game))
+
+class TestEvaluation(unittest.TestCase):
+    def assert_totals_match_rebuild(self, board):
+        totals = (board.middlegame_score, board.endgame_score, board.phase)
+        board.index_pieces()
+        self.assertEqual(totals, (board.middlegame_score, board.endgame_score, board.phase))
+
+    def test_start_position_is_balanced(self):
+        board = Game().board
+        self.assertEqual(evaluate_board(board), 0)
+        self.assertEqual(board.phase, MAX_PHASE)
+
+    def test_incremental_totals_through_special_moves_and_undo(self):
+        # Castling, en passant and promotion with capture, then everything undone
+        game = Game.from_fen('r3k2r/1P6/8/3pP3/8/8/8/R3K2R w KQkq d6 0 1')
+        start = (game.board.middlegame_score, game.board.endgame_score, game.board.phase)
+        for move in [((4, 4), (5, 3)), ((7, 4), (7, 6)), ((6, 1), (7, 0)), ((7, 5), (7, 0)), ((0, 4), (0, 2))]:
+            self.assertTrue(game.push(*move), move)
+            self.assert_totals_match_rebuild(game.board)
+        while game.state_stack:
+            game.pop()
+        self.assertEqual((game.board.middlegame_score, game.board.endgame_score, game.board.phase), start)
+
+    def test_tapered_king_placement(self):
+        # With only kings and pawns left, a central king scores better than a cornered one
+        central = Game.from_fen('8/8/8/4k3/8/8/3P4/K7 w - - 0 1')
+        cornered = Game.from_fen('7k/8/8/8/8/8/3P4/K7 w - - 0 1')
+        self.assertEqual(central.board.phase, 0)
+        self.assertLess(evaluate_board(central.board), evaluate_board(cornered.board))
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_store_and_probe(self):
+        table = TranspositionTable(1)
+        table.store(12345, 3, 1.5, EXACT, ((1, 4), (3, 4)))
+        self.assertEqual(table.probe(12345)[1:5], (3, 1.5, EXACT, ((1, 4), (3, 4))))
+        self.assertIsNone(table.probe(54321))
+
+    def test_depth_preferred_replacement(self):
+        table = TranspositionTable(1)
+        colliding_key = 7 + len(table.depth_preferred)  # Same bucket as key 7
+        table.store(7, 5, 0, EXACT, None)
+        table.store(colliding_key, 2, 0, LOWER_BOUND, None)
+        # The shallow result goes to the always-replace slot, the deep one stays
+        self.assertEqual(table.probe(7)[1], 5)
+        self.assertEqual(table.probe(colliding_key)[1], 2)
+        # Deep results from an earlier search can be replaced
+        table.new_search()
+        table.store(colliding_key, 1, 0, EXACT, None)
+        self.assertIs(table.depth_preferred[7 & table.mask][0], colliding_key)
+
+    def test_search_score_unchanged_by_table(self):
+        game = Game.from_fen(PERFT_POSITIONS['kiwipete'][0])
+        scores = []
+        for tt_size_mb in (0, 1):
+            ai = MinimaxWithABPruningChessAI(1, tt_size_mb)
+            # Search twice so the second search reads the first one's entries
+            for _ in range(2):
+                scores.append(ai.minimax(game, 2, True, float('-inf'), float('inf')))
+        self.assertEqual(len(set(scores)), 1)
+
+if __name__ == '__main__':
+    unittest.main()
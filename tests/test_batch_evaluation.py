@@ -0,0 +1,53 @@
+import unittest
+import sys
+import os
+# Compute the path to the root directory (ChessAI/) and adds it to sys.path. Allows for running tests from root directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ai.minimax.batch_evaluation import BatchEvaluator, encode_positions, np
+from ai.minimax.evaluation import evaluate_board
+from game_logic.bitboard import BitboardChessboard
+from game_logic.game import Game
+from game_logic.perft import PERFT_POSITIONS
+from game_logic.pieces import Knight, Bishop, Rook, Queen
+
+@unittest.skipUnless(np is not None, 'NumPy is not installed, see requirements-optional.txt')
+class TestBatchEvaluation(unittest.TestCase):
+    def setUp(self):
+        self.games = [Game()] + [Game.from_fen(fen) for fen, _ in PERFT_POSITIONS.values()]
+        self.games.append(Game.from_fen('8/8/8/4k3/8/8/3P4/K7 w - - 0 1'))
+
+    def test_matches_scalar_evaluator(self):
+        scores = BatchEvaluator().evaluate(self.games)
+        self.assertEqual(list(scores), [evaluate_board(game.board) for game in self.games])
+
+    def test_accepts_boards_and_encoded_arrays(self):
+        evaluator = BatchEvaluator()
+        expected = list(evaluator.evaluate(self.games))
+        boards = [game.board for game in self.games]
+        self.assertEqual(list(evaluator.evaluate(boards)), expected)
+        encoded = encode_positions(self.games)
+        self.assertEqual(list(evaluator.evaluate(encoded.reshape(len(encoded), 12, 8, 8))), expected)
+        codes = (encoded * np.arange(1, 13)[None, :, None]).sum(axis=1)
+        self.assertEqual(list(evaluator.evaluate(codes)), expected)
+        self.assertEqual(list(evaluator.evaluate([Game(BitboardChessboard())])), [0])
+
+    def test_mobility_counts_pseudo_legal_piece_moves(self):
+        encoded = encode_positions(self.games).astype(np.int64)
+        mobility = BatchEvaluator().mobility(encoded)
+        for game, value in zip(self.games, mobility):
+            expected = 0
+            for color, sign in (('white', 1), ('black', -1)):
+                for piece in game.board.get_pieces(color):
+                    if isinstance(piece, (Knight, Bishop, Rook, Queen)):
+                        expected += sign * len(piece.get_pseudo_legal_moves(game.board))
+            self.assertEqual(value, expected)
+
+    def test_mobility_weight(self):
+        games = self.games[:3]
+        plain = BatchEvaluator().evaluate(games)
+        weighted = BatchEvaluator(mobility_weight=2).evaluate(games)
+        mobility = BatchEvaluator().mobility(encode_positions(games).astype(np.int64))
+        self.assertEqual(list(weighted - plain), list(2 * mobility))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import sys
+import os
+import io
+import random
+import tempfile
+# Compute the path to the root directory (ChessAI/) and adds it to sys.path. Allows for running tests from root directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ai.bitbases import Bitbases, generate, file_index, TABLEBASE_WIN
+from ai.minimax.minimax_with_ab_pruning_chess_ai import MinimaxWithABPruningChessAI
+from game_logic.game import Game
+from game_logic.pieces import PAWN, ROOK
+
+def random_game(rng, extra):
+    # Returns a legal game with two kings and the extra piece letter on random squares, either side to move
+    while True:
+        squares = rng.sample(range(64), 3)
+        letters = ['K', 'k', extra] if rng.random() < 0.5 else ['k', 'K', extra.lower()]
+        rows = [['1'] * 8 for _ in range(8)]
+        for square, letter in zip(squares, letters):
+            rows[square // 8][square % 8] = letter
+        if extra == 'P' and squares[2] // 8 in (0, 7):
+            continue
+        placement = '/'.join(''.join(row) for row in reversed(rows))
+        game = Game.from_fen(f'{placement} {rng.choice("wb")} - - 0 1')
+        (white_y, white_x), (black_y, black_x) = game.board.king_positions['white'], game.board.king_positions['black']
+        waiting = 'black' if game.current_turn == 'white' else 'white'
+        if max(abs(white_y - black_y), abs(white_x - black_x)) > 1 and not game.board.is_in_check(waiting):
+            return game
+
+
+class TestBitbases(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        generate(cls.directory.name, out=io.StringIO())
+        cls.bitbases = Bitbases(cls.directory.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.bitbases.close()
+        cls.directory.cleanup()
+
+    def probe(self, fen):
+        game = Game.from_fen(fen)
+        return self.bitbases.probe_wdl(game), self.bitbases.probe_dtm(game)
+
+    def test_known_positions(self):
+        self.assertEqual(self.probe('k7/8/1K6/8/8/8/8/7R w - - 0 1'), (1, 1))
+        self.assertEqual(self.probe('k7/8/1Q6/8/8/8/8/K7 b - - 0 1'), (0, None))
+        # The king in front of its pawn on the sixth rank wins, a rook pawn with the king in the corner draws
+        self.assertEqual(self.probe('4k3/8/4K3/4P3/8/8/8/8 w - - 0 1')[0], 1)
+        self.assertEqual(self.probe('7k/8/8/8/8/8/7P/7K w - - 0 1'), (0, None))
+        # Black with the extra piece is mirrored
+        self.assertEqual(self.probe('7r/8/8/8/8/1k6/8/K7 b - - 0 1'), (1, 1))
+        self.assertIsNone(self.bitbases.probe_wdl(Game()))
+        self.assertIsNone(self.bitbases.probe_wdl(Game.from_fen('4k3/8/8/8/8/8/8/4K2R w K - 0 1')))
+
+    def test_symmetric_indexes(self):
+        # Mirroring the board left to right, or also top to bottom without pawns, gives the same file entry
+        for white_king, black_king, piece in ((1, 40, 20), (14, 63, 9), (52, 3, 30)):
+            mirrored = (white_king ^ 7, black_king ^ 7, piece ^ 7)
+            self.assertEqual(file_index(PAWN, 0, white_king, black_king, piece), file_index(PAWN, 0, *mirrored))
+            flipped = (white_king ^ 63, black_king ^ 63, piece ^ 63)
+            self.assertEqual(file_index(ROOK, 1, white_king, black_king, piece), file_index(ROOK, 1, *flipped))
+
+    def test_agrees_with_move_generator(self):
+        # A win needs a move into a loss one ply shorter, a loss needs every move to lead to a win
+        rng = random.Random(5)
+        for extra in 'QRP':
+            for _ in range(100):
+                game = random_game(rng, extra)
+                if game.game_over:
+                    self.assertEqual(self.bitbases.probe_wdl(game), -1 if game.is_checkmate else 0)
+                    continue
+                children = []
+                for move in game.get_available_moves():
+                    game.push(*move)
+                    if game.is_checkmate:
+                        children.append((-1, 0))
+                    elif game.game_over or self.bitbases.probe_wdl(game) is None:
+                        children.append((0, None))
+                    else:
+                        children.append((self.bitbases.probe_wdl(game), self.bitbases.probe_dtm(game)))
+                    game.pop()
+                if any(wdl == -1 for wdl, _ in children):
+                    expected = (1, 1 + min(plies for wdl, plies in children if wdl == -1))
+                elif all(wdl == 1 for wdl, _ in children):
+                    expected = (-1, 1 + max(plies for _, plies in children))
+                else:
+                    expected = (0, None)
+                self.assertEqual((self.bitbases.probe_wdl(game), self.bitbases.probe_dtm(game)), expected,
+                                 game.to_fen())
+
+    def test_search_converts_ending(self):
+        game = Game.from_fen('8/8/3k4/8/8/8/8/1K5Q w - - 0 1')
+        self.assertEqual(self.bitbases.score(game), TABLEBASE_WIN - self.bitbases.probe_dtm(game))
+        ai = MinimaxWithABPruningChessAI(1, bitbases=self.bitbases)
+        plies = self.bitbases.probe_dtm(game)
+        for _ in range(plies):
+            game.push(*ai.choose_move(game))
+        self.assertTrue(game.is_checkmate)
+
+
+if __name__ == '__main__':
+    unittest.main()
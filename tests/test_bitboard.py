@@ -0,0 +1,87 @@
+import unittest
+import sys
+import os
+import random
+# Compute the path to the root directory (ChessAI/) and adds it to sys.path. Allows for running tests from root directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from game_logic.bitboard import BitboardChessboard, rook_attacks, bishop_attacks, square_index
+from game_logic.board import Chessboard
+from game_logic.game import Game
+from game_logic.perft import PERFT_POSITIONS, perft
+
+class TestBitboard(unittest.TestCase):
+    def test_perft_matches_reference(self):
+        for name, depth in (('startpos', 3), ('kiwipete', 2), ('position3', 3), ('position6', 2)):
+            fen, counts = PERFT_POSITIONS[name]
+            self.assertEqual(perft(Game.from_fen(fen, BitboardChessboard), depth), counts[depth], name)
+
+    def test_moves_match_array_board(self):
+        # Random games from positions with castling, en passant, pins and promotions, both colours at every stop
+        rng = random.Random(3)
+        fens = [fen for fen, _ in PERFT_POSITIONS.values()] + ['8/P6k/8/8/8/8/6Kp/8 w - - 0 1',
+                                                                 '4k3/8/8/K2pP2r/8/8/8/8 w - d6 0 2']
+        for fen in fens:
+            for _ in range(10):
+                array_game, bitboard_game = Game.from_fen(fen), Game.from_fen(fen, BitboardChessboard)
+                for _ in range(rng.randint(0, 40)):
+                    if array_game.game_over:
+                        break
+                    move = rng.choice(array_game.get_available_moves())
+                    array_game.push(*move)
+                    bitboard_game.push(*move)
+                for color in ('white', 'black'):
+                    self.assertEqual(set(bitboard_game.board.generate_legal_moves(color)),
+                                     set(array_game.board.generate_legal_moves(color)), array_game.to_fen())
+                    self.assertEqual(set(bitboard_game.board.generate_legal_captures(color)),
+                                     set(array_game.board.generate_legal_captures(color)), array_game.to_fen())
+
+    def test_attacks_match_array_board(self):
+        fen = PERFT_POSITIONS['kiwipete'][0]
+        array_board = Game.from_fen(fen).board
+        bitboard_board = Game.from_fen(fen, BitboardChessboard).board
+        for y in range(8):
+            for x in range(8):
+                for color in ('white', 'black'):
+                    self.assertEqual(bitboard_board.is_square_under_attack((y, x), color),
+                                     array_board.is_square_under_attack((y, x), color), f'{(y, x)} {color}')
+
+    def test_slider_attacks_stop_at_blockers(self):
+        occupied = 1 << square_index((0, 6)) | 1 << square_index((3, 3))
+        attacks = rook_attacks(square_index((0, 3)), occupied)
+        self.assertTrue(attacks & 1 << square_index((0, 6)))
+        self.assertFalse(attacks & 1 << square_index((0, 7)))
+        self.assertTrue(attacks & 1 << square_index((3, 3)))
+        self.assertFalse(attacks & 1 << square_index((4, 3)))
+        self.assertEqual(bin(bishop_attacks(square_index((0, 0)), 0)).count('1'), 7)
+
+    def test_bitboards_follow_moves_and_undo(self):
+        game = Game(BitboardChessboard())
+        board = game.board
+        for move in [((1, 4), (3, 4)), ((6, 3), (4, 3)), ((3, 4), (4, 3)), ((7, 3), (4, 3))]:
+            self.assertTrue(game.attempt_move(*move))
+        before = ({color: list(bitboards) for color, bitboards in board.piece_bitboards.items()}, dict(board.color_bitboards))
+        game.undo_move()
+        game.undo_move()
+        game.attempt_move((3, 4), (4, 3))
+        game.attempt_move((7, 3), (4, 3))
+        after = ({color: list(bitboards) for color, bitboards in board.piece_bitboards.items()}, dict(board.color_bitboards))
+        self.assertEqual(before, after)
+        board.sync_bitboards()
+        self.assertEqual(after, ({color: list(bitboards) for color, bitboards in board.piece_bitboards.items()}, dict(board.color_bitboards)))
+
+    def test_copy_keeps_board_class(self):
+        game = Game(BitboardChessboard())
+        self.assertIsInstance(game.copy().board, BitboardChessboard)
+        self.assertIsInstance(Game().copy().board, Chessboard)
+        self.assertIsInstance(Game.from_snapshot(game.snapshot()).board, BitboardChessboard)
+
+    def test_copy_has_own_bitboards(self):
+        game = Game(BitboardChessboard())
+        game_copy = game.copy()
+        game_copy.attempt_move((1, 4), (3, 4))
+        self.assertNotEqual(game_copy.board.color_bitboards, game.board.color_bitboards)
+        game.board.sync_bitboards()
+        self.assertEqual(perft(game, 2), 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+import sys
+import os
+import io
+from contextlib import redirect_stdout, redirect_stderr
+# Compute the path to the root directory (ChessAI/) and adds it to sys.path. Allows for running tests from root directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import engine
+from utils.import_time import HEADLESS_MODULES, measure_import
+
+class TestEngine(unittest.TestCase):
+    def test_move_command(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            status = engine.main(['move', '--fen', '7k/8/6Q1/8/8/8/8/R3K3 w Q - 0 1', '--ai', 'minimax_ab:depth=1'])
+        self.assertEqual(status, 0)
+        self.assertEqual(out.getvalue().strip(), 'a1a8')
+
+    def test_unknown_command(self):
+        with redirect_stderr(io.StringIO()):
+            self.assertEqual(engine.main(['fly']), 2)
+
+    def test_headless_modules_do_not_load_pygame(self):
+        for module in HEADLESS_MODULES:
+            milliseconds, loaded = measure_import(module, runs=1)
+            self.assertIsNotNone(milliseconds, module)
+            self.assertEqual(loaded, (), module)
+
+
+if __name__ == '__main__':
+    unittest.main()
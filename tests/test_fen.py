@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+# Compute the path to the root directory (ChessAI/) and adds it to sys.path. Allows for running tests from root directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from game_logic.bitboard import BitboardChessboard
+from game_logic.fen import STARTING_FEN
+from game_logic.game import Game
+from game_logic.perft import PERFT_POSITIONS
+
+class TestFen(unittest.TestCase):
+    def test_start_position(self):
+        self.assertEqual(Game().to_fen(), STARTING_FEN)
+        game = Game.from_fen(STARTING_FEN)
+        self.assertEqual(game.zobrist_key, Game().zobrist_key)
+        self.assertEqual(len(game.get_available_moves()), 20)
+
+    def test_round_trip(self):
+        fens = [fen for fen, _ in PERFT_POSITIONS.values()] + [
+            'rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3',
+            '4k3/8/8/8/8/8/8/4K2R b K - 12 40',
+        ]
+        for fen in fens:
+            self.assertEqual(Game.from_fen(fen).to_fen(), fen)
+            self.assertEqual(Game.from_fen(fen, BitboardChessboard).to_fen(), fen)
+
+    def test_en_passant_square_allows_capture(self):
+        game = Game.from_fen('rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3')
+        self.assertIn(((4, 4), (5, 5)), game.get_available_moves())
+        self.assertNotIn(((4, 4), (5, 3)), game.get_available_moves())
+
+    def test_undo_stops_at_the_loaded_position(self):
+        # The double push behind the en passant square was never played, so it cannot be taken back
+        fen = 'rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3'
+        game = Game.from_fen(fen)
+        game.attempt_move((4, 4), (5, 5))
+        game.undo_move()
+        game.undo_move()
+        self.assertEqual(game.to_fen(), fen)
+        restored = Game.from_snapshot(game.copy().snapshot())
+        restored.undo_move()
+        self.assertEqual(restored.to_fen(), fen)
+
+    def test_move_counters_and_rights_follow_moves(self):
+        game = Game()
+        game.push((1, 4), (3, 4))
+        self.assertEqual(game.to_fen(), 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1')
+        game.push((7, 1), (5, 2))
+        game.push((0, 4), (1, 4))
+        self.assertEqual(game.to_fen(), 'r1bqkbnr/pppppppp/2n5/8/4P3/8/PPPPKPPP/RNBQ1BNR b kq - 2 2')
+        game.push((5, 2), (3, 3))
+        game.push((1, 4), (2, 3))
+        game.push((3, 3), (1, 2))  # Captures the c2 pawn
+        self.assertEqual(game.halfmove_clock, 0)
+        self.assertEqual(game.fullmove_number, 4)
+        while game.state_stack:
+            game.pop()
+        self.assertEqual(game.to_fen(), STARTING_FEN)
+
+    def test_invalid_fens(self):
+        for fen in ['', 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1',
+                    'rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+                    'rnbqkbnr/ppppxppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+                    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1',
+                    'rnbqkbn1/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+                    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e6 0 1',
+                    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - zero 1']:
+            with self.assertRaises(ValueError, msg=fen):
+                Game.from_fen(fen)
+
+if __name__ == '__main__':
+    unittest.main()
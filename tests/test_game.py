@@ -1,8 +1,9 @@
 import unittest
 import sys
+import pickle
 sys.path.append('D:\\Projects\\ChessAI')
 from game_logic.game import Game
-from game_logic.pieces import Pawn, Queen, Rook, King
+from game_logic.pieces import Pawn, Queen, Rook, King, KNIGHT, BISHOP, ROOK, QUEEN, KING
 import os
 # Compute the path to the root directory (ChessAI/) and adds it to sys.path. Allows for running tests from root directory
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -33,6 +34,27 @@ class TestGame(unittest.TestCase):
         self.assertTrue(should_be_rook.color == 'white')
         self.assertEqual(self.game.current_turn, 'black')  # Check if turn has switched to black
 
+    def test_queenside_castling_with_attacked_b_file(self):
+        # The rook may pass over an attacked square, only the king's path must be safe
+        self.game.board.set_piece(None, (0, 1))  # Remove knight from its initial position
+        self.game.board.set_piece(None, (0, 2))  # Remove bishop from its initial position
+        self.game.board.set_piece(None, (0, 3))  # Remove queen from its initial position
+        self.game.board.set_piece(None, (1, 0))  # Remove pawn in front of the rook
+        self.game.board.set_piece(Rook('black', (5, 1)), (5, 1))  # Black rook attacks b1 through b2
+        self.game.board.set_piece(None, (1, 1))  # Open the b-file
+        self.game.update_available_moves()
+
+        self.assertIn(((0, 4), (0, 2)), self.game.get_available_moves())
+        self.assertTrue(self.game.attempt_move((0, 4), (0, 2)))
+
+    def test_castling_through_square_attacked_by_pawn(self):
+        self.game.board.set_piece(None, (0, 5))  # Remove bishop between king and rook
+        self.game.board.set_piece(None, (0, 6))  # Remove knight between king and rook
+        self.game.board.set_piece(Pawn('black', (1, 6)), (1, 6))  # Black pawn on g2 attacks f1
+
+        self.assertTrue(self.game.board.is_square_under_attack((0, 5), 'black'))
+        self.assertFalse(self.game.attempt_move((0, 4), (0, 6)))
+
     def test_en_passant(self):
         # Setup:
         self.game.board.set_piece(Pawn('black', (3, 3)), (3, 3))  # create black pawn two steps ahead of white pawns
@@ -106,10 +128,115 @@ class TestGame(unittest.TestCase):
         self.assertTrue(isinstance(self.game.board.get_piece((3, 0)), Pawn))  # Ensure it's a pawn at the new position
         self.assertEqual(self.game.board.get_piece((3, 0)).color, 'black')  # Ensure the pawn is black
 
+    def test_moves_generated_only_when_asked(self):
+        # Fool's mate: game end is detected without building the move list
+        for move in [((1, 5), (2, 5)), ((6, 4), (4, 4)), ((1, 6), (3, 6)), ((7, 3), (3, 7))]:
+            self.assertTrue(self.game.attempt_move(*move))
+            self.assertIsNone(self.game.current_player_available_moves)
+        self.assertTrue(self.game.game_over)
+        self.assertTrue(self.game.is_checkmate)
+        self.assertEqual(self.game.get_available_moves(), [])
+
+    def test_pop_restores_state_after_checkmate(self):
+        moves = [((1, 5), (2, 5)), ((6, 4), (4, 4)), ((1, 6), (3, 6))]
+        for move in moves:
+            self.game.push(*move)
+        moves_before = self.game.get_available_moves()
+
+        self.assertTrue(self.game.push((7, 3), (3, 7)))  # Checkmate
+        self.assertTrue(self.game.is_checkmate)
+        self.game.pop()
+
+        self.assertFalse(self.game.game_over)
+        self.assertFalse(self.game.is_checkmate)
+        self.assertFalse(self.game.is_current_player_in_check)
+        self.assertEqual(self.game.current_turn, 'black')
+        self.assertIs(self.game.get_available_moves(), moves_before)
+        self.assertIsNotNone(self.game.board.get_piece((7, 3)))
+
+    def test_push_rejects_illegal_move(self):
+        self.assertFalse(self.game.push((1, 0), (4, 0)))
+        self.assertEqual(self.game.state_stack, [])
+        self.assertEqual(self.game.current_turn, 'white')
+
     def test_turn_switching(self):
         self.game.attempt_move((1, 0), (2, 0))  # Pawn move
         self.assertEqual(self.game.current_turn, 'black')
 
+    def test_piece_lists_follow_special_moves_and_undo(self):
+        self.game.board.set_piece(None, (0, 5))  # Remove bishop between king and rook
+        self.game.board.set_piece(None, (0, 6))  # Remove knight between king and rook
+        self.game.board.set_piece(Pawn('white', (6, 0)), (6, 0))  # White pawn ready to promote by capturing the knight
+        moves = [((0, 4), (0, 6)), ((6, 3), (4, 3)), ((6, 0), (7, 1)), ((4, 3), (3, 3)), ((1, 4), (3, 4)), ((3, 3), (2, 4))]
+        for move in moves:
+            self.assertTrue(self.game.attempt_move(*move))
+            self.assert_piece_lists_match_board()
+        self.assertEqual(self.game.board.find_king('white'), (0, 6))
+        for _ in moves:
+            self.game.undo_move()
+            self.assert_piece_lists_match_board()
+        self.assertEqual(self.game.board.find_king('white'), (0, 4))
+
+    def test_compact_pieces(self):
+        piece = self.game.board.get_piece((0, 3))
+        self.assertFalse(hasattr(piece, '__dict__'))
+        self.assertEqual(piece.piece_type, QUEEN)
+        self.assertEqual([self.game.board.get_piece((0, x)).piece_type for x in (0, 1, 2, 4)], [ROOK, KNIGHT, BISHOP, KING])
+        # The queen moves along both lines and diagonals once they are open
+        self.game.board.set_piece(None, (1, 3))
+        self.game.board.set_piece(None, (1, 4))
+        self.assertTrue(piece.can_move_to((5, 3), self.game.board))
+        self.assertTrue(piece.can_move_to((3, 6), self.game.board))
+        self.assertFalse(piece.can_move_to((2, 4), self.game.board))
+
+    def test_copy_keeps_history(self):
+        # After e4 ... d5 e5 f5 the copy must still allow exf6 en passant and undo every move
+        for move in [((1, 4), (3, 4)), ((6, 3), (4, 3)), ((3, 4), (4, 4)), ((6, 5), (4, 5))]:
+            self.game.attempt_move(*move)
+        game_copy = self.game.copy()
+        self.assertEqual(len(game_copy.board.history), 4)
+        self.assertEqual(game_copy.zobrist_key, self.game.zobrist_key)
+        self.assertIn(((4, 4), (5, 5)), game_copy.get_available_moves())
+        self.assertTrue(game_copy.attempt_move((4, 4), (5, 5)))
+        self.assertIsNone(self.game.board.get_piece((5, 5)))  # The original is untouched
+        while game_copy.state_stack:
+            game_copy.pop()
+        self.assertEqual(game_copy.board.zobrist_key, Game().board.zobrist_key)
+        self.assertTrue(game_copy.verify_zobrist_key())
+        self.game.board = game_copy.board
+        self.assert_piece_lists_match_board()
+
+    def test_copy_keeps_subclass(self):
+        class VariantGame(Game):
+            pass
+
+        game_copy = VariantGame().copy()
+        self.assertIs(type(game_copy), VariantGame)
+
+    def test_snapshot_round_trip(self):
+        for move in [((1, 4), (3, 4)), ((6, 3), (4, 3)), ((3, 4), (4, 3)), ((7, 3), (4, 3))]:
+            self.game.attempt_move(*move)
+        snapshot = self.game.snapshot()
+        self.assertEqual(pickle.loads(pickle.dumps(snapshot)), snapshot)
+        restored = Game.from_snapshot(snapshot)
+        self.assertEqual(restored.zobrist_key, self.game.zobrist_key)
+        self.assertEqual(restored.snapshot(), snapshot)
+        self.assertEqual(sorted(restored.get_available_moves()), sorted(self.game.get_available_moves()))
+        # The captured pawn comes back on undo
+        restored.pop()
+        self.assertIsInstance(restored.board.get_piece((4, 3)), Pawn)
+        self.assertEqual(restored.board.get_piece((4, 3)).color, 'white')
+        self.assertEqual(Game.from_snapshot(snapshot).zobrist_key, self.game.zobrist_key)
+
+    def assert_piece_lists_match_board(self):
+        board = self.game.board
+        for color in ('white', 'black'):
+            expected = {(y, x): board.get_piece((y, x)) for y in range(8) for x in range(8)
+                        if board.get_piece((y, x)) and board.get_piece((y, x)).color == color}
+            self.assertEqual(board.pieces[color], expected)
+            king = [position for position, piece in expected.items() if isinstance(piece, King)][0]
+            self.assertEqual(board.find_king(color), king)
+
     def clear_board(self):
         for i in range(8):
             for j in range(8):
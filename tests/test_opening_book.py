@@ -0,0 +1,102 @@
+import unittest
+import sys
+import os
+import random
+import tempfile
+# Compute the path to the root directory (ChessAI/) and adds it to sys.path. Allows for running tests from root directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ai.minimax.minimax_chess_ai import MinimaxChessAI
+from ai.minimax.minimax_with_ab_pruning_chess_ai import MinimaxWithABPruningChessAI
+from ai.opening_book import OpeningBook, build_book, encode_move, decode_move, ENTRY
+from game_logic.game import Game
+from game_logic.notation import uci_to_move
+
+GAMES = '''[Result "1-0"]
+
+1. e4 e5 2. Bc4 Nc6 3. Qh5 Nf6 4. Qxf7# 1-0
+
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bb5 a6 1-0
+
+[Result "1/2-1/2"]
+
+1. d4 d5 2. c4 1/2-1/2
+
+[Result "0-1"]
+
+1. f3 e5 2. g4 Qh4# 0-1
+'''
+
+
+class TestOpeningBook(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        pgn_path = os.path.join(self.directory.name, 'games.pgn')
+        with open(pgn_path, 'w') as file:
+            file.write(GAMES)
+        self.book_path = os.path.join(self.directory.name, 'book.bin')
+        self.entries = build_book([pgn_path], self.book_path, max_ply=4)
+        self.book = OpeningBook(self.book_path)
+
+    def tearDown(self):
+        self.book.close()
+        self.directory.cleanup()
+
+    def test_build(self):
+        self.assertEqual(len(self.book), self.entries)
+        self.assertEqual(os.path.getsize(self.book_path), self.entries * ENTRY.size)
+        with open(self.book_path, 'rb') as file:
+            data = file.read()
+        keys = [ENTRY.unpack_from(data, index * ENTRY.size)[0] for index in range(self.entries)]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_start_position_weights(self):
+        # e4 won twice, d4 drew once and f3 lost, so it is left out
+        moves = self.book.moves(Game())
+        self.assertEqual(moves, [(uci_to_move('e2e4'), 4), (uci_to_move('d2d4'), 1)])
+        game = Game()
+        game.push(*uci_to_move('e2e4'))
+        self.assertEqual(self.book.moves(game), [])
+        game.push(*uci_to_move('e7e5'))
+        self.assertEqual(sorted(move for move, _ in self.book.moves(game)), [uci_to_move('f1c4'), uci_to_move('g1f3')])
+
+    def test_weighted_choice(self):
+        rng = random.Random(3)
+        picks = [self.book.choose_move(Game(), rng) for _ in range(500)]
+        self.assertEqual(set(picks), {uci_to_move('e2e4'), uci_to_move('d2d4')})
+        self.assertGreater(picks.count(uci_to_move('e2e4')), picks.count(uci_to_move('d2d4')) * 2)
+
+    def test_castling_and_promotion_moves(self):
+        game = Game.from_fen('r3k2r/1P6/8/8/8/8/8/R3K2R w KQkq - 0 1')
+        for text in ('e1g1', 'e1c1', 'b7a8', 'a1a7'):
+            move = uci_to_move(text)
+            self.assertEqual(decode_move(game, encode_move(game, move)), move)
+        self.assertEqual(encode_move(game, uci_to_move('e1g1')) & 0o77, 7)
+        self.assertEqual(encode_move(game, uci_to_move('b7a8')) >> 12, 4)
+
+    def test_ais_play_book_moves(self):
+        for ai in (MinimaxWithABPruningChessAI(3, opening_book=self.book_path), MinimaxChessAI(2, self.book)):
+            self.assertIn(ai.choose_move(Game()), (uci_to_move('e2e4'), uci_to_move('d2d4')))
+            self.assertEqual(ai.nodes, 0)
+        # Out of the book the AI searches
+        game = Game()
+        game.push(*uci_to_move('g1f3'))
+        ai = MinimaxWithABPruningChessAI(1, opening_book=self.book)
+        self.assertIn(ai.choose_move(game), game.get_available_moves())
+        self.assertGreater(ai.nodes, 0)
+
+    def test_invalid_and_empty_files(self):
+        path = os.path.join(self.directory.name, 'bad.bin')
+        with open(path, 'wb') as file:
+            file.write(b'\0' * 10)
+        with self.assertRaises(ValueError):
+            OpeningBook(path)
+        with open(path, 'wb'):
+            pass
+        with OpeningBook(path) as book:
+            self.assertIsNone(book.choose_move(Game()))
+
+
+if __name__ == '__main__':
+    unittest.main()
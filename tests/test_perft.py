@@ -0,0 +1,46 @@
+import unittest
+import sys
+import os
+# Compute the path to the root directory (ChessAI/) and adds it to sys.path. Allows for running tests from root directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from game_logic.perft import PERFT_POSITIONS, perft, divide
+from game_logic.game import Game
+
+class TestPerft(unittest.TestCase):
+    def check_position(self, name, max_depth):
+        fen, counts = PERFT_POSITIONS[name]
+        for depth in range(1, max_depth + 1):
+            self.assertEqual(perft(Game.from_fen(fen), depth), counts[depth], f'{name} depth {depth}')
+
+    def test_start_position(self):
+        self.check_position('startpos', 3)
+
+    def test_kiwipete(self):
+        self.check_position('kiwipete', 2)
+
+    def test_position3(self):
+        self.check_position('position3', 3)
+
+    def test_position6(self):
+        self.check_position('position6', 2)
+
+    def test_from_fen_matches_new_game(self):
+        game = Game.from_fen(PERFT_POSITIONS['startpos'][0])
+        self.assertEqual(sorted(game.get_available_moves()), sorted(Game().get_available_moves()))
+
+    def test_divide_sums_to_perft(self):
+        game = Game.from_fen(PERFT_POSITIONS['startpos'][0])
+        results = divide(game, 2)
+        self.assertEqual(len(results), 20)
+        self.assertEqual(sum(results.values()), 400)
+
+    def test_perft_restores_position(self):
+        game = Game.from_fen(PERFT_POSITIONS['position3'][0])
+        moves_before = sorted(game.get_available_moves())
+        perft(game, 2)
+        self.assertEqual(game.current_turn, 'white')
+        self.assertEqual(len(game.board.history), 0)
+        self.assertEqual(sorted(game.get_available_moves()), moves_before)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import sys
+import os
+import io
+# Compute the path to the root directory (ChessAI/) and adds it to sys.path. Allows for running tests from root directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from game_logic.bitboard import BitboardChessboard
+from game_logic.game import Game
+from game_logic.notation import move_to_san, san_to_move, uci_to_move
+from game_logic.pgn import read_games, game_to_pgn, write_game
+
+SCHOLARS_MATE = '''[Event "Casual"]
+[White "Alice"]
+[Black "Bob"]
+[Result "1-0"]
+
+1. e4 {King's pawn} e5 2. Bc4 (2. Nf3 Nc6 (2... d6) 3. Bb5) Nc6 $1 3. Qh5 ; threatening mate
+Nf6?? 4. Qxf7# 1-0
+'''
+
+
+def play(game, *moves):
+    for move in moves:
+        game.push(*uci_to_move(move))
+    return game
+
+
+class TestSan(unittest.TestCase):
+    def test_moves_to_san(self):
+        game = Game()
+        self.assertEqual(move_to_san(game, uci_to_move('g1f3')), 'Nf3')
+        self.assertEqual(move_to_san(game, uci_to_move('e2e4')), 'e4')
+        play(game, 'e2e4', 'd7d5')
+        self.assertEqual(move_to_san(game, uci_to_move('e4d5')), 'exd5')
+        self.assertEqual(move_to_san(game, uci_to_move('f1b5')), 'Bb5+')
+
+    def test_disambiguation(self):
+        game = Game.from_fen('4k3/8/8/8/8/8/4K3/R6R w - - 0 1')
+        self.assertEqual(move_to_san(game, uci_to_move('a1d1')), 'Rad1')
+        game = Game.from_fen('4k3/8/8/8/8/N7/8/N3K3 w - - 0 1')
+        self.assertEqual(move_to_san(game, uci_to_move('a1c2')), 'N1c2')
+        self.assertEqual(move_to_san(game, uci_to_move('a1b3')), 'Nb3')
+        self.assertEqual(san_to_move(game, 'N3c2'), uci_to_move('a3c2'))
+        with self.assertRaises(ValueError):
+            san_to_move(game, 'Nc2')
+
+    def test_castling_and_promotion(self):
+        game = Game.from_fen('r3k2r/1P6/8/8/8/8/8/R3K2R w KQkq - 0 1')
+        self.assertEqual(move_to_san(game, uci_to_move('e1g1')), 'O-O')
+        self.assertEqual(move_to_san(game, uci_to_move('e1c1')), 'O-O-O')
+        self.assertEqual(move_to_san(game, uci_to_move('b7a8')), 'bxa8=Q+')
+        self.assertEqual(san_to_move(game, 'O-O-O'), uci_to_move('e1c1'))
+        self.assertEqual(san_to_move(game, 'bxa8=Q'), uci_to_move('b7a8'))
+        with self.assertRaises(ValueError):
+            san_to_move(game, 'bxa8=N')
+
+
+class TestPgn(unittest.TestCase):
+    def test_read_game_with_comments_and_variations(self):
+        games = list(read_games(io.StringIO(SCHOLARS_MATE)))
+        self.assertEqual(len(games), 1)
+        pgn_game = games[0]
+        self.assertIsNone(pgn_game.error)
+        self.assertEqual(pgn_game.headers['White'], 'Alice')
+        self.assertEqual(pgn_game.result, '1-0')
+        self.assertEqual(len(pgn_game.moves), 7)
+        self.assertTrue(pgn_game.game.is_checkmate)
+
+    def test_malformed_game_is_skipped_over(self):
+        text = '[Event "Broken"]\n\n1. e4 e5 2. Ke3 *\n\n' + SCHOLARS_MATE
+        games = list(read_games(io.StringIO(text)))
+        self.assertEqual(len(games), 2)
+        self.assertIn('Ke3', games[0].error)
+        self.assertEqual(len(games[0].moves), 2)
+        self.assertIsNone(games[1].error)
+
+    def test_reads_lazily(self):
+        lines_read = []
+
+        def lines():
+            for line in (SCHOLARS_MATE + '\n' + SCHOLARS_MATE).splitlines(keepends=True):
+                lines_read.append(line)
+                yield line
+
+        games = read_games(lines())
+        next(games)
+        self.assertLess(len(lines_read), SCHOLARS_MATE.count('\n') * 2)
+
+    def test_write_and_read_back(self):
+        game = play(Game(), 'e2e4', 'd7d5', 'e4e5', 'f7f5', 'e5f6', 'g8f6', 'g1f3', 'b8c6', 'f1b5', 'a7a6',
+                    'e1g1', 'a6b5')
+        out = io.StringIO()
+        write_game(out, game, {'White': 'Engine "A"'})
+        text = out.getvalue()
+        self.assertIn('[White "Engine \\"A\\""]', text)
+        self.assertIn('3. exf6 Nxf6', text)
+        self.assertIn('6. O-O axb5', text)
+
+        pgn_game = next(read_games(io.StringIO(text), BitboardChessboard))
+        self.assertIsNone(pgn_game.error)
+        self.assertEqual(pgn_game.headers['White'], 'Engine "A"')
+        self.assertEqual(pgn_game.game.to_fen(), game.to_fen())
+
+    def test_write_from_fen(self):
+        game = Game.from_fen('4k3/8/8/8/8/8/8/4K2R b K - 0 30')
+        play(game, 'e8d7', 'h1h7')
+        text = game_to_pgn(game)
+        self.assertIn('[FEN "4k3/8/8/8/8/8/8/4K2R b K - 0 30"]', text)
+        self.assertIn('30... Kd7 31. Rh7+ *', text)
+        pgn_game = next(read_games(io.StringIO(text)))
+        self.assertEqual(pgn_game.game.to_fen(), game.to_fen())
+
+
+if __name__ == '__main__':
+    unittest.main()
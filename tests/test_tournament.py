@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+import json
+import random
+import tempfile
+# Compute the path to the root directory (ChessAI/) and adds it to sys.path. Allows for running tests from root directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ai.minimax.minimax_with_ab_pruning_chess_ai import MinimaxWithABPruningChessAI
+from ai.registry import create_ai
+from ai.tournament import random_opening, play_game, elo_difference, run_match
+from game_logic.pgn import read_games
+
+class TestTournament(unittest.TestCase):
+    def test_create_ai(self):
+        ai = create_ai('minimax_ab:depth=2, time_limit=0.5')
+        self.assertIsInstance(ai, MinimaxWithABPruningChessAI)
+        self.assertEqual((ai.depth, ai.time_limit), (2, 0.5))
+        with self.assertRaises(ValueError):
+            create_ai('stockfish')
+        with self.assertRaises(ValueError):
+            create_ai('minimax:depth')
+
+    def test_elo_difference(self):
+        difference, margin = elo_difference(60, 20, 20)
+        self.assertAlmostEqual(difference, 147.2, places=1)
+        self.assertGreater(margin, 0)
+        self.assertEqual(elo_difference(5, 10, 5)[0], 0)
+        # More games give a smaller margin for the same score
+        self.assertLess(elo_difference(600, 200, 200)[1], margin)
+
+    def test_play_game(self):
+        opening = random_opening(random.Random(1), 4)
+        self.assertEqual(len(opening), 4)
+        record = play_game(0, 'minimax_ab:depth=1', 'random', opening, seed=1, nodes_per_game=3000, max_plies=16)
+        self.assertIn(record['result'], ('1-0', '0-1', '1/2-1/2'))
+        self.assertLessEqual(record['plies'], 16)
+        self.assertEqual(record['moves'][:4], record['opening'])
+        white, black = record['stats']['white'], record['stats']['black']
+        self.assertEqual(white['moves'] + black['moves'] + 4, record['plies'])
+        self.assertGreater(white['nodes'], 0)
+        self.assertLessEqual(white['nodes'], 3000 + white['moves'])
+
+    def test_tight_node_budget_plays_legal_moves(self):
+        # Most searches run out of nodes inside their first root move
+        for nodes_per_game in (300, 1000, 3000):
+            record = play_game(0, 'minimax_ab:depth=3', 'random', [], seed=1, nodes_per_game=nodes_per_game,
+                               max_plies=60)
+            self.assertNotEqual(record['termination'], 'illegal move')
+
+    def test_run_match_streams_results(self):
+        with tempfile.TemporaryDirectory() as directory:
+            results_path = os.path.join(directory, 'results.jsonl')
+            pgn_path = os.path.join(directory, 'games.pgn')
+            results = run_match('random', 'random', games=4, workers=2, opening_plies=2, seed=7, max_plies=20,
+                                results_path=results_path, pgn_path=pgn_path)
+            self.assertEqual(results.games, 4)
+            self.assertEqual(results.wins + results.draws + results.losses, 4)
+            with open(results_path) as file:
+                records = [json.loads(line) for line in file]
+            self.assertEqual(sorted(record['game'] for record in records), [0, 1, 2, 3])
+            # Both games of a pair start from the same opening
+            openings = {record['game']: record['opening'] for record in records}
+            self.assertEqual(openings[0], openings[1])
+            with open(pgn_path) as file:
+                games = list(read_games(file))
+            self.assertEqual(len(games), 4)
+            self.assertTrue(all(game.error is None for game in games))
+        self.assertIn('W/D/L', results.report())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import sys
+import os
+import io
+import time
+# Compute the path to the root directory (ChessAI/) and adds it to sys.path. Allows for running tests from root directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ai.uci import UCIEngine
+from game_logic.game import Game
+
+MATE_IN_ONE = '7k/8/6Q1/8/8/8/8/R3K3 w Q - 0 1'
+
+
+class TestUCI(unittest.TestCase):
+    def setUp(self):
+        self.out = io.StringIO()
+        self.engine = UCIEngine('minimax_ab:depth=2', self.out)
+
+    def tearDown(self):
+        self.engine.stop_search()
+
+    def lines(self):
+        return self.out.getvalue().splitlines()
+
+    def wait_for_search(self):
+        self.engine.search.thread.join()
+
+    def test_handshake(self):
+        self.engine.handle('uci')
+        self.engine.handle('isready')
+        lines = self.lines()
+        self.assertTrue(lines[0].startswith('id name'))
+        self.assertIn('option name Hash type spin default 16 min 1 max 4096', lines)
+        self.assertEqual(lines[-2:], ['uciok', 'readyok'])
+        self.assertFalse(self.engine.handle('quit'))
+
+    def test_position_and_go_depth(self):
+        self.engine.handle(f'position fen {MATE_IN_ONE}')
+        self.engine.handle('go depth 1')
+        self.wait_for_search()
+        lines = self.lines()
+        self.assertEqual(lines[-1], 'bestmove a1a8')
+        # The AI always searches a ply past the root move, so go depth 1 reports depth 2
+        self.assertTrue(lines[-2].startswith('info depth 2 score mate 1 nodes '))
+        self.assertTrue(lines[-2].endswith('pv a1a8'))
+
+    def test_depth_counts_plies_from_root(self):
+        self.engine.handle('position startpos')
+        self.engine.handle('go depth 3')
+        self.wait_for_search()
+        self.assertEqual(self.engine.ai.depth, 2)
+        info = [line for line in self.lines() if line.startswith('info depth')]
+        self.assertEqual([line.split()[2] for line in info], ['2', '3'])
+
+    def test_position_moves(self):
+        self.engine.handle('position startpos moves e2e4 e7e5 g1f3')
+        self.assertEqual(self.engine.game.current_turn, 'black')
+        self.assertEqual(len(self.engine.game.board.history), 3)
+        self.engine.handle('position startpos moves e2e5')
+        self.assertIn('info string Invalid position: Illegal move e2e5', self.lines())
+        self.assertEqual(len(self.engine.game.board.history), 3)
+
+    def test_promotion_suffix(self):
+        self.engine.handle('position fen 7k/1P6/8/8/8/8/8/K7 w - - 0 1')
+        self.engine.handle('go depth 1')
+        self.wait_for_search()
+        self.assertEqual(self.lines()[-1], 'bestmove b7b8q')
+
+    def test_infinite_waits_for_stop(self):
+        self.engine.handle('position startpos')
+        self.engine.handle('go infinite')
+        time.sleep(0.2)
+        self.assertTrue(self.engine.search.is_thinking())
+        self.assertFalse(any(line.startswith('bestmove') for line in self.lines()))
+        self.engine.handle('stop')
+        self.assertFalse(self.engine.search.is_thinking())
+        self.assertTrue(self.lines()[-1].startswith('bestmove'))
+
+    def test_stop_right_after_go(self):
+        # The stop may come in before the search thread has started searching, it must still end the search
+        self.engine.handle('position startpos')
+        for _ in range(50):
+            self.engine.handle('go infinite')
+            self.engine.handle('stop')
+            self.assertFalse(self.engine.search.is_thinking())
+            self.assertTrue(self.lines()[-1].startswith('bestmove'))
+
+    def test_clock_time_limit(self):
+        self.engine.game = Game.from_fen('4k3/8/8/8/8/8/8/4K3 b - - 0 1')
+        self.assertEqual(self.engine.time_limit({'wtime': 1000, 'btime': 30000}), 1.0)
+        self.assertEqual(self.engine.time_limit({'btime': 30000, 'movestogo': 1}), 15.0)
+        self.assertEqual(self.engine.time_limit({'movetime': 250}), 0.25)
+        self.assertIsNone(self.engine.time_limit({}))
+
+    def test_score_from_side_to_move(self):
+        game = Game.from_fen('4k3/8/8/8/8/8/8/4K3 b - - 0 1')
+        self.assertEqual(UCIEngine.uci_score(game, 120, []), 'cp -120')
+        self.assertEqual(UCIEngine.uci_score(game, float('-inf'), [None] * 3), 'mate 2')
+
+
+if __name__ == '__main__':
+    unittest.main()
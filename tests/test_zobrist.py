@@ -0,0 +1,48 @@
+import unittest
+import sys
+import os
+# Compute the path to the root directory (ChessAI/) and adds it to sys.path. Allows for running tests from root directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from game_logic.game import Game
+from game_logic.perft import PERFT_POSITIONS, perft
+
+class TestZobrist(unittest.TestCase):
+    def play(self, moves):
+        game = Game()
+        for move in moves:
+            self.assertTrue(game.push(*move))
+        return game
+
+    def test_transpositions_share_a_key(self):
+        game1 = self.play([((1, 4), (3, 4)), ((6, 4), (4, 4)), ((0, 6), (2, 5))])
+        game2 = self.play([((0, 6), (2, 5)), ((6, 4), (4, 4)), ((1, 4), (3, 4))])
+        self.assertEqual(game1.zobrist_key, game2.zobrist_key)
+
+    def test_side_to_move_changes_key(self):
+        game = self.play([((0, 6), (2, 5)), ((7, 6), (5, 5)), ((2, 5), (0, 6))])
+        self.assertNotEqual(game.zobrist_key, Game().zobrist_key)
+        game.push((5, 5), (7, 6))
+        self.assertEqual(game.zobrist_key, Game().zobrist_key)
+
+    def test_castling_rights_change_key(self):
+        # Same pieces on the same squares, but white's king has moved and come back
+        game = self.play([((1, 4), (3, 4)), ((6, 4), (4, 4)), ((0, 4), (1, 4)), ((7, 6), (5, 5)),
+                          ((1, 4), (0, 4)), ((5, 5), (7, 6))])
+        reference = self.play([((1, 4), (3, 4)), ((6, 4), (4, 4))])
+        self.assertNotEqual(game.zobrist_key, reference.zobrist_key)
+        self.assertEqual(game.board.castling_rights, 12)
+
+    def test_pop_restores_key(self):
+        game = Game()
+        key = game.zobrist_key
+        game.push((1, 4), (3, 4))
+        game.pop()
+        self.assertEqual(game.zobrist_key, key)
+
+    def test_incremental_key_matches_scratch_key(self):
+        # Kiwipete and position 3 cover castling, captures and en passant
+        perft(Game.from_fen(PERFT_POSITIONS['kiwipete'][0]), 2, verify_hash=True)
+        perft(Game.from_fen(PERFT_POSITIONS['position3'][0]), 3, verify_hash=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Cold-start import benchmark for the headless parts of the project.
+
+Each module is imported in a fresh interpreter with python -X importtime, so the numbers are what a CLI
+command, a worker process or a test run pays before doing any work. It also checks that none of them
+loads pygame, which only the GUI needs. Run it with:
+
+    python engine.py importtime
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Modules that must import without pygame, e.g. on machines without a display
+HEADLESS_MODULES = (
+    'game_logic.game',
+    'game_logic.pgn',
+    'ai.minimax.minimax_with_ab_pruning_chess_ai',
+    'ai.tournament',
+    'ai.uci',
+    'engine',
+    'main',
+    'utils.utilities',
+)
+# Modules that may only be imported by the GUI
+GUI_MODULES = ('pygame', 'gui.window')
+# Cold import budget per module in milliseconds
+BUDGET_MS = 250
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def measure_import(module, runs=3):
+    """
+    Imports a module in runs fresh interpreters and returns (best import time in ms, GUI modules it loaded).
+    The best run is reported because the slower ones mostly measure the machine.
+    """
+    code = f'import sys, {module}; print(",".join(name for name in {GUI_MODULES!r} if name in sys.modules))'
+    best = None
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                                   capture_output=True, text=True, check=True)
+        # The -X importtime line of the module itself has its cumulative time in microseconds
+        for line in completed.stderr.splitlines():
+            fields = line.split('|')
+            if len(fields) == 3 and fields[2].strip() == module:
+                milliseconds = int(fields[1]) / 1000
+                best = milliseconds if best is None else min(best, milliseconds)
+        loaded = tuple(filter(None, completed.stdout.strip().split(',')))
+    return best, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure cold import times of the headless modules.')
+    parser.add_argument('modules', nargs='*', default=HEADLESS_MODULES, help='modules to import')
+    parser.add_argument('--runs', type=int, default=3, help='fresh interpreters per module, the best is reported')
+    parser.add_argument('--budget', type=float, default=BUDGET_MS, help='milliseconds allowed per module')
+    args = parser.parse_args(argv)
+
+    ok = True
+    for module in args.modules:
+        milliseconds, loaded = measure_import(module, args.runs)
+        problems = []
+        if milliseconds > args.budget:
+            problems.append(f'over the {args.budget:g} ms budget')
+        if loaded:
+            problems.append('loads ' + ', '.join(loaded))
+        ok = ok and not problems
+        print(f'{module}: {milliseconds:.1f} ms' + (f' ({"; ".join(problems)})' if problems else ''))
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,10 @@
 import subprocess
 import os
-import pygame
 
 def load_png_keep_aspect_ratio(png_filename, height):
+    # Imported here so the other helpers can be used without pygame installed
+    import pygame
+
     # Load the PNG image data into Pygame
     image = pygame.image.load(png_filename)
 